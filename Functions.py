@@ -6,20 +6,13 @@ from time import sleep
 import time
 import subprocess
 
+import clock
+import tracing
+
 
 def validate_infrastructure_outputs_after_rollout(infrastructure_stack_output_file):
-    #  Required Infrastructure Outputs
-    REQUIRED_KEYS = [
-        "CustomerOrdersTable",
-        "CustomerSSNTable",
-        "admin_user_arn",
-        "config_files_bucket",
-        "customer_data_bucket",
-        "devops_user_arn",
-        "gd_detector_id",
-        "payment_data_bucket",
-        "regular_buckets"
-    ]
+    #  Required Infrastructure Outputs (shared with the outputs registry)
+    from Load_Pulumi_Outputs import REQUIRED_KEYS
 
     try:
         with open(infrastructure_stack_output_file, "r") as file:
@@ -51,33 +44,10 @@ def validate_infrastructure_outputs_after_rollout(infrastructure_stack_output_fi
 
 
 
-def wait_for_output_file():
-    sleep_duration = 5
-    output_file = "/workspaces/North_Korean_Cloud_Nightmare/Infra/forrester-2025-output.json"  # FIXED PATH
-
-    with tqdm.tqdm(total=sleep_duration, desc="Validating Deployment") as pbar:
-        while sleep_duration > 0:
-            if os.path.exists(output_file):
-                print(f" File '{output_file}' found!")
-                return  # Stop waiting if file exists
-            
-            sleep_interval = min(1, sleep_duration)
-            sleep(sleep_interval)
-            pbar.update(sleep_interval)
-            sleep_duration -= sleep_interval
-
-    print(f" ERROR: {output_file} not found after waiting.")
-    sys.exit(1)  # Exit if file was never found
-
-
-
-
-
-
-
 import time
 import tqdm
 
+@tracing.traced("wait", category="sleep")
 def attack_execution_duration(minutes: float = 0, seconds: float = 0, description: str = None):
     """
      Displays a tqdm progress bar to simulate attack execution time.
@@ -99,10 +69,15 @@ def attack_execution_duration(minutes: float = 0, seconds: float = 0, descriptio
 
     print(f"\n {description} (Estimated time: {minutes}m {seconds}s)")
 
+    # Rehearsal: log the wait on the virtual clock instead of sitting through it
+    if clock.is_virtual():
+        clock.sleep(total_seconds, description)
+        return
+
     with tqdm.tqdm(total=total_seconds, desc="Attack Execution Progress", 
                    bar_format="{l_bar}{bar} [ {elapsed}/{remaining} ]") as pbar:
         for _ in range(int(total_seconds)):
-            time.sleep(1)  # Sleep for 1 second
+            clock.sleep(1)  # Sleep for 1 second
             pbar.update(1)  # Update progress bar
 
 
@@ -114,11 +89,15 @@ def attack_execution_duration(minutes: float = 0, seconds: float = 0, descriptio
 
 
 
+@tracing.traced("wait", category="sleep")
 def progress_bar(seconds):
     """ Display a progress bar while waiting for AWS to propagate MFA registration"""
     print("\n Waiting for AWS to propagate MFA registration...")
+    if clock.is_virtual():
+        clock.sleep(seconds, "MFA propagation")
+        return
     for _ in tqdm.tqdm(range(seconds), desc="MFA Propagation", unit="s", ncols=80):
-        time.sleep(1)
+        clock.sleep(1)
 
 
 
@@ -1,20 +1,23 @@
 import os
-import pyfiglet
 import time
 import subprocess
 import json
-from tqdm import tqdm
 from time import sleep
 from termcolor import colored
 
+import clock
+
 
 
 def loading_animation():
     chars = "/—\\|"
+    if clock.is_virtual():
+        clock.sleep(4, "loading animation")
+        return
     for _ in range(10):
         for char in chars:
             print(f"\rLoading {char}", end="", flush=True)
-            time.sleep(0.1)
+            clock.sleep(0.1)
 
 
 def generate_ssh_key():
@@ -1,16 +1,64 @@
 """An AWS Python program for North Korean Cloud Nightmare demo"""
 
+import os
+import sys
 import pulumi
 import pulumi_aws as aws
 import json
-import random
-from faker import Faker
+
+# Shared synthetic data generator lives in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_generator import DEFAULT_SEED, fake_config_data, generate_records
+from lab_index import lab_path, lab_tags
 
 config = pulumi.Config()
 region = config.get("aws:region") or "us-east-1"
 
-#  Initialize Faker
-fake = Faker()
+# Seed for every generated record; keyed by stack config so an unchanged
+# stack always renders identical seed data and `pulumi up` is a no-op diff.
+# 0 is a valid seed; only an unset dataSeed falls back to the default
+data_seed = config.get_int("dataSeed")
+if data_seed is None:
+    data_seed = DEFAULT_SEED
+
+# Run ID stamped on every resource so lab_index.py can find (and leak-check)
+# everything this stack created; stable per stack so redeploys stay no-op diffs
+run_id = config.get("runId") or f"{pulumi.get_project()}-{pulumi.get_stack()}"
+
+# Set by `--backend local` (local_backend.py). The emulator has no
+# ListMFADeviceTags, which the provider needs to read a virtual MFA device
+# back, so local stacks leave the DevOps team's MFA devices out
+local_backend = config.get_bool("localBackend") or False
+
+# Resource types that accept tags / an IAM path
+TAGGED_TYPES = {
+    "aws:iam/user:User",
+    "aws:iam/policy:Policy",
+    "aws:iam/virtualMfaDevice:VirtualMfaDevice",
+    "aws:s3/bucket:Bucket",
+    "aws:dynamodb/table:Table",
+    "aws:guardduty/detector:Detector",
+    "aws:cloudtrail/trail:Trail",
+}
+IAM_PATH_TYPES = {
+    "aws:iam/user:User",
+    "aws:iam/policy:Policy",
+    "aws:iam/virtualMfaDevice:VirtualMfaDevice",
+}
+
+
+def stamp_lab_resource(args):
+    """Stack transformation: lab tags on every taggable resource, the run's lab path on every IAM entity"""
+    if args.type_ not in TAGGED_TYPES:
+        return None
+    props = dict(args.props)
+    props["tags"] = {**lab_tags(run_id), **(props.get("tags") or {})}
+    if args.type_ in IAM_PATH_TYPES:
+        props["path"] = lab_path(run_id)
+    return pulumi.ResourceTransformationResult(props, args.opts)
+
+
+pulumi.runtime.register_stack_transformation(stamp_lab_resource)
 
 
 #               _           _         _    _               
@@ -144,30 +192,25 @@ admin_user_admin_access = aws.iam.UserPolicyAttachment("AdminUserAdminAccess",
 
 
 
+def devops_mfa_device(name):
+    """Virtual MFA device of a DevOps team member (None on the local backend)"""
+    if local_backend:
+        return None
+    return aws.iam.VirtualMfaDevice(name, virtual_mfa_device_name=name, tags={"Name": name})
+
+
 # devops_deploy = aws.iam.User("DevopsDeploy", name="DevopsDeploy")
 devops_deploy = aws.iam.User("DevopsDeploy")
-devops_deploy_mfa =  aws.iam.VirtualMfaDevice("DevopsDeploy",
-    virtual_mfa_device_name="DevopsDeploy",
-    tags={"Name": "DevopsDeploy"}    
-)
+devops_deploy_mfa = devops_mfa_device("DevopsDeploy")
 # devops_automation = aws.iam.User("DevopsAutomation", name="DevopsAutomation")
 devops_automation = aws.iam.User("DevopsAutomation")
-devops_automation_mfa =  aws.iam.VirtualMfaDevice("DevopsAutomation",
-    virtual_mfa_device_name="DevopsAutomation",
-    tags={"Name": "DevopsAutomation"}    
-)
+devops_automation_mfa = devops_mfa_device("DevopsAutomation")
 # devops_monitor = aws.iam.User("DevopsMonitor", name="DevopsMonitor")
 devops_monitor = aws.iam.User("DevopsMonitor")
-devops_monitor_mfa =  aws.iam.VirtualMfaDevice("DevopsMonitor",
-    virtual_mfa_device_name="DevopsMonitor",
-    tags={"Name": "DevopsMonitor"}    
-)
+devops_monitor_mfa = devops_mfa_device("DevopsMonitor")
 # devops_pipeline = aws.iam.User("DevopsPipeline", name="DevopsPipeline")
 devops_pipeline = aws.iam.User("DevopsPipeline")
-devops_pipeline_mfa =  aws.iam.VirtualMfaDevice("DevopsPipeline",
-    virtual_mfa_device_name="DevopsPipeline",
-    tags={"Name": "DevopsPipeline"}    
-)
+devops_pipeline_mfa = devops_mfa_device("DevopsPipeline")
 
 #   _____              ____              _    _               
 #  |  __ \            / __ \            | |  | |              
@@ -456,35 +499,14 @@ ssn_table = aws.dynamodb.Table("CustomerSSNTable",
 
 
 #  Generate Fake Data
-fake_config_data = {
-    "system": "Enterprise App",
-    "config_version": "1.2.3",
-    "allowed_ips": [f"192.168.1.{i}" for i in range(1, 101)]
-}
-
-fake_customer_data = [
-    {
-        "id": i,
-        "name": fake.name(),
-        "email": f"{fake.first_name().lower()}{random.randint(1,99)}@{random.choice(['gmail.com', 'yahoo.com'])}"
-    }
-    for i in range(1, 101)
-]
-
-fake_payment_data = [
-    {
-        "id": i,
-        "card": f"{random.choice(['4111', '5500'])}-XXXX-XXXX-{random.randint(1000,9999)}",
-        "cvv": f"{random.randint(100,999)}"
-    }
-    for i in range(1, 101)
-]
+fake_customer_data = list(generate_records("customers", 100, seed=data_seed))
+fake_payment_data = list(generate_records("payments", 100, seed=data_seed))
 
 # Upload Data to S3
 aws.s3.BucketObject("config-file",
     bucket=config_files_bucket.id,
     key="config.json",
-    content=json.dumps(fake_config_data, indent=4)
+    content=json.dumps(fake_config_data(), indent=4)
 )
 
 aws.s3.BucketObject("customer-file",
@@ -499,29 +521,8 @@ aws.s3.BucketObject("payment-file",
     content=json.dumps(fake_payment_data, indent=4)
 )
 
-# Populate DynamoDB Tables
-for i in range(1, 11):
-    aws.dynamodb.TableItem(f"order-{i}",
-        table_name=orders_table.name,
-        hash_key="ID",
-        item=json.dumps({
-            "ID": {"S": str(1000 + i)},
-            "OrderDate": {"S": fake.date_between(start_date="-1y", end_date="today").strftime("%Y-%m-%d")},
-            "CustomerName": {"S": fake.name()},
-            "ItemPurchased": {"S": random.choice(["Laptop", "Keyboard", "Monitor", "Mouse", "Tablet", "Phone", "Headphones", "Charger"])}
-        })
-    )
-
-    aws.dynamodb.TableItem(f"ssn-{i}",
-        table_name=ssn_table.name,
-        hash_key="ID",
-        item=json.dumps({
-            "ID": {"S": str(2000 + i)},
-            "CustomerName": {"S": fake.name()},
-            "SSN": {"S": f"{random.randint(100,999)}-{random.randint(10,99)}-{random.randint(1000,9999)}"},
-            "CreditCard": {"S": f"{random.choice(['4111', '5500'])}-XXXX-XXXX-{random.randint(1000,9999)}"}
-        })
-    )
+# DynamoDB tables are populated after deployment by dynamodb_seeder.py
+# (parallel BatchWriteItem) so the stack state holds only the tables themselves
 
 
 
@@ -601,6 +602,8 @@ cloudtrail = aws.cloudtrail.Trail("cloudtrail",
     include_global_service_events=True,
     is_multi_region_trail=True,
     enable_logging=True,
+    # Hourly signed digest files, so tampered or deleted log files can be proven afterwards
+    enable_log_file_validation=True,
     opts=pulumi.ResourceOptions(depends_on=[cloudtrail_bucket_policy])
 )
 
@@ -626,19 +629,25 @@ pulumi.export("devops_user_mfa_policy_arn", devops_mfa_policy.arn)
 #pulumi.export("DevopsUser_mfa_arn", devops_user_mfa.arn)
 pulumi.export("cloudtrail_name", cloudtrail.name)
 pulumi.export("cloudtrail_log_bucket", cloudtrail_log_bucket.bucket)
+pulumi.export("data_seed", data_seed)
+pulumi.export("lab_run_id", run_id)
 
 
 pulumi.export("devops_deploy_arn", devops_deploy.arn)
-pulumi.export("DevopsDeploy_mfa_arn", devops_deploy_mfa.arn)
+if devops_deploy_mfa:
+    pulumi.export("DevopsDeploy_mfa_arn", devops_deploy_mfa.arn)
 
 
 pulumi.export("devops_automation_arn", devops_automation.arn)
-pulumi.export("DevopsAutomation_mfa_arn", devops_automation_mfa.arn)
+if devops_automation_mfa:
+    pulumi.export("DevopsAutomation_mfa_arn", devops_automation_mfa.arn)
 
 pulumi.export("devops_monitor_arn", devops_monitor.arn)
-pulumi.export("DevopsMonitor_mfa_arn", devops_monitor_mfa.arn)
+if devops_monitor_mfa:
+    pulumi.export("DevopsMonitor_mfa_arn", devops_monitor_mfa.arn)
 
 pulumi.export("devops_pipeline_arn", devops_pipeline.arn)
-pulumi.export("DevopsPipeline_mfa_arn", devops_pipeline_mfa.arn)
+if devops_pipeline_mfa:
+    pulumi.export("DevopsPipeline_mfa_arn", devops_pipeline_mfa.arn)
 
 
@@ -1,37 +1,119 @@
 import os
 import json
+import threading
 
 
 
 
 OUTPUT_PATH = "/workspaces/North_Korean_Cloud_Nightmare/Infra/forrester-2025-output.json"
 
-def load_infrastructure_outputs():
-    """🔍 Load infrastructure outputs and return as a dictionary"""
-    if not os.path.exists(OUTPUT_PATH):
-        raise RuntimeError(f"ERROR: Output file '{OUTPUT_PATH}' not found. Did you run infrastructure deployment?")
+#  Outputs every command relies on; a file missing any of them is rejected on load
+REQUIRED_KEYS = [
+    "CustomerOrdersTable",
+    "CustomerSSNTable",
+    "admin_user_arn",
+    "config_files_bucket",
+    "customer_data_bucket",
+    "devops_user_arn",
+    "gd_detector_id",
+    "payment_data_bucket",
+    "regular_buckets"
+]
+
+
+class MissingOutputError(RuntimeError):
+    """Raised when a required or requested infrastructure output is absent"""
+
+
+class OutputsRegistry:
+    """🔍 Infrastructure outputs loaded once per process, re-read only when the file changes on disk"""
+
+    def __init__(self, path=OUTPUT_PATH, required_keys=REQUIRED_KEYS):
+        self.path = path
+        self.required_keys = required_keys
+        self._outputs = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            raise RuntimeError(f"ERROR: Output file '{self.path}' not found. Did you run infrastructure deployment?")
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as file:
+                outputs = json.load(file)
+        except json.JSONDecodeError:
+            raise RuntimeError(f"ERROR: Output file '{self.path}' contains invalid JSON. Check infrastructure execution.")
+
+        if not isinstance(outputs, dict):
+            raise RuntimeError("ERROR: Output file is corrupted or not in JSON format.")
 
-    try:
-        with open(OUTPUT_PATH, "r") as file:
-            infrastructure_outputs = json.load(file)
+        missing_keys = [key for key in self.required_keys if key not in outputs]
+        if missing_keys:
+            raise MissingOutputError(f"ERROR: Missing infrastructure outputs in '{self.path}': {missing_keys}")
+        return outputs
 
-        if not isinstance(infrastructure_outputs, dict):
-            raise RuntimeError("ERROR: Output file is corrupted or not in JSON format.")
+    def as_dict(self):
+        """Current outputs, reloading only if the file's mtime or size changed since the last read"""
+        signature = self._file_signature()
+        with self._lock:
+            if self._outputs is None or signature != self._signature:
+                self._outputs = self._load()
+                self._signature = signature
+            return self._outputs
 
-        return infrastructure_outputs  # Return dictionary of outputs
+    def invalidate(self):
+        """Force the next access to re-read the file"""
+        with self._lock:
+            self._outputs = None
+            self._signature = None
 
-    except json.JSONDecodeError:
-        raise RuntimeError(f"ERROR: Output file '{OUTPUT_PATH}' contains invalid JSON. Check infrastructure execution.")
-    except Exception as e:
-        raise RuntimeError(f"ERROR: Failed to load infrastructure outputs: {str(e)}")
+    def get(self, key):
+        """Value of an output; raises MissingOutputError if it is not present"""
+        outputs = self.as_dict()
+        if key not in outputs:
+            raise MissingOutputError(f"ERROR: {key} not found in infrastructure outputs.")
+        return outputs[key]
 
+    def get_optional(self, key, default=None):
+        """Value of an output that older stacks may not export"""
+        return self.as_dict().get(key, default)
 
-def get_infrastructure_output(key):
-    """🔍 Retrieve a specific value from infrastructure outputs"""
-    infrastructure_outputs = load_infrastructure_outputs()  # Ensure outputs are loaded
-    return infrastructure_outputs.get(key, f"ERROR: {key} not found in infrastructure outputs.")
+    def _typed(self, key, expected_type):
+        value = self.get(key)
+        if not isinstance(value, expected_type):
+            raise MissingOutputError(
+                f"ERROR: Output {key} should be {expected_type.__name__}, got {type(value).__name__}: {value!r}"
+            )
+        return value
+
+    def get_str(self, key):
+        return self._typed(key, str)
+
+    def get_int(self, key):
+        return self._typed(key, int)
 
+    def get_list(self, key):
+        return self._typed(key, list)
 
+    def get_user_name(self, key):
+        """IAM user name from an output holding the user's ARN"""
+        return self.get_str(key).split("/")[-1]
 
 
+#  Shared by every module in the process
+infrastructure_outputs = OutputsRegistry()
 
+
+def load_infrastructure_outputs():
+    """🔍 Load infrastructure outputs and return as a dictionary"""
+    return infrastructure_outputs.as_dict()
+
+
+def get_infrastructure_output(key):
+    """🔍 Retrieve a specific value from infrastructure outputs (raises MissingOutputError if absent)"""
+    return infrastructure_outputs.get(key)
@@ -1,7 +1,10 @@
 import json
-import time
 import subprocess
 from termcolor import colored
+from Load_Pulumi_Outputs import infrastructure_outputs
+from lab_index import lab_path
+
+import clock
 
 
 
@@ -148,6 +151,7 @@ class MFASetup:
         create_mfa_command = f"""
         aws iam create-virtual-mfa-device \
             --virtual-mfa-device-name {self.user}-MFA \
+            --path {lab_path(infrastructure_outputs.get_optional('lab_run_id'))} \
             --outfile {self.mfa_seed_bin_file_path} \
             --bootstrap-method Base32StringSeed \
             --query 'VirtualMFADevice.SerialNumber' \
@@ -163,13 +167,13 @@ class MFASetup:
         self.mfa_secret = self.extract_mfa_secret()
         # Wait for AWS to fully register the MFA device
         print(colored("[INFO] Waiting for AWS to register the new MFA device...", "yellow"))
-        time.sleep(10)
+        clock.sleep(10, "MFA device registration")
 
 
 
     def extract_mfa_secret(self):
         """Extract MFA Secret from `mfa-seed.bin` (AWS Stores in Base32)"""
-        time.sleep(2)  # Give AWS time to sync
+        clock.sleep(2, "MFA seed sync")  # Give AWS time to sync
         print(colored("[INFO] Fetching MFA Secret...", "cyan"))
         #
         # Thinking of putting potential if statement to create message only on new
@@ -191,8 +195,10 @@ class MFASetup:
         print(colored("[INFO] Ensuring system clock is synchronized...", "cyan"))
         subprocess.run("sudo ntpdate -q time.google.com", shell=True, capture_output=True, text=True)
         code1 = subprocess.run(f"oathtool --totp --base32 {self.mfa_secret}", shell=True, capture_output=True, text=True).stdout.strip()
-        time.sleep(30)  # Wait for new OTP
-        code2 = subprocess.run(f"oathtool --totp --base32 {self.mfa_secret}", shell=True, capture_output=True, text=True).stdout.strip()
+        clock.sleep(30, "next TOTP window")  # Wait for new OTP
+        # On the virtual clock, ask oathtool for the code of the window the clock has moved to
+        now = f" --now @{int(clock.now())}" if clock.is_virtual() else ""
+        code2 = subprocess.run(f"oathtool --totp --base32{now} {self.mfa_secret}", shell=True, capture_output=True, text=True).stdout.strip()
         print(colored(f"[SUCCESS] Auto-Generated MFA Codes: {code1}, {code2}", "green"))
         return code1, code2
     
@@ -221,13 +227,10 @@ class MFASetup:
 
 
     def get_infrastructure_secret(self,secret_name):
-        """Fetch infrastructure secret with --show-secrets"""
+        """Fetch an infrastructure secret output in plaintext"""
         try:
-            result = subprocess.run(
-                f"pulumi stack output {secret_name} --show-secrets",
-                shell=True, capture_output=True, text=True
-            )
-            return result.stdout.strip()
+            import pulumi_workspace
+            return pulumi_workspace.stack_outputs(show_secrets=True)[secret_name]
         except Exception as e:
             print(colored(f"[ERROR] Failed to retrieve infrastructure secret {secret_name}: {e}", "red"))
             exit(1)
@@ -237,7 +240,7 @@ class MFASetup:
         """ Log in as DevOpsUser using Access Key + MFA"""
 
         print(colored("[INFO] Waiting for AWS to fully associate MFA device...", "yellow"))
-        time.sleep(10)
+        clock.sleep(10, "MFA association")
 
         # Step 1: Verify MFA is linked before attempting login
         validation = subprocess.run([
@@ -6,6 +6,8 @@ import base64
 import os
 import configparser
 from Functions import attack_execution_duration
+from Load_Pulumi_Outputs import infrastructure_outputs
+from lab_index import lab_path
 
 
 
@@ -19,7 +21,6 @@ class Attack:
         self.iam_client = boto3.client("iam", region_name=region)
         self.sts_client = boto3.client("sts", region_name=region)
         self.region = region
-        self.infrastructure_outputs = None  # Defer loading until needed
     
 
         #  Force Boto3 to use the correct credentials & config file locations
@@ -34,17 +35,15 @@ class Attack:
 
         print(f"AWS Profile 'devopsuser' found! Proceeding with Attack Initialization...")
 
-        # Load Infrastructure outputs BEFORE using them
-        self.load_infrastructure_outputs()
-
+        # Infrastructure outputs come from the shared registry (validated on load)
         self.devops_user = "DevopsUser"
-        self.mfa_arn = self.infrastructure_outputs.get("devops_user_mfa_arn")
+        self.mfa_arn = infrastructure_outputs.get_optional("devops_user_mfa_arn")
 
         # ----------- #
         # Access Keys #
         # ----------- #
-        self.access_key_id = self.infrastructure_outputs.get("devops_access_key_id")
-        self.secret_access_key = self.infrastructure_outputs.get("devops_secret_access_key")
+        self.access_key_id = infrastructure_outputs.get_str("devops_access_key_id")
+        self.secret_access_key = infrastructure_outputs.get_str("devops_secret_access_key")
 
         # --------------------- #
         # Initialize Subclasses #
@@ -84,41 +83,6 @@ class Attack:
         self.createuser_attatchpolicies = self.AWS_CreateUser_AttachPolicies(self)
 
 
-    def load_infrastructure_outputs(self):
-           """🔍 Load Infrastructure outputs only when needed"""
-           if self.infrastructure_outputs is not None:
-               return  # Already loaded
-    
-           output_path = "/workspaces/North_Korean_Cloud_Nightmare/Infra/forrester-2025-output.json"
-    
-           if not os.path.exists(output_path):
-               raise RuntimeError(f"ERROR: Output file '{output_path}' not found. Did you run infrastructure deployment?")
-    
-           try:
-               with open(output_path, "r") as file:
-                   self.infrastructure_outputs = json.load(file)
-    
-               if not isinstance(self.infrastructure_outputs, dict):
-                   raise RuntimeError("ERROR: Output file is corrupted or not in JSON format.")
-    
-           except json.JSONDecodeError:
-               raise RuntimeError(f"ERROR: Output file '{output_path}' contains invalid JSON. Check infrastructure execution.")
-    
-           except Exception as e:
-               raise RuntimeError(f"ERROR: Failed to load infrastructure outputs: {str(e)}")
-
-
-
-    def get_infrastructure_output(self, key):
-        """🔍 Retrieve a specific value from infrastructure outputs"""
-        if self.infrastructure_outputs is None:
-            self.load_infrastructure_outputs()
-
-        return self.infrastructure_outputs.get(key, f"ERROR: {key} not found in infrastructure outputs.")
-
-
-
-
     def load_credentials_from_file(self):
         """🔍 Reads AWS credentials manually from ~/.aws/credentials"""
         config = configparser.ConfigParser()
@@ -217,7 +181,9 @@ class Attack:
         def create_user(self, username):
             """Creates an IAM user"""
             try:
-                response = self.iam_client.create_user(UserName=username)
+                # The run's lab path keeps the user discoverable by lab_index for cleanup
+                path = lab_path(infrastructure_outputs.get_optional("lab_run_id"))
+                response = self.iam_client.create_user(UserName=username, Path=path)
                 print(f"User {username} created successfully.")
                 return response['User']
             except Exception as e:
@@ -0,0 +1,80 @@
+"""
+AWS Profile Editor
+
+In-process edits of ~/.aws/credentials and ~/.aws/config. Each file is
+parsed once with configparser, every requested profile is dropped in the
+same pass, and the result is written to a temporary file and moved into
+place, so a crash never leaves a half-written credentials file. Files
+without any of the profiles are not rewritten.
+
+Note: configparser does not keep comments, so a file that is rewritten
+loses them.
+"""
+
+import configparser
+import os
+import tempfile
+
+
+def credentials_path():
+    return os.path.expanduser(os.environ.get("AWS_SHARED_CREDENTIALS_FILE", "~/.aws/credentials"))
+
+
+def config_path():
+    return os.path.expanduser(os.environ.get("AWS_CONFIG_FILE", "~/.aws/config"))
+
+
+def _section_names(profile, config_file):
+    """Section names a profile can appear under (config uses "profile <name>" except for default)"""
+    if config_file and profile != "default":
+        return [f"profile {profile}", profile]
+    return [profile]
+
+
+def read_profiles(path):
+    parser = configparser.RawConfigParser()
+    parser.read(path)
+    return parser
+
+
+def write_atomic(parser, path):
+    """Write a parsed file to a temp file in the same directory, then replace the original"""
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", text=True)
+    try:
+        with os.fdopen(fd, "w") as file:
+            parser.write(file)
+        # Credentials must stay private to the user
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def find_profiles(profiles):
+    """{path: [sections]} of the given profiles still present in the credentials/config files"""
+    found = {}
+    for path, config_file in [(credentials_path(), False), (config_path(), True)]:
+        parser = read_profiles(path)
+        sections = [section for profile in profiles for section in _section_names(profile, config_file)
+                    if parser.has_section(section)]
+        if sections:
+            found[path] = sections
+    return found
+
+
+def remove_profiles(profiles):
+    """Drop every given profile from both files in one pass each. Returns {path: [removed sections]}."""
+    removed = {}
+    for path, config_file in [(credentials_path(), False), (config_path(), True)]:
+        if not os.path.exists(path):
+            continue
+        parser = read_profiles(path)
+        sections = [section for profile in profiles for section in _section_names(profile, config_file)
+                    if parser.remove_section(section)]
+        if sections:
+            write_atomic(parser, path)
+            removed[path] = sections
+    return removed
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark
+
+Measures how long each North_Korean_Cloud_Nightmare.py subcommand spends
+importing modules before it can do any work, using `python -X importtime`,
+and fails when a subcommand goes over its budget. It also checks that the
+entry point itself never pulls in heavy dependencies at import time, and
+that every subcommand of the entry point has a dispatch branch and a budget.
+
+A subcommand's modules are read from the code, not listed by hand: starting
+at its `args.command == ...` branch in main(), every function, class and
+module-level table it references is followed (into other repository modules
+too), and every import statement on the way is collected. Branches are not
+evaluated, so the set covers the subcommand's whole path, including steps
+that only run after an earlier one succeeded.
+
+Usage:
+    python benchmarks/import_time.py                 # every subcommand
+    python benchmarks/import_time.py --command help  # one subcommand
+    python benchmarks/import_time.py --runs 5 --top 15
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINT = "North_Korean_Cloud_Nightmare"
+
+# Import-time budgets in milliseconds (cumulative time of top-level imports, best of N runs)
+BUDGETS_MS = {
+    "help": 150,
+    "setup": 1500,
+    "show_deployed_resources": 1500,
+    "deploy_infrastructure": 2000,
+    "launch_attack": 1500,
+    "execute_full_scenario": 2500,
+    "reset_data": 2000,
+    "clean_up": 1500,
+    "ingest_cloudtrail": 1000,
+    "verify_cloudtrail": 1000,
+    "run_detections": 1000,
+    "scoreboard": 1000,
+}
+
+# Must never be imported just by loading the entry point
+FORBIDDEN_AT_STARTUP = ["boto3", "botocore", "pulumi", "pulumi_aws", "numpy", "pyfiglet", "pyqrcode", "tqdm"]
+
+
+# --------------------------------------------------------------------------- #
+# Import path of a subcommand, derived from the source
+# --------------------------------------------------------------------------- #
+
+_module_info = {}
+
+
+def is_repo_module(name):
+    return os.path.exists(os.path.join(REPO_ROOT, f"{name}.py"))
+
+
+def import_bindings(nodes):
+    """Local name -> (module, attribute or None) for the import statements in `nodes`"""
+    bindings = {}
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    bindings[alias.asname] = (alias.name, None)
+                else:
+                    top = alias.name.split(".")[0]
+                    bindings[top] = (top, None)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            for alias in node.names:
+                bindings[alias.asname or alias.name] = (node.module, alias.name)
+    return bindings
+
+
+def module_info(name):
+    """Top-level definitions (functions, classes, assignments) and import bindings of a repository module"""
+    if name not in _module_info:
+        with open(os.path.join(REPO_ROOT, f"{name}.py"), "r") as file:
+            tree = ast.parse(file.read())
+        definitions = {}
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                definitions[node.name] = node.body
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        definitions[target.id] = [node.value]
+        _module_info[name] = {"definitions": definitions, "bindings": import_bindings(tree.body)}
+    return _module_info[name]
+
+
+def follow(module, statements, imports, seen, bindings=None):
+    """Collect the import statements in `statements` of a repository module, and in everything they reference"""
+    nodes = [node for statement in statements for node in ast.walk(statement)]
+    info = module_info(module)
+    local = import_bindings(nodes)
+    imports.update(ast.unparse(node) for node in nodes
+                   if isinstance(node, ast.Import) or (isinstance(node, ast.ImportFrom) and node.level == 0))
+    bindings = {**info["bindings"], **(bindings or {}), **local}
+
+    for node in nodes:
+        target = None
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            if node.id in bindings:
+                source, attribute = bindings[node.id]
+                if attribute and is_repo_module(source):
+                    target = (source, attribute)
+            elif node.id in info["definitions"]:
+                target = (module, node.id)
+        elif isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id in bindings:
+            source, attribute = bindings[node.value.id]
+            if attribute is None and is_repo_module(source):
+                target = (source, node.attr)
+
+        if target and target not in seen:
+            seen.add(target)
+            body = module_info(target[0])["definitions"].get(target[1])
+            if body:
+                follow(target[0], body, imports, seen)
+
+
+def dispatch_branches():
+    """Subcommand -> (body of its `args.command == ...` branch, import bindings of main())"""
+    main_node = next(node for node in ast.parse(open(os.path.join(REPO_ROOT, f"{ENTRY_POINT}.py")).read()).body
+                     if isinstance(node, ast.FunctionDef) and node.name == "main")
+    bindings = import_bindings(ast.walk(main_node))
+    branches = {}
+    for node in ast.walk(main_node):
+        test = getattr(node, "test", None) if isinstance(node, ast.If) else None
+        if (isinstance(test, ast.Compare) and isinstance(test.left, ast.Attribute) and test.left.attr == "command"
+                and isinstance(test.ops[0], ast.Eq) and isinstance(test.comparators[0], ast.Constant)):
+            branches[test.comparators[0].value] = (node.body, bindings)
+    return branches
+
+
+def command_imports(command):
+    """Import statements a subcommand runs on its way through the code (none for `help`)"""
+    if command == "help":
+        return []
+    body, bindings = dispatch_branches()[command]
+    imports = set()
+    follow(ENTRY_POINT, body, imports, set(), bindings)
+    return sorted(imports)
+
+
+def imported_modules(statements):
+    """Modules named by import statements, for display"""
+    modules = set()
+    for node in ast.parse("\n".join(statements)).body:
+        modules.update([alias.name for alias in node.names] if isinstance(node, ast.Import) else [node.module])
+    return sorted(modules)
+
+
+# --------------------------------------------------------------------------- #
+# Measurement
+# --------------------------------------------------------------------------- #
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into (module, self_us, cumulative_us, depth) tuples"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # One space after the separator, then two more per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure(command):
+    """Import the entry point, then run a subcommand's import statements, in a fresh interpreter"""
+    statements = [f"import {ENTRY_POINT}"] + command_imports(command)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(statements)],
+        capture_output=True, text=True, cwd=REPO_ROOT
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ERROR: {command} imports failed:\n{result.stderr.splitlines()[-1]}")
+    return parse_importtime(result.stderr)
+
+
+def summarize(rows, top):
+    """Total top-level import time plus the slowest top-level imports"""
+    top_level = [row for row in rows if row[3] == 0]
+    slowest = sorted(top_level, key=lambda row: row[2], reverse=True)[:top]
+    return {
+        "total_ms": round(sum(row[2] for row in top_level) / 1000, 1),
+        "modules": len(rows),
+        "slowest": [{"module": name, "cumulative_ms": round(cumulative / 1000, 1)} for name, _, cumulative, _ in slowest],
+    }
+
+
+def unmapped_commands():
+    """Entry point subcommands without a dispatch branch in main() or a budget"""
+    sys.path.insert(0, REPO_ROOT)
+    from North_Korean_Cloud_Nightmare import COMMANDS
+
+    branches = dispatch_branches()
+    return [command for command in COMMANDS if command not in branches or command not in BUDGETS_MS]
+
+
+def check_startup_imports():
+    """Names from FORBIDDEN_AT_STARTUP that loading the entry point alone imports"""
+    imported = {name.split(".")[0] for name, _, _, _ in measure("help")}
+    return sorted(imported & set(FORBIDDEN_AT_STARTUP))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-subcommand import-time budget check")
+    parser.add_argument("--command", choices=list(BUDGETS_MS), action="append",
+                        help="Subcommand to measure (repeatable, default: all)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per subcommand; best run counts")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per subcommand")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    parser.add_argument("--list", action="store_true", help="Print each subcommand's derived import set and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for command in args.command or list(BUDGETS_MS):
+            print(f"{command:<24} {', '.join(imported_modules(command_imports(command))) or '-'}")
+        return
+
+    failed = False
+    results = {}
+
+    unmapped = unmapped_commands()
+    if unmapped:
+        print(f"FAIL  no dispatch branch or budget for: {', '.join(unmapped)}")
+        failed = True
+
+    forbidden = check_startup_imports()
+    if forbidden:
+        print(f"FAIL  {ENTRY_POINT} imports {', '.join(forbidden)} at startup")
+        failed = True
+
+    for command in args.command or [command for command in BUDGETS_MS if command not in unmapped]:
+        runs = [summarize(measure(command), args.top) for _ in range(args.runs)]
+        best = min(runs, key=lambda run: run["total_ms"])
+        budget = BUDGETS_MS[command]
+        best["budget_ms"] = budget
+        results[command] = best
+
+        status = "ok  " if best["total_ms"] <= budget else "FAIL"
+        failed |= best["total_ms"] > budget
+        print(f"{status}  {command:<24} {best['total_ms']:>8.1f} ms  (budget {budget} ms, {best['modules']} modules)")
+        for entry in best["slowest"]:
+            print(f"        {entry['module']:<40} {entry['cumulative_ms']:>8.1f} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump({"unmapped_commands": unmapped, "forbidden_at_startup": forbidden, "commands": results},
+                      file, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Lifecycle Benchmark
+
+Times every phase of the lab lifecycle against the local backend (moto
+server + file:// Pulumi state, see local_backend.py) at one or more data
+scales, and fails when a phase regresses past its budget relative to the
+stored baseline.
+
+Phases, in order: deploy (pulumi up), seed, validate, show
+(show_deployed_resources) and cleanup (full_cleanup). Each phase runs in a
+fresh interpreter, as it would from the CLI, and records:
+
+- wall time
+- peak RSS of the Python process and of its largest child (Pulumi engine/provider)
+- API calls: every request the emulator served (Python and Pulumi provider),
+  plus the Python side broken down by operation
+
+Baselines are stored per scale in benchmarks/baselines/lifecycle-<scale>.json.
+A scale with no baseline fails; record one with --update-baseline.
+
+Usage:
+    python benchmarks/lifecycle.py                          # 1k scale
+    python benchmarks/lifecycle.py --scale 1k --scale 100k
+    python benchmarks/lifecycle.py --scale 1m --update-baseline
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(REPO_ROOT, "benchmarks", "baselines")
+RESULT_PREFIX = "LIFECYCLE-RESULT "
+
+PHASES = ["deploy", "seed", "validate", "show", "cleanup"]
+
+# DynamoDB rows per table and S3 objects per bucket
+SCALES = {
+    "1k": {"rows": 1_000, "objects": 1_000},
+    "100k": {"rows": 100_000, "objects": 100_000},
+    "1m": {"rows": 1_000_000, "objects": 1_000_000},
+}
+
+# Small fixed-size objects: the benchmark measures per-object overhead, and the emulator keeps bytes in memory
+S3_SPEC = {"size": {"distribution": "fixed", "bytes": 1024}}
+
+# Allowed growth over the baseline before a phase fails (ratio), per metric
+BUDGETS = {
+    "wall_seconds": 1.5,
+    "peak_rss_mb": 1.25,
+    "api_calls": 1.10,
+}
+# Differences below these are noise, whatever the ratio
+NOISE_FLOOR = {
+    "wall_seconds": 1.0,
+    "peak_rss_mb": 20,
+    "api_calls": 10,
+}
+
+
+# --------------------------------------------------------------------------- #
+# Worker: runs one phase in this process and prints its measurements
+# --------------------------------------------------------------------------- #
+
+def count_api_calls():
+    """Count every botocore API call made in this process, by service.operation"""
+    from botocore.client import BaseClient
+
+    calls = Counter()
+    make_api_call = BaseClient._make_api_call
+
+    def counted(client, operation_name, api_params):
+        calls[f"{client.meta.service_model.service_name}.{operation_name}"] += 1
+        return make_api_call(client, operation_name, api_params)
+
+    BaseClient._make_api_call = counted
+    return calls
+
+
+def run_phase(phase, scale):
+    sys.path.insert(0, REPO_ROOT)
+    import local_backend
+    local_backend.activate()
+    calls = count_api_calls()
+
+    import North_Korean_Cloud_Nightmare as cli
+
+    spec_path = os.path.join(local_backend.STATE_DIR, "benchmark-s3-spec.json")
+    with open(spec_path, "w") as file:
+        json.dump(S3_SPEC, file)
+
+    start_time = time.perf_counter()
+    if phase == "deploy":
+        passed = cli.ensure_pulumi_stack() and bool(cli.forrester_scenario_execute())
+    elif phase == "seed":
+        _, bucket_summary = cli.forrester_scenario_seed_data(rows=SCALES[scale]["rows"],
+                                                             s3_objects=SCALES[scale]["objects"], s3_spec=spec_path)
+        passed = not bucket_summary or not bucket_summary["failures"]
+    elif phase == "validate":
+        passed = cli.forrester_scenario_validate_data()
+    elif phase == "show":
+        passed = cli.show_deployed_resources()
+    else:
+        from clean_up import full_cleanup
+        # Fails the phase when the post-cleanup verification finds leftovers or cannot run
+        passed = full_cleanup()
+    wall_seconds = time.perf_counter() - start_time
+
+    # ru_maxrss is in KiB on Linux
+    result = {
+        "passed": bool(passed),
+        "wall_seconds": round(wall_seconds, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_child_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        "python_api_calls": dict(calls.most_common()),
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# --------------------------------------------------------------------------- #
+# Driver
+# --------------------------------------------------------------------------- #
+
+def emulator_requests():
+    """Requests the emulator has served so far (one werkzeug access-log line each)"""
+    sys.path.insert(0, REPO_ROOT)
+    import local_backend
+    try:
+        with open(local_backend.LOG_PATH, "r", errors="replace") as file:
+            return sum(1 for line in file if '" ' in line and " HTTP/1.1" in line and "/moto-api/" not in line)
+    except FileNotFoundError:
+        return 0
+
+
+def measure(phase, scale, verbose):
+    before = emulator_requests()
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-phase", phase, "--scale", scale],
+        capture_output=True, text=True, cwd=REPO_ROOT
+    )
+    result_lines = [line for line in process.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+    if verbose or process.returncode != 0 or not result_lines:
+        print(process.stdout)
+        print(process.stderr)
+    if process.returncode != 0 or not result_lines:
+        return {"passed": False, "error": f"phase exited with code {process.returncode}"}
+    result = json.loads(result_lines[-1][len(RESULT_PREFIX):])
+    result["api_calls"] = emulator_requests() - before
+    return result
+
+
+def baseline_path(scale):
+    return os.path.join(BASELINE_DIR, f"lifecycle-{scale}.json")
+
+
+def load_baseline(scale):
+    try:
+        with open(baseline_path(scale), "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(scale, results):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(scale), "w") as file:
+        json.dump({"scale": SCALES[scale], "phases": results}, file, indent=2, sort_keys=True)
+
+
+def regressions(result, baseline):
+    """Metrics of one phase that grew past their budget"""
+    found = []
+    for metric, ratio in BUDGETS.items():
+        if metric not in baseline or metric not in result:
+            continue
+        limit = max(baseline[metric] * ratio, baseline[metric] + NOISE_FLOOR[metric])
+        if result[metric] > limit:
+            found.append(f"{metric} {result[metric]} > {round(limit, 2)} (baseline {baseline[metric]})")
+    return found
+
+
+def run_scale(scale, update_baseline, verbose):
+    """Run every phase at one scale. Returns (results, failures)."""
+    baseline = None if update_baseline else load_baseline(scale)
+    if baseline is None and not update_baseline:
+        problem = (f"no baseline at {os.path.relpath(baseline_path(scale), REPO_ROOT)}; "
+                   "record one with --update-baseline")
+        print(f"FAIL  {scale:<5} {problem}")
+        return {}, [f"{scale}: {problem}"]
+
+    results = {}
+    failures = []
+
+    for phase in PHASES:
+        result = measure(phase, scale, verbose)
+        results[phase] = result
+        problems = [] if result["passed"] else [result.get("error", "phase reported failure")]
+        if baseline and result["passed"]:
+            if phase in baseline["phases"]:
+                problems += regressions(result, baseline["phases"][phase])
+            else:
+                problems.append("no baseline for this phase; record one with --update-baseline")
+
+        status = "FAIL" if problems else "ok  "
+        if "wall_seconds" in result:
+            print(f"{status}  {scale:<5} {phase:<9} {result['wall_seconds']:>9.2f} s  "
+                  f"{result['api_calls']:>8} calls  rss {result['peak_rss_mb']:>7.1f} MB "
+                  f"(child {result['peak_child_rss_mb']:.1f} MB)")
+        else:
+            print(f"{status}  {scale:<5} {phase:<9}")
+        for problem in problems:
+            print(f"        {problem}")
+            failures.append(f"{scale}/{phase}: {problem}")
+        if not result["passed"]:
+            # Later phases depend on this one
+            break
+
+    if not failures and update_baseline:
+        save_baseline(scale, results)
+        print(f"      baseline written to {os.path.relpath(baseline_path(scale), REPO_ROOT)}")
+    return results, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lab lifecycle benchmark against the local backend")
+    parser.add_argument("--scale", choices=list(SCALES), action="append",
+                        help="Data scale to run (repeatable, default: 1k)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record these results as the new baseline instead of checking against it")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Show each phase's console output")
+    parser.add_argument("--run-phase", choices=PHASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_phase:
+        run_phase(args.run_phase, (args.scale or ["1k"])[0])
+        return
+
+    all_results = {}
+    all_failures = []
+    for scale in args.scale or ["1k"]:
+        all_results[scale], failures = run_scale(scale, args.update_baseline, args.verbose)
+        all_failures += failures
+
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump({"results": all_results, "failures": all_failures}, file, indent=2)
+
+    sys.exit(1 if all_failures else 0)
+
+
+if __name__ == "__main__":
+    main()
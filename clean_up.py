@@ -1,18 +1,40 @@
 import boto3
 import json
-import subprocess
 import time
 from datetime import datetime, timezone
 import os
 import shutil
 import sys
 from termcolor import colored
-from Load_Pulumi_Outputs import get_infrastructure_output
+from Load_Pulumi_Outputs import infrastructure_outputs
+import pulumi_workspace
+from pulumi.automation import errors
+from iam_teardown import IAMTeardown, print_summary as print_teardown_summary
+from lab_index import LabIndex, print_leftovers
+import aws_profiles
+import clock
+import local_backend
+import tracing
 
-# Initialize AWS clients
-iam_client = boto3.client("iam")
-s3_client = boto3.client("s3")
-dynamodb_client = boto3.client("dynamodb")
+# AWS clients are created on first use, not at import time
+_clients = {}
+
+
+def get_client(service):
+    """Shared boto3 client for a service, created on first use"""
+    if service not in _clients:
+        _clients[service] = boto3.client(service)
+    return _clients[service]
+
+
+# Pulumi outputs holding the ARNs of the DevOps users created by the stack
+DEVOPS_USER_OUTPUTS = [
+    "devops_user_arn",
+    "devops_monitor_arn",
+    "devops_automation_arn",
+    "devops_deploy_arn",
+    "devops_pipeline_arn"
+]
 
 
 
@@ -24,136 +46,42 @@ class Cleanup:
 
     class CleanUser:
         def __init__(self, user: str, region="us-east-1"):
-            """Initialize AWS Clients for a specific IAM user"""
-            self.iam_client = boto3.client("iam", region_name=region)
+            """IAM user to tear down"""
+            self.region = region
             self.user = user
 
-        def remove_mfa_devices(self):
-            """ Remove all MFA devices for the user"""
-            try:
-                response = self.iam_client.list_mfa_devices(UserName=self.user)
-                for device in response.get("MFADevices", []):
-                    print(colored(f"  [CLEANUP] Deactivating and deleting MFA device: {device['SerialNumber']}", "yellow"))
-                    self.iam_client.deactivate_mfa_device(
-                        UserName=self.user, SerialNumber=device["SerialNumber"]
-                    )
-                    self.iam_client.delete_virtual_mfa_device(
-                        SerialNumber=device["SerialNumber"]
-                    )
-            except Exception as e:
-                print(colored(f"[ERROR] Failed to remove MFA devices: {e}", "red"))
-
-        def delete_access_keys(self):
-            """ Delete all access keys for the user"""
-            try:
-                response = self.iam_client.list_access_keys(UserName=self.user)
-                for key in response.get("AccessKeyMetadata", []):
-                    print(colored(f"  [CLEANUP] Deleting access key: {key['AccessKeyId']}", "yellow"))
-                    self.iam_client.delete_access_key(
-                        UserName=self.user, AccessKeyId=key["AccessKeyId"]
-                    )
-            except Exception as e:
-                print(colored(f"[ERROR] Failed to delete access keys: {e}", "red"))
-
-        def delete_login_profile(self):
-            """ Delete IAM Console Login Profile"""
-            try:
-                print(colored(f"  [CLEANUP] Deleting login profile for `{self.user}` (if exists)...", "yellow"))
-                self.iam_client.delete_login_profile(UserName=self.user)
-            except self.iam_client.exceptions.NoSuchEntityException:
-                print(colored(f"  [INFO] No login profile found for `{self.user}`.", "cyan"))
-            except Exception as e:
-                print(colored(f"[ERROR] Failed to delete login profile: {e}", "red"))
-
-
-
-        def detach_policies(self):
-            """ Detach all attached IAM policies from the user"""
-            try:
-                response = self.iam_client.list_attached_user_policies(UserName=self.user)
-                for policy in response.get("AttachedPolicies", []):
-                    print(colored(f"  [CLEANUP] Detaching policy: {policy['PolicyArn']}", "yellow"))
-                    self.iam_client.detach_user_policy(
-                        UserName=self.user, PolicyArn=policy["PolicyArn"]
-                    )
-            except Exception as e:
-                print(colored(f"[ERROR] Failed to detach policies: {e}", "red"))
-
-
-        def delete_inline_policies(self):
-            """ Delete all inline policies attached to the user"""
-            try:
-                response = self.iam_client.list_user_policies(UserName=self.user)
-                for policy_name in response.get("PolicyNames", []):
-                    print(colored(f"  [CLEANUP] Deleting inline policy `{policy_name}` from `{self.user}`...", "yellow"))
-                    self.iam_client.delete_user_policy(UserName=self.user, PolicyName=policy_name)
-            except Exception as e:
-                print(colored(f"[ERROR] Failed to delete inline policies: {e}", "red"))
-
-
-
-
-        def remove_from_groups(self):
-            """ Remove user from all IAM groups"""
-            try:
-                response = self.iam_client.list_groups_for_user(UserName=self.user)
-                for group in response.get("Groups", []):
-                    print(colored(f"  [CLEANUP] Removing `{self.user}` from group: {group['GroupName']}", "yellow"))
-                    self.iam_client.remove_user_from_group(
-                        UserName=self.user, GroupName=group["GroupName"]
-                    )
-            except Exception as e:
-                print(colored(f"[ERROR] Failed to remove user from groups: {e}", "red"))
-
-        def delete_user(self):
-            """Final step: Delete IAM user"""
-            try:
-                print(colored(f"\n  [CLEANUP] Deleting IAM user: `{self.user}`...", "yellow"))
-                self.iam_client.delete_user(UserName=self.user)
-                print(colored(f"  [SUCCESS] `{self.user}` deleted successfully!", "green"))
-            except Exception as e:
-                print(colored(f"[ERROR] Failed to delete `{self.user}`: {e}", "red"))
-
         def execute_cleanup(self):
-            """Full cleanup workflow for the user"""
+            """Full cleanup workflow for the user (MFA, keys, login profile, policies, groups, then the user)"""
             print(colored(f"\n[PHASE] Starting cleanup for `{self.user}`...", "cyan", attrs=["bold"]))
-            self.remove_mfa_devices()
-            self.delete_access_keys()
-            self.delete_login_profile()
-            self.detach_policies()
-            self.delete_inline_policies()
-            self.remove_from_groups()
-            self.delete_user()
-            print(colored("\n[SUCCESS] Cleanup completed successfully!", "green", attrs=["bold"]))
-
-        @classmethod
-        def list_matching_users(cls, prefix):
-            """Fetch all IAM users and return a list of users containing the prefix"""
-            iam_client = boto3.client("iam")
-            try:
-                users = iam_client.list_users()["Users"]
-                matching_users = [user["UserName"] for user in users if prefix in user["UserName"]]
-                return matching_users
-            except Exception as e:
-                print(colored(f"[ERROR] Unable to list users: {e}", "red"))
-                return []
+            summary = IAMTeardown(region=self.region).teardown([self.user])
+            print_teardown_summary(summary)
+            return not summary["failures"]
 
 
-        # Cleanup users matching 'run_while_u_can'
-        def cleanup_dynamic_users(self):
-            matching_users = self.list_matching_users()
-            if not matching_users:
-                print(colored("[INFO] No users found matching the pattern 'run_while_u_can'.", "cyan"))
-                return
 
-            print(colored(f"[INFO] Found {len(matching_users)} users matching 'run_while_u_can'.", "cyan"))
-            for user in matching_users:
-                clean_user = Cleanup.CleanUser(user=user)
-                clean_user.execute_cleanup()
-                print(colored(f"\n[SUCCESS] Deleted all information for `{user}`.", "green", attrs=["bold"]))
 
+# Stack resource types the attack (or the user teardown above it) changes behind Pulumi's back:
+# the trail and detector are stopped/deleted, tables dropped, MFA devices and users deleted.
+# Only these need refreshing before destroy; everything else in state is still accurate.
+DRIFT_TYPES = {
+    "aws:cloudtrail/trail:Trail",
+    "aws:guardduty/detector:Detector",
+    "aws:dynamodb/table:Table",
+    "aws:iam/virtualMfaDevice:VirtualMfaDevice",
+    "aws:iam/user:User",
+    "aws:iam/accessKey:AccessKey",
+    "aws:iam/userPolicy:UserPolicy",
+    "aws:iam/userPolicyAttachment:UserPolicyAttachment",
+}
+# Concurrent resource operations during destroy (the CLI default is far lower)
+DESTROY_PARALLEL = 64
 
 
+# AWS CLI profiles the attack writes
+LAB_PROFILES = ["devopsuser", "run_while_u_can"]
+# Credential variables cleanup unsets
+AWS_ENV_VARS = ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"]
+
 
 class AWSProfileCleanup:
     """🧹 Cleans AWS CLI Profiles & Session Tokens"""
@@ -161,28 +89,32 @@ class AWSProfileCleanup:
 
     @staticmethod
     def clear_env_vars():
-        """Unset AWS environment variables"""
+        """Unset AWS environment variables (the local emulator's dummy credentials are put back)"""
         print(colored("\n[PHASE] Clearing AWS environment variables...", "cyan", attrs=["bold"]))
-        for var in ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"]:
+        emulator = local_backend.emulator_credentials()
+        for var in AWS_ENV_VARS:
             os.environ.pop(var, None)
+        # Under --backend local these are the backend itself, and destroy/verify still need them
+        os.environ.update(emulator)
 
     @staticmethod
     def remove_aws_profiles():
         """Remove AWS CLI profiles from ~/.aws/credentials & ~/.aws/config"""
         print(colored("\n[PHASE] Removing AWS CLI profiles...", "cyan", attrs=["bold"]))
 
-        profiles = ["devopsuser", "run_while_u_can"]
-        for profile in profiles:
-            print(colored(f"  [CLEANUP] Removing AWS profile: {profile}", "yellow"))
-            subprocess.run(f"aws configure set aws_access_key_id '' --profile {profile}", shell=True)
-            subprocess.run(f"aws configure set aws_secret_access_key '' --profile {profile}", shell=True)
-            subprocess.run(f"aws configure set aws_session_token '' --profile {profile}", shell=True)
-
-            # Remove profile from AWS credentials and config files
-            subprocess.run(f"sed -i '/\\[{profile}\\]/,/^$/d' ~/.aws/credentials", shell=True)
-            subprocess.run(f"sed -i '/\\[{profile}\\]/,/^$/d' ~/.aws/config", shell=True)
+        start_time = time.perf_counter()
+        removed = aws_profiles.remove_profiles(LAB_PROFILES)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
 
-        print(colored("[SUCCESS] AWS profiles removed.", "green"))
+        for path, sections in removed.items():
+            for section in sections:
+                print(colored(f"  [CLEANUP] Removed [{section}] from {path}", "yellow"))
+        if not removed:
+            print(colored(f"[INFO] No lab profiles found ({', '.join(LAB_PROFILES)}) - checked in {elapsed_ms:.1f}ms.", "cyan"))
+            return
+        # The aws/sed version launched 5 subprocesses per profile
+        print(colored(f"[SUCCESS] AWS profiles removed in {elapsed_ms:.1f}ms "
+                      f"(in-process, {5 * len(LAB_PROFILES)} aws/sed subprocesses avoided).", "green"))
 
     @staticmethod
     def clear_aws_cache():
@@ -196,26 +128,80 @@ class AWSProfileCleanup:
             print(colored("[INFO] No AWS CLI cache found.", "cyan"))
 
     @staticmethod
-    def verify_cleanup():
-        """Verify AWS cleanup"""
+    def verify_cleanup(index=None):
+        """Verify AWS cleanup: no lab credentials left locally, no lab resources left in the account"""
         print(colored("\n[VERIFICATION] Verifying AWS cleanup...", "magenta", attrs=["bold"]))
-        subprocess.run("aws configure list", shell=True)
-        subprocess.run("aws sts get-caller-identity", shell=True)
+        clean = True
+
+        emulator = local_backend.emulator_credentials()
+        leftover_vars = [var for var in AWS_ENV_VARS if os.environ.get(var) and os.environ[var] != emulator.get(var)]
+        if leftover_vars:
+            print(colored(f"[WARNING] AWS environment variables still set: {', '.join(leftover_vars)}", "yellow"))
+            clean = False
+
+        for path, sections in aws_profiles.find_profiles(LAB_PROFILES).items():
+            print(colored(f"[WARNING] Lab profiles still in {path}: {', '.join(sections)}", "yellow"))
+            clean = False
+
+        try:
+            identity = get_client("sts").get_caller_identity()
+            print(colored(f"[INFO] Verifying as {identity['Arn']} (account {identity['Account']})", "cyan"))
+        except Exception as e:
+            print(colored(f"[ERROR] Unable to verify AWS identity: {e}", "red"))
+            return False
+
+        index = index or LabIndex()
+        return print_leftovers(index.sweep()) and clean
 
 
 
+PROJECT_DIR = "/workspaces/North_Korean_Cloud_Nightmare"
+# Trees the cache scan never descends into (virtualenvs are also detected by their pyvenv.cfg)
+CACHE_SCAN_EXCLUDES = {"venv", ".venv", ".git", "node_modules", ".pulumi"}
+
+
 class SystemCacheCleanup:
     """ Purges Python & System Caches"""
 
     @staticmethod
-    def remove_python_cache():
-        """Remove Python cache (`__pycache__` & compiled files)"""
+    def find_python_caches(root=PROJECT_DIR, excludes=CACHE_SCAN_EXCLUDES):
+        """`__pycache__` dirs under root, pruning excluded trees. Returns (caches, dirs scanned, pruned trees)."""
+        caches, pruned = [], []
+        scanned = 0
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            scanned += 1
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            if directory != root and any(entry.name == "pyvenv.cfg" for entry in entries):
+                pruned.append(directory)
+                continue
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if entry.name == "__pycache__":
+                    caches.append(entry.path)
+                elif entry.name in excludes:
+                    pruned.append(entry.path)
+                else:
+                    pending.append(entry.path)
+        return caches, scanned, pruned
+
+    @staticmethod
+    def remove_python_cache(root=PROJECT_DIR):
+        """Remove Python cache (`__pycache__` & compiled files) outside virtualenvs and other excluded trees"""
         print(colored("\n[CLEANUP] Removing Python cache...", "yellow"))
-        for root, dirs, files in os.walk("/workspaces/North_Korean_Cloud_Nightmare"):
-            for dir_name in dirs:
-                if dir_name == "__pycache__":
-                    shutil.rmtree(os.path.join(root, dir_name))
-        print(colored("[SUCCESS] Python cache cleared.", "green"))
+        start_time = time.perf_counter()
+        caches, scanned, pruned = SystemCacheCleanup.find_python_caches(root)
+        for cache in caches:
+            shutil.rmtree(cache, ignore_errors=True)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        skipped = ", ".join(os.path.relpath(path, root) for path in pruned) or "nothing"
+        print(colored(f"[SUCCESS] Python cache cleared: {len(caches)} directories removed, {scanned} scanned "
+                      f"in {elapsed_ms:.1f}ms (skipped {skipped}).", "green"))
 
 
 def delete_enum_folder():
@@ -256,6 +242,7 @@ def delete_dynamo_exfil_folder():
 def delete_too_late_table():
     """Deletes the 'too_late' DynamoDB table if it exists."""
     table_name = "too_late"
+    dynamodb_client = get_client("dynamodb")
 
     try:
         # Check if the table exists
@@ -270,7 +257,7 @@ def delete_too_late_table():
         while True:
             try:
                 dynamodb_client.describe_table(TableName=table_name)
-                time.sleep(5)  # Wait and retry
+                clock.poll_sleep(5, f"waiting for {table_name} deletion")  # Wait and retry
             except dynamodb_client.exceptions.ResourceNotFoundException:
                 print(colored(f"[SUCCESS] Table '{table_name}' fully deleted.", "green"))
                 break
@@ -389,11 +376,63 @@ def delete_too_late_table():
 #     print('Running: "pulumi stack output --json | jq" to make sure all Infra is destroyed')
 #     subprocess.call("cd /workspaces/North_Korean_Cloud_Nightmare/Infra && pulumi stack output --json | jq", shell=True)
 
-def full_cleanup():
+def teardown_infrastructure(full_refresh=False):
+    """Refresh what drifted (or the whole stack with full_refresh), then destroy with maximum parallelism"""
+    start_time = time.time()
+
+    if full_refresh:
+        targets = None
+        print(colored("[INFO] Refreshing the whole Pulumi stack...", "cyan"))
+    else:
+        targets = [resource["urn"] for resource in pulumi_workspace.stack_resources()
+                   if resource["type"] in DRIFT_TYPES]
+        print(colored(f"[INFO] Refreshing {len(targets)} resources the scenario mutates...", "cyan"))
+
+    refresh_events = pulumi_workspace.TimedEngineEventPrinter()
+    if targets is None or targets:
+        pulumi_workspace.refresh(on_event=refresh_events, target=targets)
+    refresh_events.print_timings("Refresh")
+    refresh_seconds = time.time() - start_time
+
+    print(colored("\n[INFO] Destroying infrastructure...", "cyan"))
+    destroy_events = pulumi_workspace.TimedEngineEventPrinter()
+    try:
+        # continue_on_error: one stuck resource does not stop the rest from being deleted
+        pulumi_workspace.destroy(on_event=destroy_events, parallel=DESTROY_PARALLEL)
+        destroyed = True
+    except errors.CommandError as e:
+        print(colored(f"[ERROR] Destroy finished with errors: {str(e).strip().splitlines()[-1]}", "red"))
+        destroyed = False
+    destroy_events.print_timings("Destroy")
+
+    total_seconds = time.time() - start_time
+    print(colored(f"\n[INFO] Teardown took {total_seconds:.1f}s "
+                  f"(refresh {refresh_seconds:.1f}s, destroy {total_seconds - refresh_seconds:.1f}s)", "cyan"))
+    return destroyed and not destroy_events.failures
+
+
+def archive_cloudtrail_logs():
+    """Ingest the trail bucket into the local CloudTrail index and verify its digests before destroy deletes it (best effort)"""
+    from cloudtrail_digest import verify_lab_trail
+    from cloudtrail_ingest import ingest_lab_trail
+
+    try:
+        ingest_lab_trail(infrastructure_outputs.as_dict())
+    except Exception as e:
+        print(colored(f"[WARNING] Could not archive CloudTrail logs before destroy: {e}", "yellow"))
+    try:
+        verify_lab_trail(infrastructure_outputs.as_dict())
+    except Exception as e:
+        print(colored(f"[WARNING] Could not verify CloudTrail digests before destroy: {e}", "yellow"))
+
+
+@tracing.traced()
+def full_cleanup(full_refresh=False):
     """
     Deploys cleanup opposite of run time sequence.
     First, attack python wrapper - boto3
     Then, all infrastructure resource rollouts
+    Returns True when the post-cleanup verification passes
     """
 
     print(colored("═" * 60, "red"))
@@ -401,81 +440,80 @@ def full_cleanup():
     print(colored("═" * 60, "red"))
 
     # Step 1: Delete the ransomware table ("too_late")
+    tracing.step("step 1: ransomware table")
     print(colored("\n[STEP 1] DynamoDB Ransomware Table Cleanup", "magenta", attrs=["bold"]))
     print(colored("-" * 50, "magenta"))
     delete_too_late_table()
     print(colored("\n[SUCCESS] Deleted 'too_late' table from DynamoDB\n", "green", attrs=["bold"]))
 
-    # Step 2: Cleanup DevOps Users
-    print(colored("\n[STEP 2] DevOps User Cleanup", "magenta", attrs=["bold"]))
+    # Step 2: Tear down every lab IAM user concurrently
+    tracing.step("step 2: iam users")
+    print(colored("\n[STEP 2] DevOps & Malicious User Cleanup", "magenta", attrs=["bold"]))
     print(colored("-" * 50, "magenta"))
-    users = [
-        "devops_user_arn",
-        "devops_monitor_arn",
-        "devops_automation_arn",
-        "devops_deploy_arn",
-        "devops_pipeline_arn"
-    ]
-
-    for user_key in users:
-        user_arn = get_infrastructure_output(user_key)
-        user = user_arn.split("/")[-1]  # Extracts the username
-        clean_user = Cleanup.CleanUser(user=user)
-        clean_user.execute_cleanup()
-        print(colored(f"\n[SUCCESS] Deleted all {user} information\n", "green", attrs=["bold"]))
-
-
-    # Step 3: Cleanup additional IAM user
-    print(colored("\n[STEP 3] Malicious User Cleanup", "magenta", attrs=["bold"]))
-    print(colored("-" * 50, "magenta"))
-    run_while_u_can = Cleanup.CleanUser.list_matching_users(prefix="run_while_u_can")
-    if run_while_u_can:
-        print(colored(f"[INFO] Found {len(run_while_u_can)} users matching 'run_while_u_can'.", "cyan"))
-        for user in run_while_u_can:
-            clean_user = Cleanup.CleanUser(user=user)
-            clean_user.execute_cleanup()
-            print(colored(f"[SUCCESS] Deleted all information for `{user}`.", "green", attrs=["bold"]))
+    # Only this stack's run: other stacks in the account share the lab path prefix and tags
+    run_id = infrastructure_outputs.get_optional("lab_run_id")
+    if not run_id:
+        print(colored("[WARNING] Stack has no 'lab_run_id' output (deployed before run paths); "
+                      "only users directly under the lab path are swept.", "yellow"))
+    index = LabIndex(run_id=run_id)
+    lab_users = [user["name"] for user in index.iam_users()]
+    print(colored(f"[INFO] Found {len(lab_users)} IAM users under {index.path}.", "cyan"))
+    # Stacks deployed before lab paths existed keep their DevOps users at '/'
+    users = lab_users + [infrastructure_outputs.get_user_name(user_key) for user_key in DEVOPS_USER_OUTPUTS]
+
+    summary = IAMTeardown().teardown(users)
+    print_teardown_summary(summary)
+    if summary["failures"]:
+        print(colored("\n[WARNING] Some IAM users could not be deleted; Pulumi destroy will retry the DevOps users\n", "yellow"))
     else:
-        print(colored("[INFO] No users found matching 'run_while_u_can'.", "cyan"))
+        print(colored("\n[SUCCESS] Deleted all DevOps and malicious IAM users\n", "green", attrs=["bold"]))
 
 
-    # Step 4: Cleanup AWS credentials, profiles, and cache
-    print(colored("\n[STEP 4] AWS Credentials & Profile Cleanup", "magenta", attrs=["bold"]))
+    # Step 3: Cleanup AWS credentials, profiles, and cache
+    tracing.step("step 3: credentials & profiles")
+    print(colored("\n[STEP 3] AWS Credentials & Profile Cleanup", "magenta", attrs=["bold"]))
     print(colored("-" * 50, "magenta"))
     AWSProfileCleanup.clear_env_vars()
     AWSProfileCleanup.remove_aws_profiles()
     AWSProfileCleanup.clear_aws_cache()
     print(colored("\n[SUCCESS] Deleted AWS env_vars, profiles, & cache\n", "green", attrs=["bold"]))
 
-    # Step 5: Delete Attack Artifacts
-    print(colored("\n[STEP 5] Attack Artifacts Cleanup", "magenta", attrs=["bold"]))
+    # Step 4: Delete Attack Artifacts
+    tracing.step("step 4: attack artifacts")
+    print(colored("\n[STEP 4] Attack Artifacts Cleanup", "magenta", attrs=["bold"]))
     print(colored("-" * 50, "magenta"))
     delete_enum_folder()
     delete_s3_exfil_folder()
     delete_dynamo_exfil_folder()
     print(colored("\n[SUCCESS] Deleted Attack Results Folders\n", "green", attrs=["bold"]))
 
-    # Step 6: Verify cleanup
-    print(colored("\n[STEP 6] Post-Cleanup Verification", "magenta", attrs=["bold"]))
+    # Step 5: Destroy Infrastructure Deployment
+    tracing.step("step 5: destroy")
+    print(colored("\n[STEP 5] Infrastructure Destruction", "magenta", attrs=["bold"]))
     print(colored("-" * 50, "magenta"))
-    AWSProfileCleanup.verify_cleanup()
-    print(colored("\n[SUCCESS] Post Deployment Cleanup verified successfully\n", "green", attrs=["bold"]))
+    archive_cloudtrail_logs()
+    if teardown_infrastructure(full_refresh=full_refresh):
+        print(colored("\n[SUCCESS] Infrastructure Deployment cleaned up successfully\n", "green", attrs=["bold"]))
+    else:
+        print(colored("\n[WARNING] Some resources failed to delete; the leftover check below lists them\n", "yellow"))
 
-    # Step 7: Destroy Infrastructure Deployment
-    print(colored("\n[STEP 7] Infrastructure Destruction", "magenta", attrs=["bold"]))
+    # Step 6: Verify cleanup (after destroy, so anything the lab index still finds is a leak)
+    tracing.step("step 6: verify")
+    print(colored("\n[STEP 6] Post-Cleanup Verification", "magenta", attrs=["bold"]))
     print(colored("-" * 50, "magenta"))
-    print(colored("[INFO] Refreshing Pulumi state...", "cyan"))
-    subprocess.call("cd /workspaces/North_Korean_Cloud_Nightmare/Infra && pulumi refresh -s dev -y", shell=True)
-    print(colored("\n[INFO] Destroying infrastructure...", "cyan"))
-    subprocess.call("cd /workspaces/North_Korean_Cloud_Nightmare/Infra && pulumi destroy -s dev -y", shell=True)
-    print(colored("\n[SUCCESS] Infrastructure Deployment cleaned up successfully\n", "green", attrs=["bold"]))
+    verified = AWSProfileCleanup.verify_cleanup(index)
+    if verified:
+        print(colored("\n[SUCCESS] Post Deployment Cleanup verified successfully\n", "green", attrs=["bold"]))
+    else:
+        print(colored("\n[WARNING] Cleanup left resources or credentials behind (see above)\n", "yellow", attrs=["bold"]))
 
     print(colored("═" * 60, "green"))
     print(colored("    CLEANUP COMPLETE - ATTACK VANISHED!", "green", attrs=["bold"]))
     print(colored("═" * 60, "green"))
 
-    print(colored('\n[VERIFICATION] Running: "pulumi stack output --json | jq" to verify destruction', "magenta"))
-    subprocess.call("cd /workspaces/North_Korean_Cloud_Nightmare/Infra && pulumi stack output --json | jq", shell=True)
+    print(colored('\n[VERIFICATION] Remaining stack outputs (expected: none)', "magenta"))
+    print(json.dumps(pulumi_workspace.stack_outputs(), indent=2))
+    return verified
 
 
 
@@ -0,0 +1,138 @@
+"""
+Scenario Clock
+
+Every scripted wait in the scenario (attack pacing, progress bars, IAM and
+MFA propagation waits) goes through `clock.sleep()`, and every wait between
+polls of AWS state (table status, readiness) through `clock.poll_sleep()`.
+
+Live runs use the real clock. `--rehearsal` swaps in a virtual clock: sleeps
+return immediately and advance virtual time instead, and each one is logged,
+so a rehearsal against the local emulator finishes in seconds while still
+producing the timeline the live demo would have had (real work time plus
+every wait it skipped).
+
+Poll waits are real on both clocks: the state they wait for changes on AWS's
+time, not the scenario's, and skipping them would only spin the loop through
+its timeout. Against the emulator the resources settle on the first poll, so
+rehearsals rarely sit through one.
+"""
+
+import json
+import threading
+import time
+
+from termcolor import colored
+
+
+TIMELINE_PATH = "/workspaces/North_Korean_Cloud_Nightmare/Infra/rehearsal-timeline.json"
+
+
+class RealClock:
+    """Wall-clock time and real sleeps (live runs)"""
+
+    virtual = False
+
+    def now(self):
+        return time.time()
+
+    def sleep(self, seconds, reason=None):
+        time.sleep(seconds)
+
+    def poll_sleep(self, seconds, reason=None):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Sleeps advance virtual time instantly; now() is real time plus every skipped wait"""
+
+    virtual = True
+
+    def __init__(self):
+        self.started = time.time()
+        self.skipped = 0.0
+        self.timeline = []
+        self._lock = threading.Lock()
+
+    def now(self):
+        return time.time() + self.skipped
+
+    def sleep(self, seconds, reason=None):
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.timeline.append({
+                "at": round(self.now() - self.started, 3),
+                "seconds": seconds,
+                "reason": reason or "wait",
+            })
+            self.skipped += seconds
+
+    def poll_sleep(self, seconds, reason=None):
+        """Wait between polls of external state in real time (logged, not skipped)"""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.timeline.append({
+                "at": round(self.now() - self.started, 3),
+                "seconds": seconds,
+                "reason": reason or "poll",
+                "real": True,
+            })
+        time.sleep(seconds)
+
+    def summary(self):
+        return {
+            "live_seconds": round(self.now() - self.started, 1),
+            "rehearsal_seconds": round(time.time() - self.started, 1),
+            "skipped_seconds": round(self.skipped, 1),
+            "waits": self.timeline,
+        }
+
+
+_clock = RealClock()
+
+
+def get_clock():
+    return _clock
+
+
+def use_virtual_clock():
+    """Switch the whole process to a virtual clock (rehearsal mode). Returns it."""
+    global _clock
+    _clock = VirtualClock()
+    return _clock
+
+
+def is_virtual():
+    return _clock.virtual
+
+
+def now():
+    return _clock.now()
+
+
+def sleep(seconds, reason=None):
+    _clock.sleep(seconds, reason)
+
+
+def poll_sleep(seconds, reason=None):
+    """Wait before polling AWS state again; never skipped, even in rehearsal mode"""
+    _clock.poll_sleep(seconds, reason)
+
+
+def print_timeline(path=TIMELINE_PATH):
+    """Print and save the live-run timeline a rehearsal recorded (no-op on the real clock)"""
+    if not _clock.virtual:
+        return None
+    summary = _clock.summary()
+    print(colored("\n[REHEARSAL] Timeline of a live run:", "cyan", attrs=["bold"]))
+    for wait in summary["waits"]:
+        minutes, seconds = divmod(wait["at"], 60)
+        kind = "poll" if wait.get("real") else "wait"
+        print(colored(f"  +{int(minutes):02d}:{seconds:05.2f}  {kind} {wait['seconds']:>5g}s  {wait['reason']}", "cyan"))
+    print(colored(f"[REHEARSAL] A live run would take {summary['live_seconds']}s; this rehearsal took "
+                  f"{summary['rehearsal_seconds']}s ({summary['skipped_seconds']}s of waits skipped)", "cyan"))
+    with open(path, "w") as file:
+        json.dump(summary, file, indent=2)
+    print(colored(f"[REHEARSAL] Timeline written to {path}", "cyan"))
+    return summary
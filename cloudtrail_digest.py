@@ -0,0 +1,450 @@
+"""
+CloudTrail Digest Validation
+
+Proves after a demo which trail log files were tampered with or deleted, and
+when logging stopped. The lab trail writes hourly digest files (log file
+validation). Each digest lists the SHA-256 of every log file delivered in its
+hour, links to the previous digest by hash and signature, and is itself signed
+by CloudTrail (SHA256withRSA, public keys from ListPublicKeys).
+
+- Digest files and log files are fetched and hashed in a process pool, and
+  digest signatures are checked there too. Log files are hashed as they
+  stream in, so nothing is held in memory.
+- Results go to the local CloudTrail index (digests, log_integrity), and digest
+  listing resumes after the last verified key per region. A re-run therefore
+  only verifies digests and log files delivered since the previous one;
+  `rescan` re-verifies everything.
+- The chain is evaluated per region over every digest seen so far. The gap
+  report lists broken links, missing digests and logging gaps, plus tampered,
+  missing and unreferenced log files, aligned to the phases of the latest
+  attack run.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from termcolor import colored
+
+from cloudtrail_ingest import DB_PATH, LOG_ROOT, open_index
+
+
+REPORT_PATH = "/workspaces/North_Korean_Cloud_Nightmare/Infra/cloudtrail-integrity-report.json"
+DEFAULT_WORKERS = os.cpu_count() or 4
+LOG_FILES_PER_TASK = 32
+# Digests are written hourly and delivered within about an hour
+DIGEST_INTERVAL = 3600
+GAP_TOLERANCE = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    key TEXT PRIMARY KEY,
+    bucket TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    digest_start TEXT,
+    digest_end TEXT,
+    previous_key TEXT,
+    previous_hash TEXT,
+    hash TEXT,
+    signature_ok INTEGER,
+    error TEXT,
+    log_files INTEGER,
+    verified_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_digests_prefix ON digests (prefix, digest_end);
+CREATE TABLE IF NOT EXISTS log_integrity (
+    key TEXT PRIMARY KEY,
+    bucket TEXT NOT NULL,
+    digest_key TEXT NOT NULL,
+    expected_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    detail TEXT,
+    oldest_event TEXT,
+    newest_event TEXT,
+    verified_at TEXT
+);
+CREATE TABLE IF NOT EXISTS digest_checkpoints (
+    bucket TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    last_key TEXT NOT NULL,
+    PRIMARY KEY (bucket, prefix)
+);
+"""
+
+_s3_client = None
+_public_keys = None
+
+
+def _init_worker(public_keys, region):
+    """Per-process S3 client (clients aren't fork-safe) and the trail's public keys"""
+    global _s3_client, _public_keys
+    _s3_client = boto3.client("s3", region_name=region,
+                              config=Config(retries={"mode": "adaptive", "max_attempts": 10}))
+    _public_keys = public_keys
+
+
+def epoch(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def now_iso():
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def string_to_sign(digest, digest_hash):
+    """The data CloudTrail signs for a digest file"""
+    return "\n".join([
+        digest["digestEndTime"],
+        f"{digest['digestS3Bucket']}/{digest['digestS3Object']}",
+        digest_hash,
+        digest.get("previousDigestSignature") or "null",
+    ])
+
+
+def check_signature(digest, digest_hash, metadata, public_keys):
+    """(ok, error) for a digest's signature; ok is None when it can't be checked"""
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import padding
+
+    if public_keys is None:
+        return None, "public keys unavailable"
+    signature = metadata.get("signature")
+    if not signature:
+        return False, "no signature in object metadata"
+    algorithm = metadata.get("signature-algorithm", "SHA256withRSA")
+    if algorithm != "SHA256withRSA":
+        return False, f"unsupported signature algorithm {algorithm}"
+    key = public_keys.get(digest.get("digestPublicKeyFingerprint"))
+    if key is None:
+        return False, f"unknown public key {digest.get('digestPublicKeyFingerprint')}"
+    try:
+        serialization.load_der_public_key(key).verify(bytes.fromhex(signature), string_to_sign(digest, digest_hash).encode(),
+                                                      padding.PKCS1v15(), hashes.SHA256())
+    except (InvalidSignature, ValueError):
+        return False, "signature does not match"
+    return True, None
+
+
+def verify_digest(bucket, key):
+    """Worker: fetch one digest file, hash it and check its signature"""
+    try:
+        response = _s3_client.get_object(Bucket=bucket, Key=key)
+        raw = gzip.decompress(response["Body"].read())
+        digest = json.loads(raw)
+    except (ClientError, OSError, ValueError) as e:
+        return {"key": key, "error": f"unreadable digest: {e}"}
+    digest_hash = hashlib.sha256(raw).hexdigest()
+    signature_ok, error = check_signature(digest, digest_hash, response.get("Metadata", {}), _public_keys)
+    return {
+        "key": key,
+        "digest_start": digest["digestStartTime"],
+        "digest_end": digest["digestEndTime"],
+        "previous_key": digest.get("previousDigestS3Object"),
+        "previous_hash": digest.get("previousDigestHashValue"),
+        "hash": digest_hash,
+        "signature_ok": signature_ok,
+        "error": error,
+        "log_files": [
+            (log["s3Bucket"], log["s3Object"], log["hashValue"], log.get("oldestEventTime"), log.get("newestEventTime"))
+            for log in digest.get("logFiles", [])
+        ],
+    }
+
+
+def verify_log_files(files):
+    """Worker: [(bucket, key, expected_hash)] -> [(key, status, detail)] hashing the uncompressed content"""
+    results = []
+    for bucket, key, expected in files:
+        try:
+            body = _s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+            inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            sha256 = hashlib.sha256()
+            for chunk in body.iter_chunks(1 << 20):
+                sha256.update(inflater.decompress(chunk))
+            sha256.update(inflater.flush())
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            status = "missing" if code in ("NoSuchKey", "404") else "error"
+            results.append((key, status, code))
+            continue
+        except (OSError, zlib.error) as e:
+            results.append((key, "tampered", f"not a valid gzip file: {e}"))
+            continue
+        actual = sha256.hexdigest()
+        results.append((key, "valid", None) if actual == expected else (key, "tampered", f"sha256 {actual}"))
+    return results
+
+
+class DigestVerifier:
+    """Incremental, process-parallel validation of a trail bucket's digest chain and log files"""
+
+    def __init__(self, bucket, db_path=DB_PATH, session=None, region="us-east-1", workers=DEFAULT_WORKERS):
+        session = session or boto3.Session(region_name=region)
+        config = Config(retries={"mode": "adaptive", "max_attempts": 10})
+        self.s3_client = session.client("s3", config=config)
+        self.cloudtrail_client = session.client("cloudtrail", config=config)
+        self.region = session.region_name or region
+        self.bucket = bucket
+        self.db_path = db_path
+        self.workers = workers
+
+    def _common_prefixes(self, prefix):
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter="/"):
+            for common in page.get("CommonPrefixes", []):
+                yield common["Prefix"]
+
+    def _keys(self, prefix, start_after=None):
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+        if start_after:
+            kwargs["StartAfter"] = start_after
+        return [item["Key"] for page in self.s3_client.get_paginator("list_objects_v2").paginate(**kwargs)
+                for item in page.get("Contents", []) if item["Key"].endswith(".json.gz")]
+
+    def prefixes(self, folder):
+        """AWSLogs/<account>/<folder>/<region>/ prefixes"""
+        return [
+            region_prefix
+            for account_prefix in self._common_prefixes(LOG_ROOT)
+            for region_prefix in self._common_prefixes(f"{account_prefix}{folder}/")
+        ]
+
+    def public_keys(self, start, end):
+        """{fingerprint: DER key} valid between start and end, or None if they can't be listed"""
+        keys, kwargs = {}, {"StartTime": start, "EndTime": end}
+        try:
+            while True:
+                response = self.cloudtrail_client.list_public_keys(**kwargs)
+                keys.update({key["Fingerprint"]: key["Value"] for key in response.get("PublicKeyList", [])})
+                if not response.get("NextToken"):
+                    return keys
+                kwargs["NextToken"] = response["NextToken"]
+        except ClientError as e:
+            print(colored(f"[WARNING] Could not list CloudTrail public keys, skipping signature checks: {e}", "yellow"))
+            return None
+
+    def run(self, rescan=False):
+        """Verify every digest (and its log files) not verified yet. Returns a summary dict."""
+        start_time = time.time()
+        connection = open_index(self.db_path)
+        connection.executescript(SCHEMA)
+        checkpoints = {} if rescan else {
+            row["prefix"]: row["last_key"]
+            for row in connection.execute("SELECT prefix, last_key FROM digest_checkpoints WHERE bucket = ?",
+                                          (self.bucket,))
+        }
+
+        prefixes = self.prefixes("CloudTrail-Digest")
+        with ThreadPoolExecutor(max_workers=max(len(prefixes), 1)) as executor:
+            pending = dict(zip(prefixes, executor.map(lambda prefix: self._keys(prefix, checkpoints.get(prefix)),
+                                                      prefixes)))
+        new_keys = [(prefix, key) for prefix, keys in pending.items() for key in keys]
+
+        digests, log_results = [], []
+        if new_keys:
+            # Keys end in the digest's end time, e.g. ..._20261018T100512Z.json.gz
+            times = [datetime.strptime(key.rsplit("_", 1)[-1][:16], "%Y%m%dT%H%M%SZ") for _, key in new_keys]
+            public_keys = self.public_keys(min(times) - timedelta(days=1), max(times) + timedelta(days=1))
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(public_keys, self.region)) as executor:
+                digests = list(executor.map(verify_digest, [self.bucket] * len(new_keys),
+                                            [key for _, key in new_keys], chunksize=8))
+                log_files = [(bucket, key, expected) for digest in digests
+                             for bucket, key, expected, _, _ in digest.get("log_files", [])]
+                tasks = [log_files[i:i + LOG_FILES_PER_TASK] for i in range(0, len(log_files), LOG_FILES_PER_TASK)]
+                for results in executor.map(verify_log_files, tasks):
+                    log_results += results
+
+        statuses = {key: (status, detail) for key, status, detail in log_results}
+        verified_at = now_iso()
+        with connection:
+            for (prefix, key), digest in zip(new_keys, digests):
+                connection.execute(
+                    "INSERT OR REPLACE INTO digests (key, bucket, prefix, digest_start, digest_end, previous_key, "
+                    "previous_hash, hash, signature_ok, error, log_files, verified_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, self.bucket, prefix, digest.get("digest_start"), digest.get("digest_end"),
+                     digest.get("previous_key"), digest.get("previous_hash"), digest.get("hash"),
+                     None if digest.get("signature_ok") is None else int(digest["signature_ok"]),
+                     digest.get("error"), len(digest.get("log_files", [])), verified_at))
+                connection.executemany(
+                    "INSERT OR REPLACE INTO log_integrity (key, bucket, digest_key, expected_hash, status, detail, "
+                    "oldest_event, newest_event, verified_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(log_key, bucket, key, expected, *statuses[log_key], oldest, newest, verified_at)
+                     for bucket, log_key, expected, oldest, newest in digest.get("log_files", [])])
+
+            # Resume after the last digest that could be read, in key order per region
+            readable = {digest["key"] for digest in digests if "hash" in digest}
+            for prefix, keys in pending.items():
+                last_key = None
+                for key in keys:
+                    if key not in readable:
+                        break
+                    last_key = key
+                if last_key:
+                    connection.execute("INSERT OR REPLACE INTO digest_checkpoints (bucket, prefix, last_key) "
+                                       "VALUES (?, ?, ?)", (self.bucket, prefix, last_key))
+
+        referenced = {row["key"] for row in connection.execute("SELECT key FROM log_integrity WHERE bucket = ?",
+                                                              (self.bucket,))}
+        log_keys = [key for prefix in self.prefixes("CloudTrail") for key in self._keys(prefix)]
+        connection.close()
+
+        counts = {}
+        for _, status, _ in log_results:
+            counts[status] = counts.get(status, 0) + 1
+        return {
+            "bucket": self.bucket,
+            "digests": len(digests),
+            "log_files": len(log_results),
+            "statuses": counts,
+            "unreferenced": [key for key in log_keys if key not in referenced],
+            "seconds": round(time.time() - start_time, 2),
+        }
+
+
+def overlapping_phases(start, end, run):
+    """Ids of the run's phases that overlap [start, end] (end None: still open)"""
+    if run is None:
+        return []
+    end = float("inf") if end is None else end
+    return [phase["id"] for phase in run["phases"]
+            if start < epoch(phase["end"]) and end > epoch(phase["start"])]
+
+
+def chain_findings(connection, bucket, now=None):
+    """Broken links, missing digests, logging gaps and bad signatures per region, from every verified digest"""
+    now = now or time.time()
+    findings = []
+    rows = connection.execute("SELECT * FROM digests WHERE bucket = ? ORDER BY prefix, digest_end", (bucket,))
+    by_prefix = {}
+    for row in rows:
+        by_prefix.setdefault(row["prefix"], []).append(dict(row))
+
+    for prefix, digests in by_prefix.items():
+        region = prefix.rstrip("/").rsplit("/", 1)[-1]
+        keys = {digest["key"] for digest in digests}
+
+        def finding(kind, start, end, detail, key=None):
+            findings.append({"region": region, "kind": kind, "start": start, "end": end, "detail": detail, "key": key})
+
+        readable = [digest for digest in digests if digest["hash"]]
+        for digest in digests:
+            if not digest["hash"]:
+                finding("digest unreadable", None, None, digest["error"], digest["key"])
+            elif digest["signature_ok"] == 0:
+                finding("digest signature invalid", digest["digest_start"], digest["digest_end"], digest["error"],
+                        digest["key"])
+
+        if readable and readable[0]["previous_key"] and readable[0]["previous_key"] not in keys:
+            finding("digest missing", None, readable[0]["digest_start"],
+                    "digests before the first retained one are gone", readable[0]["previous_key"])
+        for previous, digest in zip(readable, readable[1:]):
+            gap = epoch(digest["digest_start"]) - epoch(previous["digest_end"]) > GAP_TOLERANCE
+            if digest["previous_key"] is None:
+                # CloudTrail starts a new chain when logging is turned back on
+                finding("logging stopped", previous["digest_end"], digest["digest_start"],
+                        "new digest chain started", digest["key"])
+            elif digest["previous_key"] != previous["key"]:
+                kind = "digest missing" if digest["previous_key"] not in keys else "chain out of order"
+                finding(kind, previous["digest_end"], digest["digest_start"], digest["previous_key"], digest["key"])
+            elif digest["previous_hash"] != previous["hash"]:
+                finding("digest modified", previous["digest_start"], previous["digest_end"],
+                        "hash doesn't match the next digest's link", previous["key"])
+            elif gap:
+                finding("digest gap", previous["digest_end"], digest["digest_start"], None, digest["key"])
+
+        if readable and now - epoch(readable[-1]["digest_end"]) > 2 * DIGEST_INTERVAL:
+            finding("no digests since", readable[-1]["digest_end"], None,
+                    "logging stopped or the trail was deleted", readable[-1]["key"])
+    return findings
+
+
+def build_report(bucket, summary, db_path=DB_PATH, run=None):
+    """Gap report over every verified digest and log file, aligned to the run's phases"""
+    connection = open_index(db_path)
+    connection.executescript(SCHEMA)
+    findings = chain_findings(connection, bucket)
+    counts = {row["status"]: row["count"] for row in connection.execute(
+        "SELECT status, COUNT(*) AS count FROM log_integrity WHERE bucket = ? GROUP BY status", (bucket,))}
+    bad_logs = [dict(row) for row in connection.execute(
+        "SELECT key, status, detail, oldest_event, newest_event FROM log_integrity "
+        "WHERE bucket = ? AND status != 'valid' ORDER BY oldest_event", (bucket,))]
+    newest_digest = connection.execute("SELECT MAX(digest_end) FROM digests WHERE bucket = ?", (bucket,)).fetchone()[0]
+    connection.close()
+
+    for log in bad_logs:
+        findings.append({"region": None, "kind": f"log file {log['status']}", "start": log["oldest_event"],
+                         "end": log["newest_event"], "detail": log["detail"], "key": log["key"]})
+    # Files newer than the newest digest simply aren't covered yet
+    for key in summary["unreferenced"]:
+        try:
+            stamp = datetime.strptime(key.rsplit("_", 2)[-2], "%Y%m%dT%H%MZ").replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        if newest_digest and stamp.timestamp() < epoch(newest_digest):
+            findings.append({"region": None, "kind": "log file unreferenced",
+                             "start": stamp.strftime("%Y-%m-%dT%H:%M:%SZ"), "end": stamp.strftime("%Y-%m-%dT%H:%M:%SZ"), "detail": "not listed in any digest", "key": key})
+
+    for item in findings:
+        start = epoch(item["start"]) if item["start"] else float("-inf")
+        end = epoch(item["end"]) if item["end"] else None
+        item["phases"] = overlapping_phases(start, end, run)
+
+    return {
+        "bucket": bucket,
+        "generated": now_iso(),
+        "run_id": run["run_id"] if run else None,
+        "log_files": counts,
+        "findings": findings,
+        "passed": not findings,
+    }
+
+
+def print_report(report, summary):
+    print(colored(f"[INFO] Verified {summary['digests']} new digest files and {summary['log_files']} log files "
+                  f"in {summary['seconds']}s", "cyan"))
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(report["log_files"].items()))
+    print(colored(f"[INFO] Log files across all digests: {counts or 'none'}", "cyan"))
+    if report["passed"]:
+        print(colored("[SUCCESS] Digest chain intact: no gaps, tampered or missing log files", "green"))
+        return
+    for item in report["findings"]:
+        span = f"{item['start'] or '?'} .. {item['end'] or 'now'}"
+        region = f"{item['region']} " if item["region"] else ""
+        phases = f" during {', '.join(item['phases'])}" if item["phases"] else ""
+        detail = f" ({item['detail']})" if item["detail"] else ""
+        print(colored(f"  [✘] {region}{item['kind']}: {span}{phases}{detail}", "red"))
+        if item["key"]:
+            print(colored(f"      {item['key']}", "white"))
+
+
+def write_report(report, path=REPORT_PATH):
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+def verify_lab_trail(outputs, db_path=DB_PATH, rescan=False):
+    """Verify the lab trail's digests and log files (from the stack outputs) and print the gap report"""
+    import run_timeline
+
+    bucket = outputs.get("cloudtrail_log_bucket")
+    if not bucket:
+        raise RuntimeError("ERROR: Stack outputs have no 'cloudtrail_log_bucket'")
+    print(colored(f"[INFO] Verifying CloudTrail digest chain in s3://{bucket}...", "cyan"))
+    summary = DigestVerifier(bucket, db_path=db_path).run(rescan=rescan)
+    runs = run_timeline.load_runs()
+    report = build_report(bucket, summary, db_path=db_path, run=runs[-1] if runs else None)
+    print_report(report, summary)
+    write_report(report)
+    print(colored(f"[INFO] Integrity report: {REPORT_PATH}", "cyan"))
+    return report
@@ -0,0 +1,304 @@
+"""
+CloudTrail Ingestion
+
+Pulls the lab trail's log files out of `cloudtrail_log_bucket` into a local
+SQLite index, so a run's events can be queried in milliseconds instead of
+grepping gzipped files by hand.
+
+- Log files are listed per account/region prefix starting from the day
+  folder of the last ingested key, minus a lookback (CloudTrail keys sort by
+  date). Files already in the index are skipped, so a re-run only fetches
+  what arrived since the previous one. The lookback also catches files
+  delivered late whose keys sort before the last ingested one.
+- New files are fetched concurrently and decompressed as they stream in.
+- Records are appended to the `events` table in one transaction per file,
+  together with the file's row in `log_files`, so an interrupted run never
+  half-ingests a file. `seq` increases with every appended event, which lets
+  downstream consumers (detection_engine) process only what is new.
+- Events are indexed by eventTime, eventName, user and source IP.
+
+The index lives outside the stack, so it survives clean_up (which ingests
+one last time before the trail bucket is destroyed).
+"""
+
+import gzip
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import boto3
+from botocore.config import Config
+from termcolor import colored
+
+
+DB_PATH = "/workspaces/North_Korean_Cloud_Nightmare/Infra/cloudtrail-index.sqlite"
+LOG_ROOT = "AWSLogs/"
+DEFAULT_WORKERS = 16
+# Late deliveries land up to about an hour behind the newest file
+LOOKBACK = timedelta(hours=1)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT UNIQUE NOT NULL,
+    event_time TEXT NOT NULL,
+    event_source TEXT,
+    event_name TEXT,
+    aws_region TEXT,
+    source_ip TEXT,
+    user_type TEXT,
+    user_name TEXT,
+    user_arn TEXT,
+    access_key_id TEXT,
+    user_agent TEXT,
+    error_code TEXT,
+    read_only INTEGER,
+    log_key TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_time ON events (event_time);
+CREATE INDEX IF NOT EXISTS idx_events_name ON events (event_name, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_user ON events (user_name, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_user_arn ON events (user_arn, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_ip ON events (source_ip, event_time);
+CREATE TABLE IF NOT EXISTS log_files (
+    key TEXT PRIMARY KEY,
+    bucket TEXT NOT NULL,
+    size INTEGER,
+    records INTEGER,
+    ingested_at TEXT
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    bucket TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    last_key TEXT NOT NULL,
+    PRIMARY KEY (bucket, prefix)
+);
+"""
+
+EVENT_COLUMNS = ["event_id", "event_time", "event_source", "event_name", "aws_region", "source_ip", "user_type",
+                 "user_name", "user_arn", "access_key_id", "user_agent", "error_code", "read_only", "log_key",
+                 "record"]
+INSERT_EVENT = (f"INSERT OR IGNORE INTO events ({', '.join(EVENT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in EVENT_COLUMNS)})")
+
+
+def open_index(path=DB_PATH):
+    """Connection to the index, creating the schema on first use"""
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def listing_start(prefix, last_key):
+    """StartAfter for a region prefix: the start of the day folder LOOKBACK before the last ingested key"""
+    if not last_key:
+        return None
+    try:
+        # .../<region>/YYYY/MM/DD/<account>_CloudTrail_<region>_YYYYMMDDTHHmmZ_<suffix>.json.gz
+        delivered = datetime.strptime(last_key.rsplit("_", 2)[-2], "%Y%m%dT%H%MZ")
+    except (IndexError, ValueError):
+        return None
+    return f"{prefix}{(delivered - LOOKBACK):%Y/%m/%d}/"
+
+
+def user_name(identity):
+    """Best human-readable name for a CloudTrail userIdentity"""
+    if identity.get("userName"):
+        return identity["userName"]
+    issuer = identity.get("sessionContext", {}).get("sessionIssuer", {})
+    if issuer.get("userName"):
+        return issuer["userName"]
+    arn = identity.get("arn") or ""
+    return arn.split("/")[-1] or identity.get("invokedBy") or identity.get("type")
+
+
+def event_row(record, log_key):
+    identity = record.get("userIdentity") or {}
+    read_only = record.get("readOnly")
+    return (
+        record["eventID"],
+        record["eventTime"],
+        record.get("eventSource"),
+        record.get("eventName"),
+        record.get("awsRegion"),
+        record.get("sourceIPAddress"),
+        identity.get("type"),
+        user_name(identity),
+        identity.get("arn"),
+        identity.get("accessKeyId"),
+        record.get("userAgent"),
+        record.get("errorCode"),
+        None if read_only is None else int(read_only in (True, "true")),
+        log_key,
+        json.dumps(record, separators=(",", ":")),
+    )
+
+
+class CloudTrailIngest:
+    """Incremental, concurrent copy of a trail bucket's log files into the local index"""
+
+    def __init__(self, bucket, db_path=DB_PATH, session=None, region="us-east-1", workers=DEFAULT_WORKERS):
+        session = session or boto3.Session(region_name=region)
+        config = Config(retries={"mode": "adaptive", "max_attempts": 10}, max_pool_connections=workers)
+        self.s3_client = session.client("s3", config=config)
+        self.bucket = bucket
+        self.db_path = db_path
+        self.workers = workers
+
+    def _common_prefixes(self, prefix):
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter="/"):
+            for common in page.get("CommonPrefixes", []):
+                yield common["Prefix"]
+
+    def log_prefixes(self):
+        """AWSLogs/<account>/CloudTrail/<region>/ prefixes (one per account and region the trail covers)"""
+        return [
+            region_prefix
+            for account_prefix in self._common_prefixes(LOG_ROOT)
+            for region_prefix in self._common_prefixes(f"{account_prefix}CloudTrail/")
+        ]
+
+    def new_log_files(self, prefix, last_key, known):
+        """(key, size) of log files under prefix not in the index yet, oldest first"""
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+        start_after = listing_start(prefix, last_key)
+        if start_after:
+            kwargs["StartAfter"] = start_after
+        files = []
+        for page in self.s3_client.get_paginator("list_objects_v2").paginate(**kwargs):
+            files += [(item["Key"], item["Size"]) for item in page.get("Contents", [])
+                      if item["Key"].endswith(".json.gz") and item["Key"] not in known]
+        return files
+
+    def fetch(self, key):
+        """Records of one log file, decompressed while it streams"""
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        with gzip.GzipFile(fileobj=body) as stream:
+            return json.load(stream).get("Records", [])
+
+    def run(self, rescan=False):
+        """Ingest every log file not yet in the index. Returns a summary dict."""
+        start_time = time.time()
+        connection = open_index(self.db_path)
+        checkpoints = {} if rescan else {
+            row["prefix"]: row["last_key"]
+            for row in connection.execute("SELECT prefix, last_key FROM checkpoints WHERE bucket = ?", (self.bucket,))
+        }
+        known = {row["key"] for row in connection.execute("SELECT key FROM log_files WHERE bucket = ?",
+                                                          (self.bucket,))}
+
+        prefixes = self.log_prefixes()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            listings = executor.map(lambda prefix: self.new_log_files(prefix, checkpoints.get(prefix), known),
+                                    prefixes)
+            pending = {prefix: files for prefix, files in zip(prefixes, listings)}
+            futures = {executor.submit(self.fetch, key): (prefix, key, size)
+                       for prefix, files in pending.items() for key, size in files}
+
+            done = {prefix: set() for prefix in pending}
+            files = records = inserted = 0
+            failures = []
+            # Single writer: results are written here as they arrive, one transaction per file
+            for future in as_completed(futures):
+                prefix, key, size = futures[future]
+                try:
+                    file_records = future.result()
+                except Exception as e:
+                    failures.append({"key": key, "error": str(e)})
+                    continue
+                with connection:
+                    before = connection.total_changes
+                    connection.executemany(INSERT_EVENT, (event_row(record, key) for record in file_records))
+                    inserted += connection.total_changes - before
+                    connection.execute(
+                        "INSERT OR REPLACE INTO log_files (key, bucket, size, records, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                        (key, self.bucket, size, len(file_records), time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+                    )
+                done[prefix].add(key)
+                files += 1
+                records += len(file_records)
+
+        # Advance each checkpoint past the files ingested in order, stopping at the first failure
+        # (a late file that sorts before the checkpoint must not move it back)
+        with connection:
+            for prefix, prefix_files in pending.items():
+                last_key = None
+                failed = False
+                for key, _ in prefix_files:
+                    if key not in done[prefix]:
+                        failed = True
+                        break
+                    last_key = key
+                if not failed and checkpoints.get(prefix):
+                    last_key = max(filter(None, [last_key, checkpoints[prefix]]))
+                if last_key:
+                    connection.execute("INSERT OR REPLACE INTO checkpoints (bucket, prefix, last_key) VALUES (?, ?, ?)",
+                                       (self.bucket, prefix, last_key))
+        total = connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        connection.close()
+
+        return {
+            "bucket": self.bucket,
+            "prefixes": len(prefixes),
+            "files": files,
+            "records": records,
+            "inserted": inserted,
+            "failures": failures,
+            "total_events": total,
+            "seconds": round(time.time() - start_time, 2),
+        }
+
+
+def query(connection, event_name=None, user=None, source_ip=None, since=None, until=None, limit=None):
+    """Events matching every given filter, oldest first (times are ISO 8601 strings, like eventTime)"""
+    clauses, params = [], []
+    for clause, value in [("event_name = ?", event_name), ("source_ip = ?", source_ip),
+                          ("event_time >= ?", since), ("event_time < ?", until)]:
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    if user is not None:
+        clauses.append("(user_name = ? OR user_arn = ?)")
+        params += [user, user]
+    sql = "SELECT * FROM events"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY event_time, seq"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return [dict(row) for row in connection.execute(sql, params)]
+
+
+def print_summary(summary, db_path=DB_PATH, top=10):
+    color = "yellow" if summary["failures"] else "green"
+    print(colored(f"[INFO] Ingested {summary['files']} new log files ({summary['records']} records, "
+                  f"{summary['inserted']} new events) from {summary['prefixes']} region prefixes "
+                  f"in {summary['seconds']}s", color))
+    for failure in summary["failures"]:
+        print(colored(f"  [✘] {failure['key']}: {failure['error']}", "red"))
+
+    connection = open_index(db_path)
+    span = connection.execute("SELECT MIN(event_time), MAX(event_time) FROM events").fetchone()
+    print(colored(f"[INFO] Index holds {summary['total_events']} events ({span[0]} .. {span[1]}): {db_path}", "cyan"))
+    for row in connection.execute("SELECT event_name, COUNT(*) AS count FROM events GROUP BY event_name "
+                                  "ORDER BY count DESC LIMIT ?", (top,)):
+        print(colored(f"  {row['count']:>8}  {row['event_name']}", "cyan"))
+    connection.close()
+
+
+def ingest_lab_trail(outputs, db_path=DB_PATH, rescan=False):
+    """Ingest the lab trail's log bucket (from the stack outputs) and print a summary"""
+    bucket = outputs.get("cloudtrail_log_bucket")
+    if not bucket:
+        raise RuntimeError("ERROR: Stack outputs have no 'cloudtrail_log_bucket'")
+    print(colored(f"[INFO] Ingesting CloudTrail logs from s3://{bucket} into {db_path}...", "cyan"))
+    summary = CloudTrailIngest(bucket, db_path=db_path).run(rescan=rescan)
+    print_summary(summary, db_path)
+    return summary
@@ -0,0 +1,314 @@
+"""
+Synthetic Lab Data Generator
+
+Produces the fake customer, payment, order and SSN records used to seed the
+North Korean Cloud Nightmare lab. Records are built column-wise in NumPy
+batches from a fixed seed, so millions of rows can be generated (and
+regenerated identically) without per-row Faker calls or holding the whole
+dataset in memory.
+
+Usage:
+    python data_generator.py --schema orders --rows 1000000 --format ndjson --output-dir ./seed_data
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import zlib
+
+import numpy as np
+
+
+DEFAULT_SEED = 2025
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Reference date for generated order dates; fixed so output never depends on "today"
+REFERENCE_DATE = "2025-01-01"
+
+FIRST_NAMES = np.array([
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+    "David", "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Charles", "Karen", "Christopher", "Lisa", "Daniel", "Nancy",
+    "Matthew", "Betty", "Anthony", "Margaret", "Mark", "Sandra", "Donald", "Ashley",
+    "Steven", "Kimberly", "Paul", "Emily", "Andrew", "Donna", "Joshua", "Michelle",
+    "Kenneth", "Carol", "Kevin", "Amanda", "Brian", "Dorothy", "George", "Melissa",
+    "Timothy", "Deborah", "Ronald", "Stephanie", "Edward", "Rebecca", "Jason", "Sharon",
+    "Jeffrey", "Laura", "Ryan", "Cynthia", "Jacob", "Kathleen", "Gary", "Amy",
+])
+
+LAST_NAMES = np.array([
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas",
+    "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White",
+    "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson", "Walker", "Young",
+    "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+    "Green", "Adams", "Nelson", "Baker", "Hall", "Rivera", "Campbell", "Mitchell",
+    "Carter", "Roberts", "Gomez", "Phillips", "Evans", "Turner", "Diaz", "Parker",
+    "Cruz", "Edwards", "Collins", "Reyes", "Stewart", "Morris", "Morales", "Murphy",
+])
+
+EMAIL_DOMAINS = np.array(["gmail.com", "yahoo.com"])
+CARD_PREFIXES = np.array(["4111", "5500"])
+PRODUCTS = np.array(["Laptop", "Keyboard", "Monitor", "Mouse", "Tablet", "Phone", "Headphones", "Charger"])
+
+
+# ------------------------------------------------------------------- #
+# Field generators: (rng, row_ids) -> column array of len(row_ids)     #
+# ------------------------------------------------------------------- #
+def _row_id(rng, row_ids):
+    return row_ids
+
+
+def _order_id(rng, row_ids):
+    return (row_ids + 1000).astype(str)
+
+
+def _ssn_id(rng, row_ids):
+    return (row_ids + 2000).astype(str)
+
+
+def _full_name(rng, row_ids):
+    n = len(row_ids)
+    first = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), n)]
+    last = LAST_NAMES[rng.integers(0, len(LAST_NAMES), n)]
+    return np.char.add(np.char.add(first, " "), last)
+
+
+def _email(rng, row_ids):
+    n = len(row_ids)
+    first = np.char.lower(FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), n)])
+    digits = rng.integers(1, 100, n).astype(str)
+    domain = EMAIL_DOMAINS[rng.integers(0, len(EMAIL_DOMAINS), n)]
+    return np.char.add(np.char.add(np.char.add(first, digits), "@"), domain)
+
+
+def _masked_card(rng, row_ids):
+    n = len(row_ids)
+    prefix = CARD_PREFIXES[rng.integers(0, len(CARD_PREFIXES), n)]
+    suffix = rng.integers(1000, 10000, n).astype(str)
+    return np.char.add(np.char.add(prefix, "-XXXX-XXXX-"), suffix)
+
+
+def _cvv(rng, row_ids):
+    return rng.integers(100, 1000, len(row_ids)).astype(str)
+
+
+def _ssn(rng, row_ids):
+    n = len(row_ids)
+    area = rng.integers(100, 1000, n).astype(str)
+    group = rng.integers(10, 100, n).astype(str)
+    serial = rng.integers(1000, 10000, n).astype(str)
+    return np.char.add(np.char.add(np.char.add(np.char.add(area, "-"), group), "-"), serial)
+
+
+def _order_date(rng, row_ids):
+    days_ago = rng.integers(0, 366, len(row_ids))
+    return (np.datetime64(REFERENCE_DATE) - days_ago.astype("timedelta64[D]")).astype(str)
+
+
+def _product(rng, row_ids):
+    return PRODUCTS[rng.integers(0, len(PRODUCTS), len(row_ids))]
+
+
+FIELD_GENERATORS = {
+    "row_id": _row_id,
+    "order_id": _order_id,
+    "ssn_id": _ssn_id,
+    "full_name": _full_name,
+    "email": _email,
+    "masked_card": _masked_card,
+    "cvv": _cvv,
+    "ssn": _ssn,
+    "order_date": _order_date,
+    "product": _product,
+}
+
+# Integer-valued field kinds; every other kind is rendered as a string
+INTEGER_FIELDS = {"row_id"}
+
+# ------------------------------------------------------- #
+# Built-in schemas: output column name -> field generator #
+# ------------------------------------------------------- #
+SCHEMAS = {
+    "customers": {"id": "row_id", "name": "full_name", "email": "email"},
+    "payments": {"id": "row_id", "card": "masked_card", "cvv": "cvv"},
+    "orders": {"ID": "order_id", "OrderDate": "order_date", "CustomerName": "full_name", "ItemPurchased": "product"},
+    "ssn": {"ID": "ssn_id", "CustomerName": "full_name", "SSN": "ssn", "CreditCard": "masked_card"},
+}
+
+
+def resolve_schema(schema):
+    """Return a column -> field-kind mapping for a schema name or a custom mapping"""
+    if isinstance(schema, str):
+        if schema not in SCHEMAS:
+            raise ValueError(f"ERROR: Unknown schema '{schema}'. Available schemas: {sorted(SCHEMAS)}")
+        return SCHEMAS[schema]
+
+    unknown = [kind for kind in schema.values() if kind not in FIELD_GENERATORS]
+    if unknown:
+        raise ValueError(f"ERROR: Unknown field kinds {unknown}. Available kinds: {sorted(FIELD_GENERATORS)}")
+    return dict(schema)
+
+
+def _schema_key(columns):
+    """Stable integer identifying a schema, mixed into every batch's RNG seed"""
+    return zlib.crc32(json.dumps(columns, sort_keys=True).encode())
+
+
+def batch_rng(columns, seed, batch_index):
+    """RNG for a single batch; any batch can be regenerated independently of the others"""
+    return np.random.default_rng([seed, _schema_key(columns), batch_index])
+
+
+def generate_batches(schema, rows, seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE, start=0):
+    """
+    Yield column batches (dict of column name -> NumPy array) for rows [start, rows).
+
+    Parameters:
+        - schema (str | dict): Built-in schema name or a column -> field-kind mapping.
+        - rows (int): Total number of rows in the dataset (exclusive end row).
+        - seed (int): Dataset seed. The same seed always produces the same rows.
+        - batch_size (int): Rows per batch. Part of the dataset identity, keep it fixed.
+        - start (int): First row to generate. A start inside a batch generates that whole
+          batch and drops the rows before start, so the first batch may be short.
+    """
+    columns = resolve_schema(schema)
+
+    for batch_start in range(start - start % batch_size, rows, batch_size):
+        batch_index = batch_start // batch_size
+        first = max(start - batch_start, 0)
+        count = min(batch_size, rows - batch_start)
+        # Always draw a full batch and slice it, so a short final batch doesn't shift the
+        # RNG stream: a row's content depends only on seed, schema and row id, never on `rows`
+        row_ids = np.arange(batch_start, batch_start + batch_size) + 1
+        rng = batch_rng(columns, seed, batch_index)
+        yield {name: FIELD_GENERATORS[kind](rng, row_ids)[first:count] for name, kind in columns.items()}
+
+
+def batch_records(schema, batch):
+    """Convert a column batch into a list of plain Python dicts"""
+    columns = resolve_schema(schema)
+    names = list(columns)
+    converted = [
+        batch[name].tolist() if columns[name] in INTEGER_FIELDS else batch[name].astype(str).tolist()
+        for name in names
+    ]
+    return [dict(zip(names, values)) for values in zip(*converted)]
+
+
+def generate_records(schema, rows, seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE, start=0):
+    """Yield records one dict at a time, generated in NumPy batches underneath"""
+    for batch in generate_batches(schema, rows, seed=seed, batch_size=batch_size, start=start):
+        yield from batch_records(schema, batch)
+
+
+def render_ndjson(schema, batch):
+    """Render a column batch as NDJSON lines (without trailing newlines)"""
+    columns = resolve_schema(schema)
+    # Generated values never contain quotes or backslashes, so a fixed
+    # row template is equivalent to json.dumps() per row at a fraction of the cost
+    template = "{" + ", ".join(
+        f"{json.dumps(name)}: " + ("%s" if kind in INTEGER_FIELDS else '"%s"')
+        for name, kind in columns.items()
+    ) + "}"
+    values = [batch[name].tolist() for name in columns]
+    return [template % row for row in zip(*values)]
+
+
+def render_csv(schema, batch, header=False):
+    """Render a column batch as CSV text"""
+    columns = resolve_schema(schema)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(list(columns))
+    writer.writerows(zip(*(batch[name].tolist() for name in columns)))
+    return buffer.getvalue()
+
+
+def write_chunks(schema, rows, output_dir, fmt="ndjson", chunk_rows=DEFAULT_CHUNK_ROWS,
+                 seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE, prefix=None):
+    """
+    Stream a dataset to NDJSON or CSV chunk files of at most chunk_rows rows each.
+
+    Only one batch is held in memory at a time. Returns the list of written file paths.
+    """
+    if fmt not in ("ndjson", "csv"):
+        raise ValueError(f"ERROR: Unsupported format '{fmt}'. Use 'ndjson' or 'csv'.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = prefix or (schema if isinstance(schema, str) else "custom")
+    extension = "ndjson" if fmt == "ndjson" else "csv"
+    paths = []
+    handle = None
+    rows_in_chunk = 0
+
+    def open_chunk():
+        path = os.path.join(output_dir, f"{prefix}-{len(paths):05d}.{extension}")
+        paths.append(path)
+        chunk = open(path, "w", newline="")
+        if fmt == "csv":
+            csv.writer(chunk, lineterminator="\n").writerow(list(resolve_schema(schema)))
+        return chunk
+
+    try:
+        for batch in generate_batches(schema, rows, seed=seed, batch_size=batch_size):
+            batch_len = len(next(iter(batch.values())))
+            offset = 0
+            while offset < batch_len:
+                if handle is None or rows_in_chunk >= chunk_rows:
+                    if handle is not None:
+                        handle.close()
+                    handle = open_chunk()
+                    rows_in_chunk = 0
+
+                take = min(chunk_rows - rows_in_chunk, batch_len - offset)
+                part = {name: values[offset:offset + take] for name, values in batch.items()}
+                if fmt == "ndjson":
+                    handle.write("\n".join(render_ndjson(schema, part)) + "\n")
+                else:
+                    handle.write(render_csv(schema, part))
+                rows_in_chunk += take
+                offset += take
+    finally:
+        if handle is not None:
+            handle.close()
+
+    return paths
+
+
+def fake_config_data():
+    """Static application config document placed in the configuration-files bucket"""
+    return {
+        "system": "Enterprise App",
+        "config_version": "1.2.3",
+        "allowed_ips": [f"192.168.1.{i}" for i in range(1, 101)]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic lab data in NDJSON/CSV chunks")
+    parser.add_argument("--schema", default="orders",
+                        help=f"Built-in schema ({', '.join(SCHEMAS)}) or path to a JSON column -> field-kind mapping")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of rows to generate")
+    parser.add_argument("--format", dest="fmt", choices=["ndjson", "csv"], default="ndjson", help="Output format")
+    parser.add_argument("--output-dir", default="./seed_data", help="Directory for the chunk files")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Maximum rows per chunk file")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Dataset seed")
+    args = parser.parse_args()
+
+    schema = args.schema
+    if schema not in SCHEMAS and os.path.exists(schema):
+        with open(schema, "r") as file:
+            schema = json.load(file)
+
+    paths = write_chunks(schema, args.rows, args.output_dir, fmt=args.fmt,
+                         chunk_rows=args.chunk_rows, seed=args.seed)
+    print(f"Wrote {args.rows} rows to {len(paths)} chunk(s) in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Lab Data Reset
+
+Puts the lab buckets and tables back to the state recorded in the seed
+manifest without a destroy/redeploy cycle. Every resource is diffed against
+the manifest and only what differs is rewritten:
+
+- S3: missing or modified seeded objects are regenerated from their seed
+  (and checked against their SHA-256 content address), missing or modified
+  Pulumi-managed objects are restored from stack state, and anything else
+  (ransom notes) is deleted.
+- DynamoDB: a table whose item digest still matches is left alone. Otherwise
+  changed/missing items are re-put and extra items deleted with parallel
+  batch writes. A dropped table is recreated from its definition in the
+  stack state and reseeded.
+
+All resources are reset concurrently.
+"""
+
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+from termcolor import colored
+
+from data_generator import generate_batches
+from dynamodb_seeder import BATCH_WRITE_LIMIT, DEFAULT_WORKERS, DynamoDBSeeder, to_dynamodb_items
+from s3_seeder import S3Seeder
+from seed_manifest import combine_digests, format_digest, item_digest
+
+
+TABLE_TYPE = "aws:dynamodb/table:Table"
+BUCKET_OBJECT_TYPE = "aws:s3/bucketObject:BucketObject"
+SCAN_SEGMENTS = 8
+# Table the ransomware phase creates for its notes
+RANSOM_TABLE = "too_late"
+
+
+class StackDefinitions:
+    """Table definitions and Pulumi-managed bucket objects, read once from the stack state"""
+
+    def __init__(self, resources):
+        self.tables = {}
+        self.bucket_objects = {}
+        for resource in resources:
+            outputs = resource.get("outputs", {})
+            if resource["type"] == TABLE_TYPE:
+                self.tables[outputs["name"]] = outputs
+            elif resource["type"] == BUCKET_OBJECT_TYPE and outputs.get("content") is not None:
+                self.bucket_objects.setdefault(outputs["bucket"], {})[outputs["key"]] = outputs["content"]
+
+    @classmethod
+    def from_stack(cls):
+        import pulumi_workspace
+        return cls(pulumi_workspace.stack_resources())
+
+    def create_table_args(self, table_name):
+        """CreateTable arguments equivalent to the stack's definition of a table"""
+        if table_name not in self.tables:
+            raise RuntimeError(f"ERROR: Table {table_name} is not defined in the stack state. Run deploy_infrastructure.")
+        definition = self.tables[table_name]
+        key_schema = [{"AttributeName": definition["hashKey"], "KeyType": "HASH"}]
+        if definition.get("rangeKey"):
+            key_schema.append({"AttributeName": definition["rangeKey"], "KeyType": "RANGE"})
+        args = {
+            "TableName": table_name,
+            "AttributeDefinitions": [
+                {"AttributeName": attribute["name"], "AttributeType": attribute["type"]}
+                for attribute in definition["attributes"]
+            ],
+            "KeySchema": key_schema,
+            "BillingMode": definition.get("billingMode") or "PAY_PER_REQUEST",
+        }
+        if args["BillingMode"] == "PROVISIONED":
+            args["ProvisionedThroughput"] = {
+                "ReadCapacityUnits": definition.get("readCapacity") or 1,
+                "WriteCapacityUnits": definition.get("writeCapacity") or 1,
+            }
+        if definition.get("tags"):
+            args["Tags"] = [{"Key": key, "Value": value} for key, value in definition["tags"].items()]
+        return args
+
+
+class DataReset:
+    """Diff-and-repair of lab buckets and tables against the seed manifest"""
+
+    def __init__(self, session=None, workers=DEFAULT_WORKERS, region="us-east-1"):
+        self.workers = workers
+        self.table_seeder = DynamoDBSeeder(session=session, workers=workers, region=region)
+        self.object_seeder = S3Seeder(session=session, workers=workers, region=region)
+        self.dynamodb_client = self.table_seeder.dynamodb_client
+        self.s3_client = self.object_seeder.s3_client
+
+    # ------------------------------------------------------------------ #
+    # DynamoDB
+    # ------------------------------------------------------------------ #
+
+    def scan_items(self, table_name):
+        """Every item in a table, read with a parallel scan"""
+        def scan_segment(segment):
+            items = []
+            kwargs = {"TableName": table_name, "Segment": segment, "TotalSegments": SCAN_SEGMENTS}
+            while True:
+                response = self.dynamodb_client.scan(**kwargs)
+                items.extend(response["Items"])
+                if "LastEvaluatedKey" not in response:
+                    return items
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        with ThreadPoolExecutor(max_workers=SCAN_SEGMENTS) as executor:
+            return [item for segment in executor.map(scan_segment, range(SCAN_SEGMENTS)) for item in segment]
+
+    def expected_items(self, entry):
+        """Regenerate a table's manifest contents"""
+        return [
+            item
+            for batch in generate_batches(entry["schema"], entry["rows"], seed=entry["seed"], batch_size=entry["batch_size"])
+            for item in to_dynamodb_items(entry["schema"], batch)
+        ]
+
+    def write_parallel(self, table_name, requests):
+        chunks = [requests[i:i + BATCH_WRITE_LIMIT] for i in range(0, len(requests), BATCH_WRITE_LIMIT)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(lambda chunk: self.table_seeder.write_requests(table_name, chunk), chunks))
+
+    def table_status(self, table_name):
+        """Table status, or None if the table does not exist"""
+        try:
+            return self.dynamodb_client.describe_table(TableName=table_name)["Table"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ResourceNotFoundException":
+                return None
+            raise
+
+    def recreate_table(self, table_name, entry, definitions):
+        self.dynamodb_client.create_table(**definitions.create_table_args(table_name))
+        self.dynamodb_client.get_waiter("table_exists").wait(TableName=table_name, WaiterConfig={"Delay": 2})
+        summary = self.table_seeder.seed_table(
+            table_name, entry["schema"], entry["rows"], seed=entry["seed"], batch_size=entry["batch_size"]
+        )
+        return {"action": "recreated", "put": summary["items"], "deleted": 0}
+
+    def reset_table(self, table_name, entry, definitions):
+        """Bring one table back to its manifest contents"""
+        table = self.table_status(table_name)
+        if table is not None and table["TableStatus"] == "DELETING":
+            self.dynamodb_client.get_waiter("table_not_exists").wait(TableName=table_name, WaiterConfig={"Delay": 2})
+            table = None
+        if table is None:
+            return self.recreate_table(table_name, entry, definitions)
+
+        found = self.scan_items(table_name)
+        if len(found) == entry["items"] and \
+                format_digest(combine_digests(item_digest(item) for item in found)) == entry["items_digest"]:
+            return {"action": "unchanged", "put": 0, "deleted": 0}
+
+        key_names = [key["AttributeName"] for key in table["KeySchema"]]
+
+        def item_key(item):
+            return json.dumps([item[name] for name in key_names], sort_keys=True)
+
+        found_by_key = {item_key(item): item for item in found}
+        expected_by_key = {item_key(item): item for item in self.expected_items(entry)}
+        puts = [{"PutRequest": {"Item": item}}
+                for key, item in expected_by_key.items() if found_by_key.get(key) != item]
+        deletes = [{"DeleteRequest": {"Key": {name: item[name] for name in key_names}}}
+                   for key, item in found_by_key.items() if key not in expected_by_key]
+        self.write_parallel(table_name, puts + deletes)
+        return {"action": "repaired", "put": len(puts), "deleted": len(deletes)}
+
+    def drop_ransom_table(self):
+        try:
+            self.dynamodb_client.delete_table(TableName=RANSOM_TABLE)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ResourceNotFoundException":
+                return False
+            raise
+
+    # ------------------------------------------------------------------ #
+    # S3
+    # ------------------------------------------------------------------ #
+
+    def list_objects(self, bucket):
+        objects = {}
+        for page in self.s3_client.get_paginator("list_objects_v2").paginate(Bucket=bucket):
+            for obj in page.get("Contents", []):
+                objects[obj["Key"]] = (obj["Size"], obj["ETag"].strip('"'))
+        return objects
+
+    def reset_bucket(self, bucket, entry, managed_objects):
+        """Bring one bucket back to its manifest objects plus its Pulumi-managed objects"""
+        found = self.list_objects(bucket)
+        expected = entry["objects"] if entry else {}
+
+        jobs = [
+            (bucket, key, obj["schema"], obj["size"], obj["object_seed"])
+            for key, obj in expected.items()
+            if found.get(key) != (obj["size"], obj["etag"])
+        ]
+        restored_managed = []
+        for key, content in managed_objects.items():
+            body = content.encode()
+            if found.get(key) != (len(body), hashlib.md5(body).hexdigest()):
+                self.s3_client.put_object(Bucket=bucket, Key=key, Body=body)
+                restored_managed.append(key)
+        extra = [key for key in found if key not in expected and key not in managed_objects]
+
+        failures = []
+        if jobs:
+            uploaded, failures = self.object_seeder.seed_bucket_objects(jobs)
+            for (_, key, _, _, _), written in uploaded:
+                if written["sha256"] != expected[key]["sha256"]:
+                    failures.append({"bucket": bucket, "key": key,
+                                     "error": "regenerated content does not match manifest sha256"})
+
+        for offset in range(0, len(extra), 1000):
+            self.s3_client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in extra[offset:offset + 1000]], "Quiet": True}
+            )
+
+        changed = len(jobs) + len(restored_managed) + len(extra)
+        result = {"action": "repaired" if changed else "unchanged", "restored": len(jobs) + len(restored_managed),
+                  "deleted": len(extra)}
+        if failures:
+            result["failures"] = failures
+        return result
+
+    # ------------------------------------------------------------------ #
+
+    def _timed(self, kind, resource, reset, *args):
+        start_time = time.time()
+        try:
+            result = reset(resource, *args)
+        except Exception as e:
+            result = {"action": "failed", "error": str(e)}
+        result.update(type=kind, resource=resource, seconds=round(time.time() - start_time, 2))
+        return result
+
+    def reset(self, manifest, definitions):
+        """Reset every manifest bucket and table concurrently. Returns a summary dict."""
+        buckets = dict.fromkeys(definitions.bucket_objects)
+        buckets.update(manifest["buckets"])
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(buckets) + len(manifest["tables"]) + 1) as executor:
+            futures = [
+                executor.submit(self._timed, "dynamodb_table", entry["table"], self.reset_table, entry, definitions)
+                for entry in manifest["tables"].values()
+            ]
+            futures += [
+                executor.submit(self._timed, "s3_bucket", bucket, self.reset_bucket, entry,
+                                definitions.bucket_objects.get(bucket, {}))
+                for bucket, entry in buckets.items()
+            ]
+            ransom_table = executor.submit(self.drop_ransom_table)
+            resources = [future.result() for future in futures]
+
+        return {
+            "seconds": round(time.time() - start_time, 2),
+            "ransom_table_dropped": ransom_table.result(),
+            "passed": all(resource["action"] != "failed" and not resource.get("failures") for resource in resources),
+            "resources": resources,
+        }
+
+
+def print_summary(summary):
+    colors = {"unchanged": "white", "repaired": "yellow", "recreated": "magenta", "failed": "red"}
+    for resource in summary["resources"]:
+        if resource["action"] == "failed":
+            detail = resource["error"]
+        elif resource["type"] == "dynamodb_table":
+            detail = f"{resource['put']} items put, {resource['deleted']} deleted"
+        else:
+            detail = f"{resource['restored']} objects restored, {resource['deleted']} deleted"
+            if resource.get("failures"):
+                detail += f", {len(resource['failures'])} failed (first: {resource['failures'][0]})"
+        print(colored(f"  [{resource['action'].upper()}] {resource['resource']}: {detail} ({resource['seconds']}s)",
+                      colors[resource["action"]]))
+    if summary["ransom_table_dropped"]:
+        print(colored(f"  [DELETED] Ransom table '{RANSOM_TABLE}'", "yellow"))
@@ -0,0 +1,161 @@
+"""
+Post-Deploy Data Validation
+
+Checks every lab bucket and table in-process on pooled boto3 clients, all
+resources at once. With a seed manifest, buckets must contain every
+manifest object with the recorded size and ETag, and tables must hold the
+recorded item count (counted with a parallel scan). Without one, resources
+only need to be non-empty. Results go to a per-resource JSON report.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from termcolor import colored
+
+from seed_manifest import INFRA_DIR
+
+
+REPORT_PATH = os.path.join(INFRA_DIR, "validation-report.json")
+DEFAULT_WORKERS = 16
+SCAN_SEGMENTS = 8
+# Mismatched keys listed per resource in the report; counts are always complete
+MAX_LISTED = 20
+
+# Buckets checked for existence even when S3 seeding was skipped (Pulumi writes objects into them)
+DATA_BUCKETS = ["config_files_bucket", "customer_data_bucket", "payment_data_bucket"]
+DATA_TABLES = ["CustomerOrdersTable", "CustomerSSNTable"]
+
+
+class DataValidator:
+    """Concurrent bucket/table checks against a seed manifest"""
+
+    def __init__(self, session=None, workers=DEFAULT_WORKERS, region="us-east-1"):
+        session = session or boto3.Session(region_name=region)
+        self.workers = workers
+        config = Config(max_pool_connections=max(10, workers * 2), retries={"mode": "standard"})
+        self.s3_client = session.client("s3", config=config)
+        self.dynamodb_client = session.client("dynamodb", config=config)
+
+    def list_objects(self, bucket):
+        """key -> (size, etag) for every object in a bucket"""
+        objects = {}
+        for page in self.s3_client.get_paginator("list_objects_v2").paginate(Bucket=bucket):
+            for obj in page.get("Contents", []):
+                objects[obj["Key"]] = (obj["Size"], obj["ETag"].strip('"'))
+        return objects
+
+    def count_items(self, table_name, segments=SCAN_SEGMENTS):
+        """Exact item count via a parallel Select=COUNT scan (DescribeTable's count lags by hours)"""
+        def count_segment(segment):
+            total = 0
+            kwargs = {"TableName": table_name, "Select": "COUNT", "Segment": segment, "TotalSegments": segments}
+            while True:
+                response = self.dynamodb_client.scan(**kwargs)
+                total += response["Count"]
+                if "LastEvaluatedKey" not in response:
+                    return total
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            return sum(executor.map(count_segment, range(segments)))
+
+    def validate_bucket(self, bucket, expected=None):
+        result = {"resource": bucket, "type": "s3_bucket"}
+        found = self.list_objects(bucket)
+        result["found_objects"] = len(found)
+
+        if expected is None:
+            result["passed"] = bool(found)
+            result["detail"] = "non-empty" if found else "bucket is empty"
+            return result
+
+        missing = []
+        mismatched = []
+        for key, entry in expected["objects"].items():
+            if key not in found:
+                missing.append(key)
+            elif found[key] != (entry["size"], entry["etag"]):
+                mismatched.append({"key": key, "expected": [entry["size"], entry["etag"]], "found": list(found[key])})
+
+        result.update({
+            "expected_objects": len(expected["objects"]),
+            "expected_bytes": sum(entry["size"] for entry in expected["objects"].values()),
+            "missing": len(missing),
+            "mismatched": len(mismatched),
+            "unexpected": len(set(found) - set(expected["objects"])),
+            "missing_keys": sorted(missing)[:MAX_LISTED],
+            "mismatched_objects": mismatched[:MAX_LISTED],
+            "passed": not missing and not mismatched,
+        })
+        return result
+
+    def validate_table(self, table_name, expected=None):
+        result = {"resource": table_name, "type": "dynamodb_table"}
+        found = self.count_items(table_name)
+        result["found_items"] = found
+
+        if expected is None:
+            result["passed"] = found > 0
+            result["detail"] = "non-empty" if found else "table is empty"
+        else:
+            result["expected_items"] = expected["items"]
+            result["passed"] = found == expected["items"]
+        return result
+
+    def _checked(self, check, resource, *args):
+        start_time = time.time()
+        try:
+            result = check(resource, *args)
+        except Exception as e:
+            result = {"resource": resource, "passed": False, "error": str(e)}
+        result["seconds"] = round(time.time() - start_time, 3)
+        return result
+
+    def validate(self, outputs, manifest=None):
+        """Validate every lab resource concurrently. Returns the report dict."""
+        manifest = manifest or {"tables": {}, "buckets": {}}
+        buckets = dict(manifest["buckets"])
+        for output_key in DATA_BUCKETS:
+            buckets.setdefault(outputs[output_key], None)
+        tables = {outputs[key]: manifest["tables"].get(key) for key in DATA_TABLES}
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._checked, self.validate_bucket, bucket, expected)
+                       for bucket, expected in buckets.items()]
+            futures += [executor.submit(self._checked, self.validate_table, table, expected)
+                        for table, expected in tables.items()]
+            resources = [future.result() for future in futures]
+
+        return {
+            "checked_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "manifest": bool(manifest["tables"] or manifest["buckets"]),
+            "passed": all(resource["passed"] for resource in resources),
+            "seconds": round(time.time() - start_time, 2),
+            "resources": resources,
+        }
+
+
+def print_report(report):
+    """One line per resource"""
+    for resource in report["resources"]:
+        if "error" in resource:
+            line = f"{resource['resource']}: {resource['error']}"
+        elif resource.get("type") == "s3_bucket" and "expected_objects" in resource:
+            line = (f"S3 {resource['resource']}: {resource['expected_objects'] - resource['missing']}/"
+                    f"{resource['expected_objects']} seeded objects present, {resource['mismatched']} size/ETag mismatches")
+        elif resource.get("type") == "dynamodb_table" and "expected_items" in resource:
+            line = f"DynamoDB {resource['resource']}: {resource['found_items']}/{resource['expected_items']} items"
+        else:
+            line = f"{resource['resource']}: {resource['detail']}"
+        print(colored(f"[{'PASS' if resource['passed'] else 'FAIL'}] {line}", "green" if resource["passed"] else "red"))
+
+
+def write_report(report, path=REPORT_PATH):
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
@@ -0,0 +1,500 @@
+"""
+Detection Engine
+
+Evaluates declarative detection rules over the CloudTrail events in the local
+index (cloudtrail_ingest) and records alerts with the time the first
+contributing event happened.
+
+Rules are YAML files in detection_rules/, written in a Sigma subset:
+
+- `detection`: named selections (field -> value or list of values, with the
+  `contains`, `startswith`, `endswith`, `re` and `all` modifiers; a list of
+  maps is an OR) and a `condition` over them (`and`, `or`, `not`,
+  parentheses, `1 of sel_*`, `all of them`)
+- optional `correlation` (Sigma correlation vocabulary), evaluated in a
+  sliding window per `group-by` key:
+  - `event_count`: alert when `condition: {gte: N}` matching events fall
+    within `timespan`, once per burst: the group stays quiet until it has
+    seen no matching event for a full `timespan`
+  - `temporal_ordered`: alert when the `ordered` selections match in order
+    within `timespan`
+- `phase`: the scenario phase the rule is meant to catch (scoreboard)
+
+Evaluation is incremental and linear in the number of events: each rule
+keeps the last event `seq` it saw plus its window state in the index, rules
+are indexed by the eventNames they can match so an event is only tested
+against its candidate rules, and an event's JSON is only parsed when it has
+candidates. A rule added later backfills over the whole index on its first
+run.
+"""
+
+import fnmatch
+import glob
+import json
+import os
+import re
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+
+import yaml
+from termcolor import colored
+
+from cloudtrail_ingest import DB_PATH, open_index
+
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "detection_rules")
+BATCH_SIZE = 5000
+TIMESPAN_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+LEVEL_COLORS = {"informational": "white", "low": "cyan", "medium": "yellow", "high": "red", "critical": "red"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rule_id TEXT NOT NULL,
+    title TEXT,
+    level TEXT,
+    phase TEXT,
+    group_key TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    event_count INTEGER,
+    event_ids TEXT,
+    detected_at TEXT,
+    UNIQUE (rule_id, group_key, first_seen)
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_first_seen ON alerts (first_seen);
+CREATE TABLE IF NOT EXISTS detection_state (
+    rule_id TEXT PRIMARY KEY,
+    last_seq INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+"""
+
+
+def parse_timespan(value):
+    """Seconds in a Sigma timespan such as 30s, 5m, 1h"""
+    match = re.fullmatch(r"(\d+)([smhd])", str(value).strip())
+    if not match:
+        raise RuntimeError(f"ERROR: Invalid timespan '{value}' (expected e.g. 30s, 5m, 1h)")
+    return int(match.group(1)) * TIMESPAN_UNITS[match.group(2)]
+
+
+def epoch(event_time):
+    return datetime.fromisoformat(event_time.replace("Z", "+00:00")).timestamp()
+
+
+def get_field(record, path):
+    value = record
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+# --------------------------------------------------------------------------- #
+# Rule compilation
+# --------------------------------------------------------------------------- #
+
+def _value_test(modifier, expected):
+    """Predicate on one field value (strings compare case-insensitively, as in Sigma)"""
+    if expected is None:
+        return lambda value: value is None
+    if modifier == "re":
+        pattern = re.compile(str(expected))
+        return lambda value: value is not None and pattern.search(str(value)) is not None
+    if isinstance(expected, bool) or not isinstance(expected, str):
+        return lambda value: value == expected or str(value).lower() == str(expected).lower()
+    expected = expected.lower()
+    if modifier == "contains":
+        return lambda value: value is not None and expected in str(value).lower()
+    if modifier == "startswith":
+        return lambda value: value is not None and str(value).lower().startswith(expected)
+    if modifier == "endswith":
+        return lambda value: value is not None and str(value).lower().endswith(expected)
+    if modifier is None:
+        return lambda value: value is not None and str(value).lower() == expected
+    raise RuntimeError(f"ERROR: Unsupported field modifier '{modifier}'")
+
+
+def _compile_field(key, expected):
+    """(predicate on a record, eventNames it can match or None)"""
+    field, *modifiers = key.split("|")
+    path = field.split(".")
+    match_all = "all" in modifiers
+    modifier = next((modifier for modifier in modifiers if modifier != "all"), None)
+    values = expected if isinstance(expected, list) else [expected]
+    tests = [_value_test(modifier, value) for value in values]
+    combine = all if match_all else any
+
+    def predicate(record):
+        value = get_field(record, path)
+        return combine(test(value) for test in tests)
+
+    names = None
+    if field == "eventName" and modifier is None and not match_all:
+        names = {str(value) for value in values}
+    return predicate, names
+
+
+def compile_selection(name, selection):
+    """(predicate, eventNames or None) for a selection: a map (AND of fields) or a list of maps (OR)"""
+    if isinstance(selection, dict):
+        fields = [_compile_field(key, expected) for key, expected in selection.items()]
+        predicates = [predicate for predicate, _ in fields]
+        name_sets = [names for _, names in fields if names is not None]
+        names = set.intersection(*name_sets) if name_sets else None
+        return (lambda record: all(predicate(record) for predicate in predicates)), names
+    if isinstance(selection, list) and all(isinstance(item, dict) for item in selection):
+        compiled = [compile_selection(name, item) for item in selection]
+        predicates = [predicate for predicate, _ in compiled]
+        names = None if any(names is None for _, names in compiled) else set().union(*(n for _, n in compiled))
+        return (lambda record: any(predicate(record) for predicate in predicates)), names
+    raise RuntimeError(f"ERROR: Selection '{name}' must be a map or a list of maps (keyword lists are not supported)")
+
+
+class ConditionParser:
+    """Recursive-descent parser for Sigma conditions, producing (predicate, eventNames or None)"""
+
+    def __init__(self, condition, selections):
+        self.tokens = re.findall(r"\(|\)|[^\s()]+", condition)
+        self.position = 0
+        self.selections = selections
+
+    def parse(self):
+        result = self._or()
+        if self.position != len(self.tokens):
+            raise RuntimeError(f"ERROR: Unexpected '{self.tokens[self.position]}' in condition")
+        return result
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise RuntimeError("ERROR: Condition ended unexpectedly")
+        self.position += 1
+        return token
+
+    def _or(self):
+        parts = [self._and()]
+        while self._peek() == "or":
+            self._next()
+            parts.append(self._and())
+        if len(parts) == 1:
+            return parts[0]
+        predicates = [predicate for predicate, _ in parts]
+        names = None if any(names is None for _, names in parts) else set().union(*(n for _, n in parts))
+        return (lambda record: any(predicate(record) for predicate in predicates)), names
+
+    def _and(self):
+        parts = [self._not()]
+        while self._peek() == "and":
+            self._next()
+            parts.append(self._not())
+        if len(parts) == 1:
+            return parts[0]
+        predicates = [predicate for predicate, _ in parts]
+        name_sets = [names for _, names in parts if names is not None]
+        names = set.intersection(*name_sets) if name_sets else None
+        return (lambda record: all(predicate(record) for predicate in predicates)), names
+
+    def _not(self):
+        if self._peek() == "not":
+            self._next()
+            predicate, _ = self._not()
+            return (lambda record: not predicate(record)), None
+        return self._atom()
+
+    def _atom(self):
+        token = self._next()
+        if token == "(":
+            result = self._or()
+            if self._next() != ")":
+                raise RuntimeError("ERROR: Missing ')' in condition")
+            return result
+        if token in ("1", "all") and self._peek() == "of":
+            self._next()
+            pattern = self._next()
+            names = [name for name in self.selections if pattern == "them" or fnmatch.fnmatch(name, pattern)]
+            if not names:
+                raise RuntimeError(f"ERROR: '{token} of {pattern}' matches no selection")
+            parts = [self.selections[name] for name in names]
+            predicates = [predicate for predicate, _ in parts]
+            combine = any if token == "1" else all
+            if token == "1":
+                event_names = None if any(n is None for _, n in parts) else set().union(*(n for _, n in parts))
+            else:
+                name_sets = [n for _, n in parts if n is not None]
+                event_names = set.intersection(*name_sets) if name_sets else None
+            return (lambda record: combine(predicate(record) for predicate in predicates)), event_names
+        if token not in self.selections:
+            raise RuntimeError(f"ERROR: Condition references unknown selection '{token}'")
+        return self.selections[token]
+
+
+class Rule:
+    """One compiled detection rule plus its per-group window state"""
+
+    def __init__(self, spec, path=None):
+        self.id = spec.get("id") or os.path.splitext(os.path.basename(path or "rule"))[0]
+        self.title = spec.get("title", self.id)
+        self.level = spec.get("level", "medium")
+        self.phase = spec.get("phase")
+        self.path = path
+
+        detection = dict(spec.get("detection") or {})
+        condition = detection.pop("condition", None)
+        selections = {name: compile_selection(name, selection) for name, selection in detection.items()}
+
+        correlation = spec.get("correlation") or {}
+        self.type = correlation.get("type", "single")
+        self.group_by = [field.split(".") for field in correlation.get("group-by", [])]
+        self.timespan = parse_timespan(correlation["timespan"]) if "timespan" in correlation else None
+
+        if self.type == "temporal_ordered":
+            missing = [name for name in correlation.get("ordered", []) if name not in selections]
+            if missing or len(correlation.get("ordered", [])) < 2:
+                raise RuntimeError(f"ERROR: Rule {self.id}: 'ordered' needs two or more known selections")
+            steps = [selections[name] for name in correlation["ordered"]]
+            self.steps = [predicate for predicate, _ in steps]
+            self.event_names = (None if any(names is None for _, names in steps)
+                                else set().union(*(names for _, names in steps)))
+        elif self.type in ("single", "event_count"):
+            if not condition:
+                raise RuntimeError(f"ERROR: Rule {self.id} has no detection condition")
+            self.match, self.event_names = ConditionParser(str(condition), selections).parse()
+            if self.type == "event_count":
+                self.threshold = int(correlation.get("condition", {}).get("gte", 1))
+        else:
+            raise RuntimeError(f"ERROR: Rule {self.id}: unsupported correlation type '{self.type}'")
+
+        if self.type != "single" and self.timespan is None:
+            raise RuntimeError(f"ERROR: Rule {self.id}: correlation needs a timespan")
+        self.state = {}
+        # event_count: group -> epoch until which an alerted burst is still running
+        self.quiet = {}
+        self.last_seq = 0
+
+    def group_key(self, record, event_id):
+        if not self.group_by:
+            return "" if self.type != "single" else event_id
+        return "|".join(str(get_field(record, path)) for path in self.group_by)
+
+    def _alert(self, group, events):
+        return {
+            "rule_id": self.id,
+            "title": self.title,
+            "level": self.level,
+            "phase": self.phase,
+            "group_key": group,
+            "first_seen": events[0][2],
+            "last_seen": events[-1][2],
+            "event_count": len(events),
+            "event_ids": [event[1] for event in events],
+        }
+
+    def process(self, record, event_id, event_time):
+        """Feed one event; returns an alert dict when the rule fires"""
+        if self.type == "single":
+            if self.match(record):
+                return self._alert(self.group_key(record, event_id), [(0, event_id, event_time)])
+            return None
+
+        if self.type == "event_count":
+            if not self.match(record):
+                return None
+            now = epoch(event_time)
+            group = self.group_key(record, event_id)
+            if group in self.quiet:
+                if now <= self.quiet[group]:
+                    # Same burst as the last alert (e.g. the rest of a mass delete): no duplicate alert
+                    self.quiet[group] = now + self.timespan
+                    return None
+                del self.quiet[group]
+            window = self.state.setdefault(group, deque())
+            window.append((now, event_id, event_time))
+            while now - window[0][0] > self.timespan:
+                window.popleft()
+            if len(window) >= self.threshold:
+                del self.state[group]
+                self.quiet[group] = now + self.timespan
+                return self._alert(group, list(window))
+            return None
+
+        # temporal_ordered
+        now = epoch(event_time)
+        group = self.group_key(record, event_id)
+        progress = self.state.get(group)
+        if progress and now - progress[0][0] > self.timespan:
+            progress = None
+            del self.state[group]
+        step = len(progress) if progress else 0
+        if self.steps[step](record):
+            progress = (progress or []) + [(now, event_id, event_time)]
+            if len(progress) == len(self.steps):
+                self.state.pop(group, None)
+                return self._alert(group, progress)
+            self.state[group] = progress
+        return None
+
+    def dump_state(self):
+        windows = {group: list(events) for group, events in self.state.items()}
+        if self.type == "event_count":
+            return json.dumps({"windows": windows, "quiet": self.quiet})
+        return json.dumps(windows)
+
+    def load_state(self, last_seq, state):
+        self.last_seq = last_seq
+        events = json.loads(state)
+        if self.type == "event_count":
+            # State saved before quiet periods existed is a bare {group: window} map
+            if isinstance(events.get("quiet"), dict):
+                self.quiet = events["quiet"]
+                events = events["windows"]
+            self.state = {group: deque(tuple(event) for event in window) for group, window in events.items()}
+        else:
+            self.state = {group: [tuple(event) for event in progress] for group, progress in events.items()}
+
+
+def load_rules(rules_dir=RULES_DIR):
+    rules = []
+    for path in sorted(glob.glob(os.path.join(rules_dir, "*.yml")) + glob.glob(os.path.join(rules_dir, "*.yaml"))):
+        with open(path, "r") as file:
+            for spec in yaml.safe_load_all(file):
+                if spec:
+                    rules.append(Rule(spec, path))
+    ids = [rule.id for rule in rules]
+    duplicates = {rule_id for rule_id in ids if ids.count(rule_id) > 1}
+    if duplicates:
+        raise RuntimeError(f"ERROR: Duplicate rule ids: {', '.join(sorted(duplicates))}")
+    return rules
+
+
+# --------------------------------------------------------------------------- #
+# Engine
+# --------------------------------------------------------------------------- #
+
+class DetectionEngine:
+    """Runs every rule over the events each one has not seen yet"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.by_event_name = defaultdict(list)
+        self.any_event = []
+        for rule in rules:
+            if rule.event_names is None:
+                self.any_event.append(rule)
+            else:
+                for name in rule.event_names:
+                    self.by_event_name[name.lower()].append(rule)
+        self._candidates = {}
+
+    @classmethod
+    def from_directory(cls, rules_dir=RULES_DIR):
+        return cls(load_rules(rules_dir))
+
+    def candidates(self, event_name):
+        key = (event_name or "").lower()
+        if key not in self._candidates:
+            self._candidates[key] = self.by_event_name.get(key, []) + self.any_event
+        return self._candidates[key]
+
+    def evaluate(self, connection):
+        """Evaluate new events in the index. Returns (new alerts, events scanned, seconds)."""
+        start_time = time.time()
+        connection.executescript(SCHEMA)
+        saved = {row["rule_id"]: row for row in connection.execute("SELECT * FROM detection_state")}
+        for rule in self.rules:
+            if rule.id in saved:
+                rule.load_state(saved[rule.id]["last_seq"], saved[rule.id]["state"])
+
+        max_seq = connection.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+        start_seq = min((rule.last_seq for rule in self.rules), default=max_seq)
+        alerts = []
+        scanned = 0
+        cursor = connection.execute(
+            "SELECT seq, event_id, event_time, event_name, record FROM events WHERE seq > ? AND seq <= ? "
+            "ORDER BY event_time, seq", (start_seq, max_seq)
+        )
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            for seq, event_id, event_time, event_name, raw in rows:
+                scanned += 1
+                record = None
+                for rule in self.candidates(event_name):
+                    if seq <= rule.last_seq:
+                        continue
+                    if record is None:
+                        record = json.loads(raw)
+                    alert = rule.process(record, event_id, event_time)
+                    if alert:
+                        alerts.append(alert)
+
+        detected_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        with connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO alerts (rule_id, title, level, phase, group_key, first_seen, last_seen, "
+                "event_count, event_ids, detected_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(alert["rule_id"], alert["title"], alert["level"], alert["phase"], alert["group_key"],
+                  alert["first_seen"], alert["last_seen"], alert["event_count"], json.dumps(alert["event_ids"]),
+                  detected_at) for alert in alerts]
+            )
+            new_alerts = connection.total_changes - before
+            connection.executemany(
+                "INSERT OR REPLACE INTO detection_state (rule_id, last_seq, state) VALUES (?, ?, ?)",
+                [(rule.id, max_seq, rule.dump_state()) for rule in self.rules]
+            )
+        return {
+            "rules": len(self.rules),
+            "scanned": scanned,
+            "alerts": alerts,
+            "new_alerts": new_alerts,
+            "seconds": round(time.time() - start_time, 2),
+        }
+
+
+def load_alerts(connection, since=None):
+    """Stored alerts, oldest first-seen first"""
+    connection.executescript(SCHEMA)
+    sql = "SELECT * FROM alerts"
+    params = []
+    if since:
+        sql += " WHERE first_seen >= ?"
+        params.append(since)
+    alerts = []
+    for row in connection.execute(sql + " ORDER BY first_seen, id", params):
+        alert = dict(row)
+        alert["event_ids"] = json.loads(alert["event_ids"] or "[]")
+        alerts.append(alert)
+    return alerts
+
+
+def print_alerts(summary, top=25):
+    print(colored(f"[INFO] {summary['rules']} rules evaluated over {summary['scanned']} new events "
+                  f"in {summary['seconds']}s: {summary['new_alerts']} new alerts", "cyan"))
+    alerts = sorted(summary["alerts"], key=lambda alert: alert["first_seen"])
+    for alert in alerts[:top]:
+        color = LEVEL_COLORS.get(alert["level"], "white")
+        events = f" ({alert['event_count']} events until {alert['last_seen']})" if alert["event_count"] > 1 else ""
+        group = f" [{alert['group_key']}]" if alert["group_key"] and alert["event_count"] > 1 else ""
+        print(colored(f"  [{alert['level'].upper():<8}] {alert['first_seen']}  {alert['title']}{group}{events}", color))
+    if len(alerts) > top:
+        print(colored(f"  ... and {len(alerts) - top} more (see the alerts table in the CloudTrail index)", "cyan"))
+
+
+def run_detections(db_path=DB_PATH, rules_dir=RULES_DIR):
+    """Evaluate the rules over everything new in the CloudTrail index and print the alerts"""
+    engine = DetectionEngine.from_directory(rules_dir)
+    connection = open_index(db_path)
+    try:
+        summary = engine.evaluate(connection)
+    finally:
+        connection.close()
+    print_alerts(summary)
+    return summary
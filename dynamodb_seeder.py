@@ -0,0 +1,170 @@
+"""
+DynamoDB Seed Loader
+
+Bulk-loads the lab's DynamoDB tables after `pulumi up` instead of tracking
+every row as a Pulumi TableItem. Each table's rows are split into segments
+that are generated and written concurrently with BatchWriteItem; unprocessed
+items are retried with exponential backoff and jitter.
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from termcolor import colored
+from tqdm import tqdm
+
+from data_generator import DEFAULT_BATCH_SIZE, DEFAULT_SEED, INTEGER_FIELDS, generate_batches, resolve_schema
+from seed_manifest import combine_digests, format_digest, item_digest
+
+
+DEFAULT_SEED_ROWS = 1000
+DEFAULT_WORKERS = 16
+
+# BatchWriteItem accepts at most 25 put/delete requests per call
+BATCH_WRITE_LIMIT = 25
+MAX_ATTEMPTS = 10
+BACKOFF_BASE_SECONDS = 0.05
+BACKOFF_CAP_SECONDS = 5.0
+RETRYABLE_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "InternalServerError",
+}
+
+# Stack output key -> data_generator schema seeded into that table
+LAB_TABLES = {
+    "CustomerOrdersTable": "orders",
+    "CustomerSSNTable": "ssn",
+}
+
+
+def to_dynamodb_items(schema, batch):
+    """Convert a data_generator column batch into DynamoDB attribute-value items"""
+    columns = resolve_schema(schema)
+    names = list(columns)
+    types = ["N" if columns[name] in INTEGER_FIELDS else "S" for name in names]
+    values = [batch[name].astype(str).tolist() for name in names]
+    return [
+        {name: {attr_type: value} for name, attr_type, value in zip(names, types, row)}
+        for row in zip(*values)
+    ]
+
+
+class DynamoDBSeeder:
+    """Segmented, concurrent BatchWriteItem loader"""
+
+    def __init__(self, session=None, workers=DEFAULT_WORKERS, region="us-east-1"):
+        session = session or boto3.Session(region_name=region)
+        self.workers = workers
+        # One pooled client shared by every worker thread (boto3 clients are thread-safe)
+        self.dynamodb_client = session.client(
+            "dynamodb",
+            config=Config(max_pool_connections=max(10, workers * 2), retries={"mode": "standard"})
+        )
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        time.sleep(random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))))
+
+    def write_batch(self, table_name, items):
+        """Write up to 25 items, retrying unprocessed items until none remain. Returns retry count."""
+        return self.write_requests(table_name, [{"PutRequest": {"Item": item}} for item in items])
+
+    def write_requests(self, table_name, requests):
+        """Send up to 25 PutRequest/DeleteRequest entries, retrying unprocessed ones. Returns retry count."""
+        request_items = {table_name: requests}
+        retries = 0
+
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                response = self.dynamodb_client.batch_write_item(RequestItems=request_items)
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in RETRYABLE_ERRORS:
+                    raise
+                retries += 1
+                self._backoff(attempt)
+                continue
+
+            request_items = response.get("UnprocessedItems") or {}
+            if not request_items:
+                return retries
+            retries += 1
+            self._backoff(attempt)
+
+        raise RuntimeError(f"ERROR: {table_name}: items still unprocessed after {MAX_ATTEMPTS} attempts")
+
+    def _segments(self, rows):
+        """Split [0, rows) into contiguous segments, one per worker, on BatchWriteItem boundaries"""
+        if rows <= 0:
+            return []
+        # Split on write chunks rather than generator batches (10000 rows), so small tables
+        # still use every worker; each segment regenerates the batch it starts in
+        chunks = -(-rows // BATCH_WRITE_LIMIT)
+        per_segment = -(-chunks // self.workers) * BATCH_WRITE_LIMIT
+        return [(start, min(rows, start + per_segment)) for start in range(0, rows, per_segment)]
+
+    def _seed_segment(self, table_name, schema, start, end, seed, batch_size, progress):
+        """Generate and write rows [start, end) of a table. Returns (written, retries, items digest)."""
+        written = 0
+        retries = 0
+        digest = 0
+        for batch in generate_batches(schema, end, seed=seed, batch_size=batch_size, start=start):
+            items = to_dynamodb_items(schema, batch)
+            digest = combine_digests([digest] + [item_digest(item) for item in items])
+            for offset in range(0, len(items), BATCH_WRITE_LIMIT):
+                chunk = items[offset:offset + BATCH_WRITE_LIMIT]
+                retries += self.write_batch(table_name, chunk)
+                written += len(chunk)
+                progress.update(len(chunk))
+        return written, retries, digest
+
+    def seed_table(self, table_name, schema, rows, seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE):
+        """Seed `rows` generated records into a table. Returns a summary dict (also its manifest entry)."""
+        start_time = time.time()
+        written = 0
+        retries = 0
+        digests = []
+
+        with tqdm(total=rows, desc=f"Seeding {table_name}", unit="item") as progress, \
+                ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self._seed_segment, table_name, schema, start, end, seed, batch_size, progress)
+                for start, end in self._segments(rows)
+            ]
+            for future in as_completed(futures):
+                segment_written, segment_retries, segment_digest = future.result()
+                written += segment_written
+                retries += segment_retries
+                digests.append(segment_digest)
+
+        elapsed = time.time() - start_time
+        return {
+            "table": table_name,
+            "schema": schema,
+            "rows": rows,
+            "seed": seed,
+            "batch_size": batch_size,
+            "items": written,
+            "items_digest": format_digest(combine_digests(digests)),
+            "retries": retries,
+            "seconds": round(elapsed, 2),
+            "items_per_second": round(written / elapsed, 1) if elapsed else None,
+        }
+
+    def seed_lab_tables(self, outputs, rows=DEFAULT_SEED_ROWS, seed=DEFAULT_SEED):
+        """Seed every lab table listed in LAB_TABLES using names from the stack outputs"""
+        summaries = []
+        for output_key, schema in LAB_TABLES.items():
+            table_name = outputs[output_key]
+            print(colored(f"[INFO] Seeding {rows} items into {table_name}...", "cyan"))
+            summary = dict(self.seed_table(table_name, schema, rows, seed=seed), output_key=output_key)
+            print(colored(
+                f"[SUCCESS] {table_name}: {summary['items']} items in {summary['seconds']}s "
+                f"({summary['items_per_second']} items/s, {summary['retries']} retries)", "green"))
+            summaries.append(summary)
+        return summaries
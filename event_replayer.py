@@ -0,0 +1,503 @@
+"""
+CloudTrail Event Replayer
+
+Load-tests SIEM/XDR ingestion with CloudTrail traffic at production volume.
+A recorded scenario event stream (from the local CloudTrail index or a
+fixture file) is mixed into seeded benign background activity and replayed
+at a target rate to files, an HTTP collector or a syslog collector.
+
+- Every record is pre-rendered once as a %-format template; only eventTime,
+  eventID, requestID (and the source IP of background events) are filled in
+  per event, which keeps generation well above 100k events/s.
+- Events are sent in batches by a pool of sender threads, gzip-compressed
+  (compression runs outside the GIL). The queue between the generator and
+  the senders is bounded, so a slow collector throttles generation instead
+  of growing memory; HTTP 429/503 responses are retried with backoff.
+- Replayed events get fresh eventIDs and eventTimes that advance at the
+  target rate, so repeated replays never collide in the SIEM.
+
+Usage:
+    python event_replayer.py --total 5000000 --rate 100000 --sink file:./replay
+    python event_replayer.py --fixture attack.json.gz --loops 20 --sink http://127.0.0.1:8088/ingest
+    python event_replayer.py --run latest --duration 60 --sink syslog://127.0.0.1:5514
+"""
+
+import argparse
+import bisect
+import gzip
+import http.client
+import itertools
+import json
+import os
+import queue
+import random
+import socket
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime, timezone
+
+from termcolor import colored
+
+from data_generator import DEFAULT_SEED
+
+
+DEFAULT_RATE = 100_000
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_IN_FLIGHT = 16
+MAX_SEND_ATTEMPTS = 5
+DEFAULT_ACCOUNT = "123456789012"
+
+# Filled in per event, in this order, at the end of every template
+BACKGROUND_FIELDS = ("eventTime", "eventID", "requestID", "sourceIPAddress")
+SCENARIO_FIELDS = ("eventTime", "eventID")
+
+# (weight, eventSource, eventName, readOnly, requestParameters variants)
+BACKGROUND_EVENTS = [
+    (30, "s3.amazonaws.com", "GetObject", True,
+     [{"bucketName": f"app-assets-{n}", "key": f"static/{n}/bundle.js"} for n in range(4)]),
+    (12, "s3.amazonaws.com", "PutObject", False,
+     [{"bucketName": f"app-logs-{n}", "key": f"2026/10/{n:02d}/app.log"} for n in range(4)]),
+    (10, "s3.amazonaws.com", "ListObjects", True, [{"bucketName": f"app-assets-{n}", "prefix": "static/"} for n in range(4)]),
+    (8, "sts.amazonaws.com", "AssumeRole", True,
+     [{"roleArn": f"arn:aws:iam::{{account}}:role/app-role-{n}", "roleSessionName": f"session-{n}"} for n in range(4)]),
+    (8, "sts.amazonaws.com", "GetCallerIdentity", True, [None]),
+    (7, "ec2.amazonaws.com", "DescribeInstances", True, [{"instancesSet": {}, "filterSet": {}}]),
+    (5, "ec2.amazonaws.com", "DescribeSecurityGroups", True, [{"securityGroupSet": {}, "filterSet": {}}]),
+    (5, "kms.amazonaws.com", "Decrypt", True, [{"encryptionAlgorithm": "SYMMETRIC_DEFAULT"}]),
+    (4, "dynamodb.amazonaws.com", "DescribeTable", True, [{"tableName": f"app-table-{n}"} for n in range(4)]),
+    (3, "dynamodb.amazonaws.com", "ListTables", True, [None]),
+    (3, "iam.amazonaws.com", "GetUser", True, [None]),
+    (2, "iam.amazonaws.com", "ListRoles", True, [None]),
+    (2, "lambda.amazonaws.com", "GetFunction20150331v2", True, [{"functionName": f"app-fn-{n}"} for n in range(4)]),
+    (1, "signin.amazonaws.com", "ConsoleLogin", False, [None]),
+]
+USER_AGENTS = ["aws-cli/2.15.0 Python/3.11.6 Linux/6.1 exe/x86_64", "Boto3/1.34.0 Python/3.11.6 Botocore/1.34.0",
+               "aws-sdk-java/2.21.0 Linux/6.1 OpenJDK_64-Bit_Server_VM/17.0.9", "console.amazonaws.com"]
+
+
+def iso_second(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def record_template(record, fields):
+    """Record as a %-format string with the given fields appended as %s placeholders"""
+    rest = {key: value for key, value in record.items() if key not in fields}
+    body = json.dumps(rest, separators=(",", ":")).replace("%", "%%")
+    tail = ",".join(f'"{field}":"%s"' for field in fields)
+    return f"{body[:-1]},{tail}}}" if rest else f"{{{tail}}}"
+
+
+def load_index_events(db_path=None, since=None, until=None):
+    """Recorded events from the local CloudTrail index, oldest first (since/until are ISO 8601)"""
+    from cloudtrail_ingest import DB_PATH, open_index, query
+
+    db_path = db_path or DB_PATH
+    if not os.path.exists(db_path):
+        raise RuntimeError(f"ERROR: No CloudTrail index at {db_path}. Run 'ingest_cloudtrail' first.")
+    connection = open_index(db_path)
+    try:
+        return [json.loads(row["record"]) for row in query(connection, since=since, until=until)]
+    finally:
+        connection.close()
+
+
+def load_run_events(run_id, db_path=None):
+    """Indexed events recorded during one attack run ('latest' for the most recent)"""
+    import run_timeline
+
+    runs = run_timeline.load_runs(include_rehearsals=True)
+    run = runs[-1] if runs and run_id == "latest" else next((run for run in runs if run["run_id"] == run_id), None)
+    if run is None:
+        raise RuntimeError(f"ERROR: No attack run '{run_id}' in {run_timeline.RUNS_DIR}")
+    since = iso_second(run_timeline.parse_time(run["started"]) - 1)
+    until = iso_second(run_timeline.parse_time(run["finished"]) + 1)
+    return load_index_events(db_path, since=since, until=until)
+
+
+def load_fixture(path):
+    """Records from a CloudTrail log file ({"Records": [...]}), a JSON list or NDJSON, optionally gzipped"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as file:
+        text = file.read()
+    try:
+        document = json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return document.get("Records", []) if isinstance(document, dict) else document
+
+
+def background_templates(rng, account, identities=60):
+    """(templates, cumulative weights) for benign activity by a fixed population of users and roles"""
+    population = []
+    for n in range(identities):
+        if n % 3 == 2:
+            principal = f"AROA{n:016d}:session-{n}"
+            population.append({"type": "AssumedRole", "principalId": principal,
+                               "arn": f"arn:aws:sts::{account}:assumed-role/app-role-{n % 4}/session-{n}",
+                               "accountId": account, "accessKeyId": f"ASIA{n:016d}",
+                               "sessionContext": {"sessionIssuer": {
+                                   "type": "Role", "principalId": f"AROA{n:016d}", "accountId": account,
+                                   "arn": f"arn:aws:iam::{account}:role/app-role-{n % 4}",
+                                   "userName": f"app-role-{n % 4}"}}})
+        else:
+            population.append({"type": "IAMUser", "principalId": f"AIDA{n:016d}",
+                               "arn": f"arn:aws:iam::{account}:user/svc-user-{n}", "accountId": account,
+                               "accessKeyId": f"AKIA{n:016d}", "userName": f"svc-user-{n}"})
+
+    templates, weights = [], []
+    for weight, source, name, read_only, variants in BACKGROUND_EVENTS:
+        for identity in population:
+            for parameters in variants:
+                if parameters:
+                    parameters = json.loads(json.dumps(parameters).replace("{account}", account))
+                record = {
+                    "eventVersion": "1.09",
+                    "userIdentity": identity,
+                    "eventSource": source,
+                    "eventName": name,
+                    "awsRegion": "us-east-1",
+                    "userAgent": rng.choice(USER_AGENTS),
+                    "requestParameters": parameters,
+                    "responseElements": None,
+                    "readOnly": read_only,
+                    "eventType": "AwsApiCall",
+                    "managementEvent": source != "s3.amazonaws.com",
+                    "recipientAccountId": account,
+                    "eventCategory": "Data" if source == "s3.amazonaws.com" else "Management",
+                }
+                templates.append(record_template(record, BACKGROUND_FIELDS))
+                weights.append(weight / (len(population) * len(variants)))
+    return templates, list(itertools.accumulate(weights))
+
+
+class ReplayStream:
+    """Batches of rendered events: background activity with the scenario events mixed in"""
+
+    def __init__(self, scenario, total, rate=DEFAULT_RATE, loops=1, seed=DEFAULT_SEED, start_time=None,
+                 batch_size=DEFAULT_BATCH_SIZE):
+        self.rng = random.Random(seed)
+        account = next((record.get("recipientAccountId") for record in scenario
+                        if record.get("recipientAccountId")), DEFAULT_ACCOUNT)
+        self.templates, self.cum_weights = background_templates(self.rng, account)
+        self.ips = [f"10.{self.rng.randrange(256)}.{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}"
+                    for _ in range(1500)]
+        self.ips += [f"{self.rng.randrange(1, 224)}.{self.rng.randrange(256)}.{self.rng.randrange(256)}."
+                     f"{self.rng.randrange(1, 255)}" for _ in range(500)]
+
+        self.scenario_templates = [record_template(record, SCENARIO_FIELDS) for record in scenario]
+        if len(self.scenario_templates) * loops > total:
+            raise RuntimeError(f"ERROR: {len(self.scenario_templates) * loops} scenario events don't fit "
+                               f"in {total} total events")
+        self.total = total
+        self.batch_size = batch_size
+        # Event times advance at the target rate (or DEFAULT_RATE when unthrottled)
+        self.seconds_per_event = 1 / (rate or DEFAULT_RATE)
+        self.start_time = start_time or time.time()
+        self.event_prefix = str(uuid.UUID(int=self.rng.getrandbits(128)))[:24]
+        self.request_prefix = f"{self.rng.getrandbits(32):08X}"
+        self.positions = self._scenario_positions(scenario, loops)
+        self.scenario_indexes = sorted(self.positions)
+
+    def _scenario_positions(self, scenario, loops):
+        """{stream index: scenario template} keeping each copy's original relative timing"""
+        if not scenario:
+            return {}
+        times = [datetime.fromisoformat(record["eventTime"].replace("Z", "+00:00")).timestamp()
+                 for record in scenario]
+        span = (max(times) - min(times)) or 1
+        segment = self.total // loops
+        positions = {}
+        for copy in range(loops):
+            base = copy * segment
+            for template, event_time in zip(self.scenario_templates, times):
+                index = base + int((event_time - times[0]) / span * (segment - len(scenario)))
+                while index in positions:
+                    index += 1
+                positions[index] = template
+        return positions
+
+    def batch(self, start, count):
+        """Rendered events [start, start + count) as a list of JSON strings"""
+        indexes = range(start, start + count)
+        seconds_per_event = self.seconds_per_event
+        first_second = int(self.start_time + start * seconds_per_event)
+        last_second = int(self.start_time + (start + count) * seconds_per_event)
+        stamps = {second: iso_second(second) for second in range(first_second, last_second + 1)}
+        start_time = self.start_time
+        times = [stamps[int(start_time + index * seconds_per_event)] for index in indexes]
+
+        event_prefix, request_prefix = self.event_prefix, self.request_prefix
+        templates = self.rng.choices(self.templates, cum_weights=self.cum_weights, k=count)
+        ips = self.rng.choices(self.ips, k=count)
+        lines = [
+            template % (stamp, f"{event_prefix}{index:012x}", f"{request_prefix}{index:012X}", ip)
+            for template, stamp, index, ip in zip(templates, times, indexes, ips)
+        ]
+        first = bisect.bisect_left(self.scenario_indexes, start)
+        last = bisect.bisect_left(self.scenario_indexes, start + count)
+        for index in self.scenario_indexes[first:last]:
+            lines[index - start] = self.positions[index] % (times[index - start], f"{event_prefix}{index:012x}")
+        return lines
+
+    def batches(self):
+        for start in range(0, self.total, self.batch_size):
+            yield self.batch(start, min(self.batch_size, self.total - start))
+
+
+def render(lines, fmt):
+    if fmt == "cloudtrail":
+        return ('{"Records":[' + ",".join(lines) + "]}").encode()
+    if fmt == "syslog":
+        # RFC 5424 (facility log audit, severity info) with RFC 6587 octet-counting framing
+        host = socket.gethostname()
+        messages = [f"<110>1 - {host} cloudtrail - - - {line}" for line in lines]
+        return "".join(f"{len(message)} {message}" for message in messages).encode()
+    return ("\n".join(lines) + "\n").encode()
+
+
+class FileSink:
+    """One file per batch, like a trail delivering log files"""
+
+    def __init__(self, directory, fmt="cloudtrail", compress=True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.extension = (".json" if fmt == "cloudtrail" else ".ndjson") + (".gz" if compress else "")
+        self.counter = itertools.count()
+        self.compress = compress
+
+    def send(self, payload):
+        path = os.path.join(self.directory, f"replay-{next(self.counter):07d}{self.extension}")
+        with open(path, "wb") as file:
+            file.write(payload)
+
+    def close(self):
+        pass
+
+
+class HttpSink:
+    """POSTs each batch to a collector over a kept-alive connection per sender thread"""
+
+    def __init__(self, url, fmt="ndjson", compress=True, timeout=30):
+        parsed = urllib.parse.urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+        self.netloc = parsed.netloc
+        self.path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        self.headers = {"Content-Type": "application/json" if fmt == "cloudtrail" else "application/x-ndjson"}
+        if compress:
+            self.headers["Content-Encoding"] = "gzip"
+        self.timeout = timeout
+        self.local = threading.local()
+        self.compress = compress
+        self.retries = 0
+
+    def _connection(self):
+        if getattr(self.local, "connection", None) is None:
+            self.local.connection = self.connection_class(self.netloc, timeout=self.timeout)
+        return self.local.connection
+
+    def send(self, payload):
+        for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+            delay = min(0.1 * 2 ** attempt, 5)
+            try:
+                connection = self._connection()
+                connection.request("POST", self.path, body=payload, headers=self.headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status < 300:
+                    return
+                if response.status not in (429, 502, 503, 504):
+                    raise RuntimeError(f"ERROR: Collector rejected batch: HTTP {response.status}")
+                delay = float(response.getheader("Retry-After") or delay)
+            except (OSError, http.client.HTTPException):
+                self.local.connection.close()
+                self.local.connection = None
+                if attempt == MAX_SEND_ATTEMPTS:
+                    raise
+            self.retries += 1
+            time.sleep(delay)
+        raise RuntimeError(f"ERROR: Collector still busy after {MAX_SEND_ATTEMPTS} attempts")
+
+    def close(self):
+        pass
+
+
+class SyslogSink:
+    """Octet-counted RFC 5424 messages over TCP, one connection per sender thread"""
+
+    def __init__(self, host, port, timeout=30):
+        self.address = (host, port)
+        self.timeout = timeout
+        self.local = threading.local()
+        self.compress = False
+        self.sockets = []
+
+    def send(self, payload):
+        if getattr(self.local, "socket", None) is None:
+            self.local.socket = socket.create_connection(self.address, timeout=self.timeout)
+            self.sockets.append(self.local.socket)
+        # sendall blocks while the collector's receive window is full: that's the backpressure
+        self.local.socket.sendall(payload)
+
+    def close(self):
+        for connection in self.sockets:
+            connection.close()
+
+
+def open_sink(target, fmt, compress=True):
+    """file:DIR, http(s)://host:port/path or syslog://host:port"""
+    if target.startswith(("http://", "https://")):
+        return HttpSink(target, fmt=fmt, compress=compress)
+    if target.startswith("syslog://"):
+        parsed = urllib.parse.urlsplit(target)
+        return SyslogSink(parsed.hostname, parsed.port or 514)
+    if target.startswith("file:"):
+        return FileSink(target[len("file:"):], fmt=fmt, compress=compress)
+    raise RuntimeError(f"ERROR: Unknown sink '{target}' (expected file:DIR, http://... or syslog://host:port)")
+
+
+class Replayer:
+    """Paces a ReplayStream into a sink through a bounded queue of batches and a pool of senders"""
+
+    def __init__(self, stream, sink, fmt="ndjson", rate=DEFAULT_RATE, workers=DEFAULT_WORKERS,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        self.stream = stream
+        self.sink = sink
+        self.fmt = "syslog" if isinstance(sink, SyslogSink) else fmt
+        self.rate = rate
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=max_in_flight)
+        self.lock = threading.Lock()
+        self.sent = self.raw_bytes = self.wire_bytes = 0
+        self.failures = []
+
+    def _sender(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            payload = render(item, self.fmt)
+            wire = gzip.compress(payload, compresslevel=1) if self.sink.compress else payload
+            try:
+                self.sink.send(wire)
+            except Exception as e:
+                with self.lock:
+                    self.failures.append(str(e))
+                continue
+            with self.lock:
+                self.sent += len(item)
+                self.raw_bytes += len(payload)
+                self.wire_bytes += len(wire)
+
+    def run(self, progress_every=5):
+        """Replay the whole stream. Returns a summary dict."""
+        threads = [threading.Thread(target=self._sender, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        start_time = time.perf_counter()
+        produced = 0
+        stalled = 0.0
+        next_report = start_time + progress_every
+        try:
+            for lines in self.stream.batches():
+                if self.rate:
+                    # Hold the batch until the schedule reaches it
+                    delay = start_time + produced / self.rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                blocked_at = time.perf_counter()
+                self.queue.put(lines)
+                stalled += time.perf_counter() - blocked_at
+                produced += len(lines)
+                now = time.perf_counter()
+                if now >= next_report:
+                    print(colored(f"[INFO] {produced:,} events generated, {self.sent:,} sent "
+                                  f"({self.sent / (now - start_time):,.0f} events/s)", "cyan"))
+                    next_report = now + progress_every
+        finally:
+            for _ in threads:
+                self.queue.put(None)
+            for thread in threads:
+                thread.join()
+            self.sink.close()
+
+        seconds = time.perf_counter() - start_time
+        return {
+            "events": produced,
+            "sent": self.sent,
+            "scenario_events": len(self.stream.positions),
+            "seconds": round(seconds, 2),
+            "events_per_second": round(self.sent / seconds) if seconds else 0,
+            "raw_mb": round(self.raw_bytes / 1e6, 1),
+            "wire_mb": round(self.wire_bytes / 1e6, 1),
+            "backpressure_seconds": round(stalled, 2),
+            "retries": getattr(self.sink, "retries", 0),
+            "failures": self.failures,
+        }
+
+
+def print_summary(summary, target_rate):
+    color = "yellow" if summary["failures"] or summary["sent"] < summary["events"] else "green"
+    print(colored(f"[INFO] Replayed {summary['sent']:,}/{summary['events']:,} events "
+                  f"({summary['scenario_events']:,} scenario) in {summary['seconds']}s: "
+                  f"{summary['events_per_second']:,} events/s (target {target_rate or 'unthrottled'})", color))
+    print(colored(f"[INFO] {summary['raw_mb']} MB rendered, {summary['wire_mb']} MB sent; "
+                  f"{summary['backpressure_seconds']}s blocked on the collector, {summary['retries']} retries", "cyan"))
+    for failure in summary["failures"][:10]:
+        print(colored(f"  [✘] {failure}", "red"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay scenario CloudTrail events mixed into background "
+                                                 "activity at a target rate")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--fixture", help="CloudTrail log file / JSON list / NDJSON of scenario events (.gz ok)")
+    source.add_argument("--run", help="Scenario events of one attack run from the index ('latest' or a run id)")
+    source.add_argument("--no-scenario", action="store_true", help="Background activity only")
+    parser.add_argument("--db", default=None, help="CloudTrail index (default: Infra/cloudtrail-index.sqlite)")
+    parser.add_argument("--total", type=int, default=None, help="Events to replay (default: rate x duration)")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of traffic when --total isn't given")
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE, help="Target events/s (0: as fast as possible)")
+    parser.add_argument("--loops", type=int, default=1, help="Copies of the scenario spread across the replay")
+    parser.add_argument("--sink", default="file:./replay", help="file:DIR, http://host:port/path or syslog://host:port")
+    parser.add_argument("--format", dest="fmt", choices=["cloudtrail", "ndjson"], default=None,
+                        help="Batch format (default: cloudtrail for files, ndjson for HTTP)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Events per batch")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Sender threads")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="Batches queued for the senders before generation blocks")
+    parser.add_argument("--no-gzip", action="store_true", help="Send batches uncompressed")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Background activity seed")
+    args = parser.parse_args()
+
+    try:
+        if args.fixture:
+            scenario = load_fixture(args.fixture)
+        elif args.no_scenario:
+            scenario = []
+        elif args.run:
+            scenario = load_run_events(args.run, args.db)
+        else:
+            scenario = load_index_events(args.db)
+        fmt = args.fmt or ("cloudtrail" if args.sink.startswith("file:") else "ndjson")
+        total = args.total or int((args.rate or DEFAULT_RATE) * args.duration)
+        stream = ReplayStream(scenario, total, rate=args.rate, loops=args.loops, seed=args.seed,
+                              batch_size=args.batch_size)
+        sink = open_sink(args.sink, fmt, compress=not args.no_gzip)
+    except (RuntimeError, OSError, ValueError) as e:
+        print(colored(f"[ERROR] {e}", "red"))
+        raise SystemExit(1)
+
+    print(colored(f"[INFO] Replaying {total:,} events ({len(scenario):,} scenario events x {args.loops}) "
+                  f"to {args.sink}...", "cyan"))
+    summary = Replayer(stream, sink, fmt=fmt, rate=args.rate, workers=args.workers,
+                       max_in_flight=args.max_in_flight).run()
+    print_summary(summary, args.rate)
+    raise SystemExit(1 if summary["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+IAM Teardown Executor
+
+Deletes lab IAM users concurrently. Each user becomes a small dependency
+graph: MFA devices, access keys, login profile, attached policies, inline
+policies and group memberships must all be gone before DeleteUser succeeds,
+but they do not depend on each other, so they run in parallel. Every step of
+every user is scheduled on one worker pool as soon as its dependencies are
+done. A single shared IAM client uses botocore's adaptive retry mode, which
+backs off and rate-limits client-side when IAM throttles.
+"""
+
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from termcolor import colored
+
+
+DEFAULT_WORKERS = 16
+MAX_ATTEMPTS = 10
+
+PREREQUISITE_STEPS = [
+    "mfa_devices",
+    "access_keys",
+    "login_profile",
+    "attached_policies",
+    "inline_policies",
+    "groups",
+]
+
+# step -> steps that must finish first (the user can only be deleted once nothing references it)
+DEPENDENCIES = {step: [] for step in PREREQUISITE_STEPS}
+DEPENDENCIES["user"] = list(PREREQUISITE_STEPS)
+
+STEP_LABELS = {
+    "mfa_devices": "MFA devices",
+    "access_keys": "access keys",
+    "login_profile": "login profiles",
+    "attached_policies": "attached policies",
+    "inline_policies": "inline policies",
+    "groups": "group memberships",
+    "user": "users",
+}
+
+
+def _missing(error):
+    return error.response["Error"]["Code"] == "NoSuchEntity"
+
+
+class IAMTeardown:
+    """Dependency-aware, concurrent deletion of IAM users"""
+
+    def __init__(self, session=None, workers=DEFAULT_WORKERS, region="us-east-1"):
+        session = session or boto3.Session(region_name=region)
+        self.workers = workers
+        self.iam_client = session.client(
+            "iam",
+            config=Config(max_pool_connections=max(10, workers * 2),
+                          retries={"mode": "adaptive", "max_attempts": MAX_ATTEMPTS})
+        )
+        self.api_calls = Counter()
+        self.iam_client.meta.events.register("before-call.iam", self._count_call)
+
+    def _count_call(self, model, **kwargs):
+        self.api_calls[model.name] += 1
+
+    def _paginate(self, operation, key, **kwargs):
+        for page in self.iam_client.get_paginator(operation).paginate(**kwargs):
+            yield from page[key]
+
+    # ------------------------------------------------------------------ #
+    # Steps: each returns the list of things it deleted
+    # ------------------------------------------------------------------ #
+
+    def delete_mfa_devices(self, user):
+        deleted = []
+        for device in list(self._paginate("list_mfa_devices", "MFADevices", UserName=user)):
+            serial = device["SerialNumber"]
+            self.iam_client.deactivate_mfa_device(UserName=user, SerialNumber=serial)
+            if ":mfa/" in serial:
+                # Virtual devices exist independently of the user and must be deleted too
+                self.iam_client.delete_virtual_mfa_device(SerialNumber=serial)
+            deleted.append(serial)
+        return deleted
+
+    def delete_access_keys(self, user):
+        deleted = []
+        for key in list(self._paginate("list_access_keys", "AccessKeyMetadata", UserName=user)):
+            self.iam_client.delete_access_key(UserName=user, AccessKeyId=key["AccessKeyId"])
+            deleted.append(key["AccessKeyId"])
+        return deleted
+
+    def delete_login_profile(self, user):
+        try:
+            self.iam_client.delete_login_profile(UserName=user)
+            return ["login_profile"]
+        except ClientError as e:
+            if _missing(e):
+                return []
+            raise
+
+    def detach_policies(self, user):
+        deleted = []
+        for policy in list(self._paginate("list_attached_user_policies", "AttachedPolicies", UserName=user)):
+            self.iam_client.detach_user_policy(UserName=user, PolicyArn=policy["PolicyArn"])
+            deleted.append(policy["PolicyArn"])
+        return deleted
+
+    def delete_inline_policies(self, user):
+        deleted = []
+        for policy_name in list(self._paginate("list_user_policies", "PolicyNames", UserName=user)):
+            self.iam_client.delete_user_policy(UserName=user, PolicyName=policy_name)
+            deleted.append(policy_name)
+        return deleted
+
+    def remove_from_groups(self, user):
+        deleted = []
+        for group in list(self._paginate("list_groups_for_user", "Groups", UserName=user)):
+            self.iam_client.remove_user_from_group(UserName=user, GroupName=group["GroupName"])
+            deleted.append(group["GroupName"])
+        return deleted
+
+    def delete_user(self, user):
+        self.iam_client.delete_user(UserName=user)
+        return [user]
+
+    def _step_function(self, step):
+        return {
+            "mfa_devices": self.delete_mfa_devices,
+            "access_keys": self.delete_access_keys,
+            "login_profile": self.delete_login_profile,
+            "attached_policies": self.detach_policies,
+            "inline_policies": self.delete_inline_policies,
+            "groups": self.remove_from_groups,
+            "user": self.delete_user,
+        }[step]
+
+    def _run_step(self, user, step):
+        start_time = time.time()
+        try:
+            result = {"status": "ok", "deleted": self._step_function(step)(user)}
+        except ClientError as e:
+            if _missing(e):
+                # User (or the thing being removed) is already gone
+                result = {"status": "absent", "deleted": []}
+            else:
+                result = {"status": "failed", "deleted": [], "error": str(e)}
+        except Exception as e:
+            result = {"status": "failed", "deleted": [], "error": str(e)}
+        result["started"] = start_time
+        result["finished"] = time.time()
+        result["seconds"] = result["finished"] - start_time
+        return result
+
+    # ------------------------------------------------------------------ #
+
+    def teardown(self, users):
+        """Delete every user in `users` concurrently. Returns a summary dict."""
+        users = list(dict.fromkeys(users))
+        results = {user: {} for user in users}
+        remaining = {(user, step): set(deps) for user in users for step, deps in DEPENDENCIES.items()}
+        start_time = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = {}
+
+            def schedule():
+                for task, deps in list(remaining.items()):
+                    if deps:
+                        continue
+                    del remaining[task]
+                    user, step = task
+                    blocked = [dep for dep in DEPENDENCIES[step] if results[user][dep]["status"] == "failed"]
+                    if blocked:
+                        now = time.time()
+                        results[user][step] = {"status": "skipped", "deleted": [], "seconds": 0.0,
+                                               "started": now, "finished": now,
+                                               "error": f"blocked by failed {', '.join(blocked)}"}
+                        if step == "user":
+                            self._print_user(user, results[user])
+                        finish(task)
+                    else:
+                        in_flight[executor.submit(self._run_step, user, step)] = task
+
+            def finish(task):
+                for waiting_task, deps in remaining.items():
+                    if waiting_task[0] == task[0]:
+                        deps.discard(task[1])
+
+            schedule()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    results[task[0]][task[1]] = future.result()
+                    if task[1] == "user":
+                        self._print_user(task[0], results[task[0]])
+                    finish(task)
+                schedule()
+
+        return self._summary(results, time.time() - start_time)
+
+    def _print_user(self, user, steps):
+        status = steps["user"]["status"]
+        deleted = sum(len(step["deleted"]) for step in steps.values())
+        if status == "ok":
+            print(colored(f"  [SUCCESS] `{user}` deleted ({deleted} IAM entities removed)", "green"))
+        elif status == "absent":
+            print(colored(f"  [INFO] `{user}` was already deleted", "cyan"))
+        else:
+            errors = [f"{name}: {step['error']}" for name, step in steps.items() if step.get("error")]
+            print(colored(f"  [ERROR] Failed to delete `{user}`: {'; '.join(errors)}", "red"))
+
+    def _summary(self, results, elapsed):
+        deleted_by_step = Counter()
+        failures = []
+        for user, steps in results.items():
+            for step, result in steps.items():
+                deleted_by_step[step] += len(result["deleted"])
+                if result["status"] in ("failed", "skipped"):
+                    failures.append({"user": user, "step": step, "error": result["error"]})
+        return {
+            "users": {
+                user: {
+                    "status": steps["user"]["status"],
+                    "deleted": {step: result["deleted"] for step, result in steps.items() if result["deleted"]},
+                    # Wall time from the user's first step starting to its last one finishing
+                    "seconds": round(max(result["finished"] for result in steps.values()) -
+                                     min(result["started"] for result in steps.values()), 2),
+                }
+                for user, steps in results.items()
+            },
+            "deleted": dict(deleted_by_step),
+            "failures": failures,
+            "api_calls": sum(self.api_calls.values()),
+            "seconds": round(elapsed, 2),
+            # What the same steps would have cost run one after another
+            "serial_seconds": round(sum(result["seconds"] for steps in results.values() for result in steps.values()), 2),
+        }
+
+
+def print_summary(summary):
+    deleted_users = [user for user, result in summary["users"].items() if result["status"] == "ok"]
+    print(colored(f"\n[INFO] IAM teardown: {len(deleted_users)}/{len(summary['users'])} users deleted in "
+                  f"{summary['seconds']}s ({summary['serial_seconds']}s of IAM work, {summary['api_calls']} API calls)",
+                  "cyan"))
+    removed = ", ".join(f"{summary['deleted'][step]} {label}" for step, label in STEP_LABELS.items()
+                        if summary["deleted"].get(step))
+    if removed:
+        print(colored(f"[INFO] Removed: {removed}", "cyan"))
+    for failure in summary["failures"]:
+        print(colored(f"[ERROR] {failure['user']} / {failure['step']}: {failure['error']}", "red"))
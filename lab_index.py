@@ -0,0 +1,136 @@
+"""
+Lab Resource Index
+
+Every resource the lab creates carries the lab tags (a fixed lab marker plus
+the stack's run ID), and every IAM entity lives under the run's lab path,
+LAB_PATH/<run id>/. That lets one paginated sweep per service find
+everything that belongs to one run, without touching other stacks in a
+shared account:
+
+- IAM users, customer-managed policies and virtual MFA devices are listed
+  by path (the tagging API does not cover IAM)
+- everything else (buckets, tables, GuardDuty, CloudTrail) comes from the
+  Resource Groups Tagging API filtered on the lab and run ID tags
+
+Stacks that predate run paths keep their IAM entities directly under
+LAB_PATH; an index without a run ID finds those.
+
+Cleanup uses it to find users to delete, and verification uses it to
+report anything left behind.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from termcolor import colored
+
+
+LAB_PATH = "/north-korean-cloud-nightmare/"
+LAB_TAG_KEY = "Lab"
+LAB_TAG_VALUE = "north-korean-cloud-nightmare"
+RUN_ID_TAG_KEY = "LabRunId"
+
+
+def lab_tags(run_id):
+    """Tags stamped on every taggable lab resource"""
+    return {LAB_TAG_KEY: LAB_TAG_VALUE, RUN_ID_TAG_KEY: run_id}
+
+
+def lab_path(run_id=None):
+    """IAM path of a run's users, policies and MFA devices (LAB_PATH itself without a run ID)"""
+    return f"{LAB_PATH}{run_id}/" if run_id else LAB_PATH
+
+
+class LabIndex:
+    """Finds every lab resource in the account with one paginated sweep per service"""
+
+    def __init__(self, session=None, region="us-east-1", run_id=None):
+        session = session or boto3.Session(region_name=region)
+        config = Config(retries={"mode": "adaptive", "max_attempts": 10})
+        self.iam_client = session.client("iam", config=config)
+        self.tagging_client = session.client("resourcegroupstaggingapi", config=config)
+        # Without a run ID: IAM entities directly under LAB_PATH, tagged resources of every run
+        self.run_id = run_id
+        self.path = lab_path(run_id)
+
+    def _paginate(self, client, operation, key, **kwargs):
+        for page in client.get_paginator(operation).paginate(**kwargs):
+            yield from page.get(key, [])
+
+    def iam_users(self):
+        # PathPrefix also matches deeper paths (LAB_PATH covers every run), so compare the exact path
+        return [
+            {"name": user["UserName"], "arn": user["Arn"]}
+            for user in self._paginate(self.iam_client, "list_users", "Users", PathPrefix=self.path)
+            if user["Path"] == self.path
+        ]
+
+    def iam_policies(self):
+        return [
+            {"name": policy["PolicyName"], "arn": policy["Arn"]}
+            for policy in self._paginate(self.iam_client, "list_policies", "Policies",
+                                         Scope="Local", PathPrefix=self.path)
+            if policy["Path"] == self.path
+        ]
+
+    def virtual_mfa_devices(self):
+        # ListVirtualMFADevices has no path filter; the path is part of the serial ARN
+        return [
+            {"name": device["SerialNumber"].split("/")[-1], "arn": device["SerialNumber"],
+             "user": device.get("User", {}).get("UserName")}
+            for device in self._paginate(self.iam_client, "list_virtual_mfa_devices", "VirtualMFADevices",
+                                         AssignmentStatus="Any")
+            if device["SerialNumber"].split(":mfa", 1)[-1].rsplit("/", 1)[0] + "/" == self.path
+        ]
+
+    def tagged_resources(self):
+        tag_filters = [{"Key": LAB_TAG_KEY, "Values": [LAB_TAG_VALUE]}]
+        if self.run_id:
+            tag_filters.append({"Key": RUN_ID_TAG_KEY, "Values": [self.run_id]})
+        resources = []
+        for resource in self._paginate(self.tagging_client, "get_resources", "ResourceTagMappingList",
+                                       TagFilters=tag_filters):
+            arn = resource["ResourceARN"]
+            tags = {tag["Key"]: tag["Value"] for tag in resource.get("Tags", [])}
+            resources.append({"name": arn.split(":")[-1].split("/")[-1], "arn": arn, "service": arn.split(":")[2],
+                              "run_id": tags.get(RUN_ID_TAG_KEY)})
+        return resources
+
+    def sweep(self):
+        """All lab resources, every listing run concurrently"""
+        listings = {
+            "iam_users": self.iam_users,
+            "iam_policies": self.iam_policies,
+            "virtual_mfa_devices": self.virtual_mfa_devices,
+            "tagged_resources": self.tagged_resources,
+        }
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(listings)) as executor:
+            futures = {kind: executor.submit(listing) for kind, listing in listings.items()}
+            result = {kind: future.result() for kind, future in futures.items()}
+        result["seconds"] = round(time.time() - start_time, 2)
+        return result
+
+
+def leftovers(sweep):
+    """Flat list of (kind, resource) for everything a sweep found"""
+    return [
+        (kind, resource)
+        for kind, resources in sweep.items()
+        if kind != "seconds"
+        for resource in resources
+    ]
+
+
+def print_leftovers(sweep):
+    """Report what a post-cleanup sweep found. Returns True if the account is clean."""
+    found = leftovers(sweep)
+    if not found:
+        print(colored(f"[SUCCESS] No lab resources left in the account (swept in {sweep['seconds']}s)", "green"))
+        return True
+    print(colored(f"[WARNING] {len(found)} lab resources still exist:", "yellow"))
+    for kind, resource in found:
+        print(colored(f"  [LEFTOVER] {kind}: {resource['arn']}", "yellow"))
+    return False
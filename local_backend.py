@@ -0,0 +1,161 @@
+"""
+Local Backend
+
+`--backend local` runs the lab with no AWS account and no Pulumi Cloud
+login. A moto server on localhost stands in for IAM, STS, S3, DynamoDB,
+GuardDuty and CloudTrail (plus the tagging API used by lab_index), and
+Pulumi keeps its state in a `file://` backend under Infra/.local-backend.
+The emulator lacks a few calls the lab relies on in AWS: the `local` stack
+has no virtual MFA devices (no ListMFADeviceTags), and the tagging API does
+not return the GuardDuty detector or the trail, so the cleanup sweep misses them.
+
+Every boto3 client in the project is redirected through AWS_ENDPOINT_URL,
+so no module needs to know which backend is active. The Pulumi AWS
+provider gets the same endpoint through the `local` stack's config. The
+moto server runs as a background process so its state survives from one
+command to the next; `clean_up` stops it once the stack is destroyed.
+"""
+
+import importlib.util
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from termcolor import colored
+
+
+INFRA_DIR = "/workspaces/North_Korean_Cloud_Nightmare/Infra"
+STATE_DIR = os.path.join(INFRA_DIR, ".local-backend")
+PID_PATH = os.path.join(STATE_DIR, "moto-server.pid")
+LOG_PATH = os.path.join(STATE_DIR, "moto-server.log")
+
+LOCAL_HOST = "127.0.0.1"
+LOCAL_PORT = int(os.environ.get("NKCN_LOCAL_PORT", "5000"))
+LOCAL_ENDPOINT = f"http://{LOCAL_HOST}:{LOCAL_PORT}"
+LOCAL_STACK = "local"
+LOCAL_REGION = "us-east-1"
+
+# Services the stack's resources live in; each gets a provider endpoint override
+SERVICES = ["iam", "sts", "s3", "dynamodb", "guardduty", "cloudtrail"]
+
+# The stack attaches AWS managed policies (AdministratorAccess), which moto only knows when told to load them
+SERVER_ENVIRONMENT = {"MOTO_IAM_LOAD_MANAGED_POLICIES": "true"}
+
+# Dummy credentials moto accepts; they never leave the machine
+LOCAL_ENVIRONMENT = {
+    "AWS_ENDPOINT_URL": LOCAL_ENDPOINT,
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": LOCAL_REGION,
+    "AWS_REGION": LOCAL_REGION,
+    "PULUMI_BACKEND_URL": f"file://{STATE_DIR}",
+    # Passphrase secrets provider with an empty passphrase (the state holds only dummy secrets)
+    "PULUMI_CONFIG_PASSPHRASE": "",
+}
+# Real credentials must not leak into local runs
+CLEARED_ENVIRONMENT = ["AWS_PROFILE", "AWS_SESSION_TOKEN", "AWS_SECURITY_TOKEN", "PULUMI_ACCESS_TOKEN"]
+
+
+def server_running():
+    try:
+        with urllib.request.urlopen(f"{LOCAL_ENDPOINT}/moto-api/data.json", timeout=1):
+            return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def start_server(timeout=20):
+    """Start the moto server in the background unless one is already listening. Returns True if started."""
+    if server_running():
+        return False
+    if importlib.util.find_spec("moto") is None or importlib.util.find_spec("flask") is None:
+        raise RuntimeError("ERROR: --backend local needs the moto server: pip install 'moto[server]'")
+
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(LOG_PATH, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "moto.server", "-H", LOCAL_HOST, "-p", str(LOCAL_PORT)],
+            stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            env={**os.environ, **SERVER_ENVIRONMENT},
+            # Outlives this command so the emulated account persists between commands
+            start_new_session=True,
+        )
+    with open(PID_PATH, "w") as file:
+        file.write(str(process.pid))
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"ERROR: moto server exited with code {process.returncode}; see {LOG_PATH}")
+        if server_running():
+            return True
+        time.sleep(0.2)
+    raise RuntimeError(f"ERROR: moto server did not start on {LOCAL_ENDPOINT} within {timeout}s; see {LOG_PATH}")
+
+
+def stop_server():
+    """Stop the background moto server started by start_server. Returns True if one was stopped."""
+    try:
+        with open(PID_PATH, "r") as file:
+            pid = int(file.read().strip())
+    except (FileNotFoundError, ValueError):
+        return False
+    try:
+        os.kill(pid, signal.SIGTERM)
+        stopped = True
+    except ProcessLookupError:
+        stopped = False
+    os.remove(PID_PATH)
+    return stopped
+
+
+def is_active():
+    """True when this process runs against the local emulator (activate() was called)"""
+    return os.environ.get("AWS_ENDPOINT_URL") == LOCAL_ENDPOINT
+
+
+def emulator_credentials():
+    """The dummy credential variables of the local backend (empty when it is not active)"""
+    if not is_active():
+        return {}
+    return {name: LOCAL_ENVIRONMENT[name] for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY")}
+
+
+def stack_config():
+    """Pulumi AWS provider config pointing every lab service at the moto server"""
+    config = {
+        "aws:region": LOCAL_REGION,
+        "aws:accessKey": LOCAL_ENVIRONMENT["AWS_ACCESS_KEY_ID"],
+        "aws:secretKey": LOCAL_ENVIRONMENT["AWS_SECRET_ACCESS_KEY"],
+        "aws:skipCredentialsValidation": "true",
+        "aws:skipMetadataApiCheck": "true",
+        "aws:s3UsePathStyle": "true",
+        # Read by Infra/__main__.py: leaves out the resources the emulator cannot read back
+        "localBackend": "true",
+    }
+    for service in SERVICES:
+        config[f"aws:endpoints[0].{service}"] = LOCAL_ENDPOINT
+    return config
+
+
+def activate():
+    """Switch this process (and the Pulumi subprocesses it starts) to the local backend"""
+    # The Automation API shells out to the CLI; without it every stack operation dies with a bare FileNotFoundError
+    if shutil.which("pulumi") is None:
+        raise RuntimeError("ERROR: --backend local needs the pulumi CLI on PATH (https://www.pulumi.com/docs/install/)")
+    started = start_server()
+    os.environ.update(LOCAL_ENVIRONMENT)
+    for name in CLEARED_ENVIRONMENT:
+        os.environ.pop(name, None)
+
+    import pulumi_workspace
+    pulumi_workspace.use_stack(LOCAL_STACK, config=stack_config())
+
+    state = "started" if started else "already running"
+    print(colored(f"[INFO] Local backend: moto server {state} at {LOCAL_ENDPOINT}, "
+                  f"Pulumi state in {STATE_DIR} (stack '{LOCAL_STACK}')", "cyan"))
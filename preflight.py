@@ -0,0 +1,198 @@
+"""
+Preflight Checks
+
+The environment checks every command needs before it can run: AWS
+credentials, Pulumi login, the dev stack and the AWS resource plugin.
+Independent checks run concurrently, and passing results are cached with a
+TTL in Infra/preflight-cache.json. Each check's cache entry is keyed on the
+inputs that could change its answer (credentials, backend URL, plugin
+directory contents), so only invalidated checks re-run. `setup --refresh`
+ignores the cache and re-runs everything.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from termcolor import colored
+
+
+INFRA_DIR = "/workspaces/North_Korean_Cloud_Nightmare/Infra"
+CACHE_PATH = os.path.join(INFRA_DIR, "preflight-cache.json")
+
+
+def _digest(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _pulumi_home():
+    return os.environ.get("PULUMI_HOME", os.path.expanduser("~/.pulumi"))
+
+
+# ---------------------------------------------------------------------------
+# Cache keys: cheap, local-only fingerprints of what each check depends on
+# ---------------------------------------------------------------------------
+
+def credentials_key():
+    """Hash of the resolved AWS access key, profile, region and endpoint override (no secrets stored)"""
+    import boto3
+
+    session = boto3.Session()
+    credentials = session.get_credentials()
+    access_key = credentials.access_key if credentials else None
+    return _digest(access_key, session.profile_name, session.region_name, os.environ.get("AWS_ENDPOINT_URL"))
+
+
+def backend_url():
+    """Pulumi backend the CLI will use: PULUMI_BACKEND_URL, else the current login"""
+    if os.environ.get("PULUMI_BACKEND_URL"):
+        return os.environ["PULUMI_BACKEND_URL"]
+    try:
+        with open(os.path.join(_pulumi_home(), "credentials.json"), "r") as file:
+            return json.load(file).get("current")
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def backend_key():
+    """Hash of the backend URL plus any access token from the environment"""
+    return _digest(backend_url(), os.environ.get("PULUMI_ACCESS_TOKEN"))
+
+
+def plugin_dir_key():
+    """Hash of the installed plugin directory names and their modification times"""
+    plugin_dir = os.path.join(_pulumi_home(), "plugins")
+    try:
+        entries = sorted((entry.name, entry.stat().st_mtime) for entry in os.scandir(plugin_dir))
+    except FileNotFoundError:
+        entries = []
+    return _digest(entries)
+
+
+# ---------------------------------------------------------------------------
+# Checks: each returns a detail dict on success and raises on failure
+# ---------------------------------------------------------------------------
+
+def check_aws_credentials():
+    import boto3
+
+    identity = boto3.client("sts").get_caller_identity()
+    return {"message": f"AWS credentials found - Account: {identity['Account']}",
+            "account": identity["Account"], "arn": identity["Arn"]}
+
+
+def check_pulumi_login():
+    import pulumi_workspace
+
+    user = pulumi_workspace.who_am_i()
+    return {"message": f"Pulumi logged in as: {user}", "user": user}
+
+
+def check_pulumi_stack():
+    import pulumi_workspace
+
+    pulumi_workspace.get_stack()
+    return {"message": f"Pulumi stack '{pulumi_workspace.STACK_NAME}' ready"}
+
+
+def check_aws_plugin():
+    import pulumi_workspace
+
+    installed = pulumi_workspace.ensure_aws_plugin()
+    return {"message": "AWS plugin installed" if installed else "AWS plugin already installed"}
+
+
+# name -> check function, cache key function, TTL in seconds, whether failure blocks the command
+CHECKS = {
+    "aws_credentials": {"run": check_aws_credentials, "key": credentials_key, "ttl": 15 * 60, "required": True},
+    "pulumi_login": {"run": check_pulumi_login, "key": backend_key, "ttl": 60 * 60, "required": True},
+    "pulumi_stack": {"run": check_pulumi_stack, "key": backend_key, "ttl": 60 * 60, "required": True},
+    "aws_plugin": {"run": check_aws_plugin, "key": plugin_dir_key, "ttl": 24 * 60 * 60, "required": False},
+}
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(cache):
+    try:
+        with open(CACHE_PATH, "w") as file:
+            json.dump(cache, file, indent=2)
+    except OSError:
+        # Caching is an optimisation; a read-only checkout still works
+        pass
+
+
+def clear_cache():
+    """Forget every cached preflight result"""
+    if os.path.exists(CACHE_PATH):
+        os.remove(CACHE_PATH)
+
+
+def _is_fresh(entry, key, ttl, now):
+    return bool(entry) and entry.get("key") == key and now - entry.get("checked_at", 0) < ttl
+
+
+def _run_check(name):
+    try:
+        return {"ok": True, **CHECKS[name]["run"]()}
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+
+
+def run_checks(names=None, refresh=False):
+    """Run the named checks (all by default), reusing fresh cached passes. Returns name -> result."""
+    names = list(names or CHECKS)
+    cache = load_cache()
+    now = time.time()
+    results = {}
+    stale = {}
+
+    for name in names:
+        try:
+            key = CHECKS[name]["key"]()
+        except Exception:
+            key = None
+        entry = cache.get(name)
+        if not refresh and key is not None and _is_fresh(entry, key, CHECKS[name]["ttl"], now):
+            results[name] = dict(entry["result"], cached=True, age=int(now - entry["checked_at"]))
+        else:
+            stale[name] = key
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+            futures = {name: executor.submit(_run_check, name) for name in stale}
+        for name, future in futures.items():
+            results[name] = dict(future.result(), cached=False)
+            if results[name]["ok"] and stale[name] is not None:
+                cache[name] = {"key": stale[name], "checked_at": now, "result": future.result()}
+            else:
+                cache.pop(name, None)
+        save_cache(cache)
+
+    return {name: results[name] for name in names}
+
+
+def report(results):
+    """Print one line per check. Returns False if any required check failed."""
+    passed = True
+    for name, result in results.items():
+        if result["ok"]:
+            suffix = ""
+            if result.get("cached"):
+                age = result["age"]
+                suffix = f" (cached {age}s ago)" if age < 60 else f" (cached {age // 60}m ago)"
+            print(colored(f"[SUCCESS] {result['message']}{suffix}", "green"))
+        elif CHECKS[name]["required"]:
+            print(colored(f"[ERROR] Preflight check '{name}' failed: {result['error']}", "red"))
+            passed = False
+        else:
+            print(colored(f"[WARNING] Preflight check '{name}' failed ({result['error']}), but continuing...", "yellow"))
+    return passed
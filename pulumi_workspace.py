@@ -0,0 +1,246 @@
+"""
+Pulumi Workspace
+
+One in-process handle on the lab's Pulumi stack via the Automation API.
+Every command shares the same LocalWorkspace/Stack objects instead of
+spawning a fresh `pulumi` CLI (and language host) per operation. Engine
+events are streamed to the console as structured resource steps, and
+stack outputs come back as a plain dict.
+"""
+
+import json
+import os
+import threading
+import time
+from importlib.metadata import version as package_version
+
+from pulumi import automation as auto
+from termcolor import colored
+
+import tracing
+
+
+INFRA_DIR = "/workspaces/North_Korean_Cloud_Nightmare/Infra"
+OUTPUT_PATH = os.path.join(INFRA_DIR, "forrester-2025-output.json")
+STACK_NAME = "dev"
+
+# Same mask the CLI prints for secret outputs without --show-secrets
+SECRET_MASK = "[secret]"
+
+# Noise the old `pulumi up` line filter dropped
+IGNORED_DIAGNOSTICS = ("failed to load language plugin python", "pulumi-language-python")
+
+OP_STYLES = {
+    "create": ("+", "green"),
+    "update": ("~", "yellow"),
+    "delete": ("-", "red"),
+    "replace": ("+-", "magenta"),
+    "create-replacement": ("++", "magenta"),
+    "delete-replaced": ("--", "magenta"),
+    "refresh": ("~", "cyan"),
+    "read": (">", "cyan"),
+}
+
+_workspace = None
+_stack = None
+# Preflight checks touch the workspace from several threads at once
+_lock = threading.Lock()
+
+
+def get_workspace():
+    """Shared LocalWorkspace rooted at the Infra project"""
+    global _workspace
+    with _lock:
+        if _workspace is None:
+            _workspace = auto.LocalWorkspace(work_dir=INFRA_DIR)
+        return _workspace
+
+
+def get_stack():
+    """Shared handle on the dev stack, created on first use if it does not exist"""
+    global _stack
+    workspace = get_workspace()
+    with _lock:
+        if _stack is None:
+            _stack = auto.Stack.create_or_select(STACK_NAME, workspace)
+        return _stack
+
+
+def use_stack(name, config=None):
+    """Point the shared handles at another stack (e.g. the local backend's), setting `config` on it"""
+    global STACK_NAME, _workspace, _stack
+    with _lock:
+        STACK_NAME = name
+        # The workspace picks up backend environment changes on its next command, but drop it anyway
+        _workspace = None
+        _stack = None
+    if config:
+        get_stack().set_all_config({key: auto.ConfigValue(value) for key, value in config.items()}, path=True)
+
+
+def who_am_i():
+    """Logged-in Pulumi user name (raises CommandError when not logged in)"""
+    return get_workspace().who_am_i().user
+
+
+def ensure_aws_plugin():
+    """Install the AWS resource plugin matching the installed pulumi_aws SDK, if it is missing"""
+    workspace = get_workspace()
+    if any(plugin.kind == "resource" and plugin.name == "aws" for plugin in workspace.list_plugins()):
+        return False
+    workspace.install_plugin("aws", f"v{package_version('pulumi_aws')}")
+    return True
+
+
+def plugin_versions():
+    """Installed plugin "kind/name" -> version"""
+    return {f"{plugin.kind}/{plugin.name}": plugin.version for plugin in get_workspace().list_plugins()}
+
+
+def last_successful_update(page_size=10):
+    """Version number of the most recent successful `up` of the stack, or None"""
+    for update in get_stack().history(page_size=page_size):
+        if update.kind == "update" and update.result == "succeeded":
+            return update.version
+    return None
+
+
+class EngineEventPrinter:
+    """on_event callback that renders engine events as one colored line per resource step"""
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.failures = []
+
+    def __call__(self, event):
+        if event.resource_pre_event:
+            self._step(event.resource_pre_event.metadata, done=False)
+        elif event.res_outputs_event:
+            self._step(event.res_outputs_event.metadata, done=True)
+        elif event.res_op_failed_event:
+            step = event.res_op_failed_event.metadata
+            self.failures.append(step.urn)
+            print(colored(f"  ✗ {step.op.value} {step.type} {self._name(step.urn)} failed", "red"))
+        elif event.diagnostic_event:
+            self._diagnostic(event.diagnostic_event)
+        elif event.summary_event:
+            self._summary(event.summary_event)
+
+    @staticmethod
+    def _name(urn):
+        return urn.split("::")[-1]
+
+    def _step(self, step, done):
+        op = step.op.value
+        if op == "same" and not self.verbose:
+            return
+        symbol, color = OP_STYLES.get(op, ("*", "white"))
+        state = "done" if done else "..."
+        print(colored(f"  {symbol} {op:<8} {step.type} {self._name(step.urn)} {state}", color))
+
+    def _diagnostic(self, diagnostic):
+        message = diagnostic.message.strip()
+        if not message or any(noise in message for noise in IGNORED_DIAGNOSTICS):
+            return
+        if diagnostic.severity == "error":
+            print(colored(f"  [ERROR] {message}", "red"))
+        elif diagnostic.severity == "warning":
+            print(colored(f"  [WARNING] {message}", "yellow"))
+        elif self.verbose or not diagnostic.ephemeral:
+            print(f"  {message}")
+
+    def _summary(self, summary):
+        # Keys are plain step op strings ("create", "same", ...), not OpType
+        changes = ", ".join(f"{count} {op}" for op, count in sorted(summary.resource_changes.items()) if count)
+        print(colored(f"  Resources: {changes or 'no changes'} ({summary.duration_seconds}s)", "cyan"))
+
+
+class TimedEngineEventPrinter(EngineEventPrinter):
+    """EngineEventPrinter that also records how long each resource step took, aggregated per resource type"""
+
+    def __init__(self, verbose=False):
+        super().__init__(verbose)
+        self._started = {}
+        # resource type -> {"count", "seconds", "slowest"}
+        self.timings = {}
+
+    def __call__(self, event):
+        if event.resource_pre_event:
+            self._started[event.resource_pre_event.metadata.urn] = time.monotonic()
+        elif event.res_outputs_event:
+            self._record(event.res_outputs_event.metadata)
+        elif event.res_op_failed_event:
+            self._record(event.res_op_failed_event.metadata)
+        super().__call__(event)
+
+    def _record(self, step):
+        started = self._started.pop(step.urn, None)
+        if started is None or step.op.value == "same":
+            return
+        elapsed = time.monotonic() - started
+        timing = self.timings.setdefault(step.type, {"count": 0, "seconds": 0.0, "slowest": 0.0})
+        timing["count"] += 1
+        timing["seconds"] += elapsed
+        timing["slowest"] = max(timing["slowest"], elapsed)
+
+    def print_timings(self, title):
+        if not self.timings:
+            return
+        print(colored(f"\n  {title} time by resource type:", "cyan"))
+        for resource_type, timing in sorted(self.timings.items(), key=lambda item: -item[1]["slowest"]):
+            print(colored(f"    {resource_type:<45} {timing['count']:>3} × "
+                          f"slowest {timing['slowest']:6.1f}s  total {timing['seconds']:6.1f}s", "cyan"))
+
+
+def stack_resources(resource_type=None):
+    """Resources recorded in the stack's state (optionally only one type, e.g. "aws:dynamodb/table:Table")"""
+    resources = (get_stack().export_stack().deployment or {}).get("resources", [])
+    return [resource for resource in resources if resource_type is None or resource["type"] == resource_type]
+
+
+def outputs_to_dict(outputs, show_secrets=False):
+    """Convert an Automation API OutputMap into plain values (secrets masked unless requested)"""
+    return {
+        key: (output.value if show_secrets or not output.secret else SECRET_MASK)
+        for key, output in outputs.items()
+    }
+
+
+def stack_outputs(show_secrets=False):
+    """Current stack outputs as a dict"""
+    return outputs_to_dict(get_stack().outputs(), show_secrets=show_secrets)
+
+
+def write_outputs_file(outputs, path=OUTPUT_PATH):
+    """Publish outputs for modules that read the outputs file (same shape as `pulumi stack output --json`)"""
+    with open(path, "w") as file:
+        json.dump(outputs, file, indent=2)
+
+
+@tracing.traced("pulumi up")
+def up(on_event=None):
+    """Run `up` on the stack. Returns (outputs dict with secrets masked, UpdateSummary)."""
+    result = get_stack().up(on_event=on_event or EngineEventPrinter(), color="never")
+    return outputs_to_dict(result.outputs), result.summary
+
+
+@tracing.traced("pulumi preview")
+def preview(expect_no_changes=False, on_event=None):
+    """Run `preview`; raises CommandError if expect_no_changes is set and changes are pending"""
+    return get_stack().preview(
+        expect_no_changes=expect_no_changes, diff=True, on_event=on_event, color="never"
+    )
+
+
+@tracing.traced("pulumi refresh")
+def refresh(on_event=None, target=None):
+    """Run `refresh` on the stack (only the `target` URNs, if given)"""
+    return get_stack().refresh(on_event=on_event or EngineEventPrinter(), target=target, color="never")
+
+
+@tracing.traced("pulumi destroy")
+def destroy(on_event=None, parallel=None):
+    """Run `destroy` on the stack with up to `parallel` concurrent resource operations"""
+    return get_stack().destroy(
+        on_event=on_event or EngineEventPrinter(), parallel=parallel, continue_on_error=True, color="never"
+    )
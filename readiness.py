@@ -0,0 +1,168 @@
+"""
+Readiness Gate
+
+Confirms the deployed stack is actually usable before the scenario starts,
+instead of sleeping a fixed time after `pulumi up`:
+
+- DynamoDB tables ACTIVE, S3 buckets and IAM users visible (service waiters)
+- the CloudTrail trail logging and the GuardDuty detector ENABLED (status polls)
+- optionally, seeded data visible in every table and bucket the seed manifest lists
+
+Every probe runs concurrently and the gate returns as soon as the last one
+succeeds (or times out), with a per-resource timeline of when each became
+ready.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, WaiterError
+from termcolor import colored
+
+import clock
+
+
+DEFAULT_TIMEOUT = 300
+POLL_DELAY = 2
+USER_OUTPUTS = ["admin_user_arn", "devops_user_arn", "devops_deploy_arn", "devops_automation_arn",
+                "devops_monitor_arn", "devops_pipeline_arn"]
+TABLE_OUTPUTS = ["CustomerOrdersTable", "CustomerSSNTable"]
+BUCKET_OUTPUTS = ["config_files_bucket", "customer_data_bucket", "payment_data_bucket", "cloudtrail_log_bucket"]
+
+
+class ReadinessGate:
+    """Concurrent readiness probes for every resource in the stack outputs"""
+
+    def __init__(self, session=None, region="us-east-1", timeout=DEFAULT_TIMEOUT, workers=16):
+        session = session or boto3.Session(region_name=region)
+        config = Config(retries={"mode": "adaptive", "max_attempts": 10})
+        self.dynamodb_client = session.client("dynamodb", config=config)
+        self.s3_client = session.client("s3", config=config)
+        self.iam_client = session.client("iam", config=config)
+        self.cloudtrail_client = session.client("cloudtrail", config=config)
+        self.guardduty_client = session.client("guardduty", config=config)
+        self.timeout = timeout
+        self.workers = workers
+
+    # ------------------------------------------------------------------ #
+    # Probes: each returns (ready, status, attempts)
+    # ------------------------------------------------------------------ #
+
+    def _wait(self, client, waiter_name, status, **kwargs):
+        attempts = max(1, int(self.timeout // POLL_DELAY))
+        try:
+            client.get_waiter(waiter_name).wait(WaiterConfig={"Delay": POLL_DELAY, "MaxAttempts": attempts}, **kwargs)
+            return True, status, None
+        except WaiterError as e:
+            return False, (e.last_response or {}).get("Error", {}).get("Code") or "timed out", attempts
+
+    def _poll(self, check):
+        """Call check() -> (ready, status) until it is ready or the timeout passes"""
+        deadline = clock.now() + self.timeout
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                ready, status = check()
+            except ClientError as e:
+                ready, status = False, e.response["Error"]["Code"]
+            if ready or clock.now() >= deadline:
+                return ready, status, attempts
+            clock.poll_sleep(POLL_DELAY, "readiness poll")
+
+    def table_active(self, table):
+        return self._wait(self.dynamodb_client, "table_exists", "ACTIVE", TableName=table)
+
+    def bucket_exists(self, bucket):
+        return self._wait(self.s3_client, "bucket_exists", "exists", Bucket=bucket)
+
+    def user_exists(self, user):
+        return self._wait(self.iam_client, "user_exists", "exists", UserName=user)
+
+    def trail_logging(self, trail):
+        def check():
+            logging = self.cloudtrail_client.get_trail_status(Name=trail)["IsLogging"]
+            return logging, "logging" if logging else "not logging"
+        return self._poll(check)
+
+    def detector_enabled(self, detector_id):
+        def check():
+            status = self.guardduty_client.get_detector(DetectorId=detector_id)["Status"]
+            return status == "ENABLED", status
+        return self._poll(check)
+
+    def table_has_data(self, table):
+        def check():
+            count = self.dynamodb_client.scan(TableName=table, Select="COUNT", Limit=1)["Count"]
+            return count > 0, "has items" if count else "empty"
+        return self._poll(check)
+
+    def bucket_has_data(self, bucket):
+        def check():
+            count = self.s3_client.list_objects_v2(Bucket=bucket, MaxKeys=1)["KeyCount"]
+            return count > 0, "has objects" if count else "empty"
+        return self._poll(check)
+
+    # ------------------------------------------------------------------ #
+
+    def probes(self, outputs, manifest=None):
+        """[(resource type, name, probe)] for every resource in the outputs (and seeded data in the manifest)"""
+        tables = [outputs[key] for key in TABLE_OUTPUTS if outputs.get(key)]
+        buckets = list(outputs.get("regular_buckets") or []) + [outputs[key] for key in BUCKET_OUTPUTS
+                                                                 if outputs.get(key)]
+        users = [outputs[key].split("/")[-1] for key in USER_OUTPUTS if outputs.get(key)]
+
+        probes = [("table", table, self.table_active) for table in tables]
+        probes += [("bucket", bucket, self.bucket_exists) for bucket in buckets]
+        probes += [("user", user, self.user_exists) for user in users]
+        if outputs.get("cloudtrail_name"):
+            probes.append(("trail", outputs["cloudtrail_name"], self.trail_logging))
+        if outputs.get("gd_detector_id"):
+            probes.append(("detector", outputs["gd_detector_id"], self.detector_enabled))
+        if manifest:
+            probes += [("table data", entry["table"], self.table_has_data)
+                       for entry in manifest["tables"].values() if entry.get("rows")]
+            probes += [("bucket data", bucket, self.bucket_has_data)
+                       for bucket, entry in manifest["buckets"].items() if entry["objects"]]
+        return probes
+
+    def check(self, outputs, manifest=None):
+        """Run every probe concurrently. Returns {"ready", "resources", "seconds"}."""
+        start_time = time.time()
+
+        def run(probe):
+            kind, name, function = probe
+            ready, status, attempts = function(name)
+            return {"type": kind, "name": name, "ready": ready, "status": status, "attempts": attempts,
+                    "seconds": round(time.time() - start_time, 2)}
+
+        probes = self.probes(outputs, manifest=manifest)
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(probes)))) as executor:
+            resources = list(executor.map(run, probes))
+        return {
+            "ready": all(resource["ready"] for resource in resources),
+            "resources": sorted(resources, key=lambda resource: resource["seconds"]),
+            "seconds": round(time.time() - start_time, 2),
+        }
+
+
+def print_timeline(result):
+    """Per-resource readiness timeline, in the order resources became ready"""
+    for resource in result["resources"]:
+        mark, color = ("[✔]", "green") if resource["ready"] else ("[✘]", "red")
+        print(colored(f"  {mark} +{resource['seconds']:>6.2f}s  {resource['type']:<11} {resource['name']} "
+                      f"({resource['status']})", color))
+    ready = sum(resource["ready"] for resource in result["resources"])
+    color = "green" if result["ready"] else "red"
+    print(colored(f"[INFO] {ready}/{len(result['resources'])} resources ready in {result['seconds']}s", color))
+
+
+def wait_until_ready(outputs, manifest=None, timeout=DEFAULT_TIMEOUT):
+    """Block until every resource in the outputs is ready; prints the timeline. Returns True when all are."""
+    print(colored(f"[INFO] Waiting for stack resources{' and seeded data' if manifest else ''} to become ready...",
+                  "cyan"))
+    result = ReadinessGate(timeout=timeout).check(outputs, manifest=manifest)
+    print_timeline(result)
+    return result["ready"]
@@ -0,0 +1,105 @@
+"""
+Run Timeline
+
+Records when each labeled phase of an attack run started and ended, to one
+JSON file per run in Infra/runs/. The scoreboard joins these files with
+detection alerts to measure time-to-detect per phase.
+
+Timestamps come from the scenario clock, so a `--rehearsal` run records the
+timeline the live run would have had. Each phase change is also a tracing
+step, so `--trace` shows the same phases.
+"""
+
+import glob
+import json
+import os
+from datetime import datetime, timezone
+
+import clock
+import tracing
+
+
+RUNS_DIR = "/workspaces/North_Korean_Cloud_Nightmare/Infra/runs"
+
+# Scored phase ids in scenario order (detection rules name the phase they are meant to catch).
+# launch_attack also records "ransomware_session", which only re-uses the new keys and isn't scored.
+PHASES = ["mfa_setup", "enumeration", "malicious_user", "mfa_ddos", "security_controls", "s3", "dynamodb"]
+# Phases that run after security_controls has stopped and deleted the trail, so CloudTrail-based
+# detection (the local rule engine) has no events for them
+UNLOGGED_PHASES = ["s3", "dynamodb"]
+
+
+def iso(timestamp):
+    """UTC ISO 8601 with milliseconds, e.g. 2026-10-18T10:00:00.123Z"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+class RunTimeline:
+    """Phase boundaries of one run, written to RUNS_DIR when the run finishes"""
+
+    def __init__(self, scenario="launch_attack", runs_dir=RUNS_DIR):
+        self.started = clock.now()
+        self.run_id = f"{scenario}-{datetime.fromtimestamp(self.started, tz=timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')}"
+        self.scenario = scenario
+        self.runs_dir = runs_dir
+        self.phases = []
+
+    def _close_phase(self, now):
+        if self.phases and self.phases[-1]["end"] is None:
+            self.phases[-1]["end"] = now
+
+    def phase(self, phase_id, label):
+        """Mark the start of the next phase (and the end of the previous one)"""
+        now = clock.now()
+        self._close_phase(now)
+        self.phases.append({"id": phase_id, "label": label, "start": now, "end": None})
+        tracing.step(label)
+
+    def as_dict(self, status):
+        return {
+            "run_id": self.run_id,
+            "scenario": self.scenario,
+            "status": status,
+            "rehearsal": clock.is_virtual(),
+            "started": iso(self.started),
+            "finished": iso(self.phases[-1]["end"]) if self.phases else iso(self.started),
+            "phases": [
+                dict(phase, start=iso(phase["start"]), end=iso(phase["end"]),
+                     seconds=round(phase["end"] - phase["start"], 3))
+                for phase in self.phases
+            ],
+        }
+
+    def finish(self, status="completed"):
+        """Close the last phase and write the run file. Returns its path."""
+        self._close_phase(clock.now())
+        os.makedirs(self.runs_dir, exist_ok=True)
+        path = os.path.join(self.runs_dir, f"{self.run_id}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.as_dict(status), file, indent=2)
+        os.replace(temp_path, path)
+        return path
+
+
+def parse_time(value):
+    """Epoch seconds from an ISO 8601 timestamp (Z or offset)"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def load_runs(runs_dir=RUNS_DIR, last=None, include_rehearsals=False):
+    """Completed runs, oldest first (rehearsals excluded unless asked for)"""
+    runs = []
+    for path in sorted(glob.glob(os.path.join(runs_dir, "*.json"))):
+        with open(path, "r") as file:
+            run = json.load(file)
+        if run.get("status") != "completed" or (run.get("rehearsal") and not include_rehearsals):
+            continue
+        runs.append(run)
+    runs.sort(key=lambda run: run["started"])
+    return runs[-last:] if last else runs
+
+
+def latest_run(runs_dir=RUNS_DIR):
+    runs = load_runs(runs_dir, include_rehearsals=True)
+    return runs[-1] if runs else None
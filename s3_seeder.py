@@ -0,0 +1,275 @@
+"""
+S3 Seed Uploader
+
+Fills every lab bucket with a configurable number of generated objects so
+storage telemetry (S3 data events, GuardDuty S3 protection) sees a realistic
+data estate. Object sizes and key prefixes are drawn from configurable
+distributions, content is streamed from data_generator (never built as one
+in-memory string), and uploads run on a bounded thread pool using managed
+multipart transfers.
+"""
+
+import io
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import boto3
+import numpy as np
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from termcolor import colored
+from tqdm import tqdm
+
+from data_generator import DEFAULT_SEED, generate_batches, render_ndjson
+from seed_manifest import ContentDigest
+
+
+DEFAULT_WORKERS = 16
+MULTIPART_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Rows generated per streamed batch; small so tiny objects stay cheap to produce
+STREAM_BATCH_ROWS = 256
+# Upper bound on rows per object stream; streams stop as soon as the size is reached
+STREAM_MAX_ROWS = 10 ** 12
+
+DEFAULT_SPEC = {
+    "objects_per_bucket": 1000,
+    "size": {
+        "distribution": "lognormal",   # fixed | uniform | lognormal
+        "median_bytes": 16 * 1024,
+        "sigma": 1.2,
+        "min_bytes": 512,
+        "max_bytes": 64 * 1024 * 1024,
+    },
+    "prefixes": {
+        "exports/": 0.5,
+        "reports/": 0.3,
+        "archive/": 0.2,
+    },
+    # Optional per-bucket overrides keyed by stack output name, e.g.
+    # "buckets": {"customer_data_bucket": {"objects_per_bucket": 5000}}
+    "buckets": {},
+}
+
+# Stack output key -> data_generator schema streamed into that bucket's objects
+LAB_BUCKETS = {
+    "config_files_bucket": "customers",
+    "customer_data_bucket": "customers",
+    "payment_data_bucket": "payments",
+    "regular_buckets": "orders",
+}
+
+
+def load_spec(path=None, objects_per_bucket=None):
+    """Merge an optional JSON spec file (and object count override) over DEFAULT_SPEC"""
+    spec = json.loads(json.dumps(DEFAULT_SPEC))
+    if path:
+        with open(path, "r") as file:
+            overrides = json.load(file)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and key in ("size",):
+                spec[key].update(value)
+            else:
+                spec[key] = value
+    if objects_per_bucket is not None:
+        spec["objects_per_bucket"] = objects_per_bucket
+    return spec
+
+
+def sample_sizes(rng, count, size_spec):
+    """Draw `count` object sizes in bytes from the configured distribution"""
+    distribution = size_spec.get("distribution", "lognormal")
+    low = size_spec.get("min_bytes", 1)
+    high = size_spec.get("max_bytes", 64 * 1024 * 1024)
+
+    if distribution == "fixed":
+        sizes = np.full(count, size_spec.get("bytes", size_spec.get("median_bytes", 16 * 1024)))
+    elif distribution == "uniform":
+        sizes = rng.integers(low, high + 1, count)
+    elif distribution == "lognormal":
+        sizes = rng.lognormal(np.log(size_spec.get("median_bytes", 16 * 1024)), size_spec.get("sigma", 1.0), count)
+    else:
+        raise ValueError(f"ERROR: Unknown size distribution '{distribution}'. Use fixed, uniform or lognormal.")
+
+    return np.clip(sizes, low, high).astype(np.int64)
+
+
+def sample_prefixes(rng, count, prefixes):
+    """Draw `count` key prefixes according to their relative weights"""
+    names = list(prefixes)
+    weights = np.array([prefixes[name] for name in names], dtype=float)
+    return [names[i] for i in rng.choice(len(names), size=count, p=weights / weights.sum())]
+
+
+def plan_bucket(bucket_name, bucket_index, schema, spec, seed=DEFAULT_SEED):
+    """Deterministic list of (key, size, object_seed) for one bucket"""
+    rng = np.random.default_rng([seed, bucket_index])
+    count = spec["objects_per_bucket"]
+    sizes = sample_sizes(rng, count, spec["size"])
+    prefixes = sample_prefixes(rng, count, spec["prefixes"])
+    return [
+        (f"{prefix}{schema}-{i:06d}.ndjson", int(size), [seed, bucket_index, i])
+        for i, (prefix, size) in enumerate(zip(prefixes, sizes))
+    ]
+
+
+def manifest_entry(digest, schema, size, object_seed):
+    return {"size": size, "etag": digest.etag(), "sha256": digest.sha256.hexdigest(),
+            "schema": schema, "object_seed": object_seed}
+
+
+def expected_entry(schema, size, object_seed):
+    """Manifest entry of an object that was not uploaded, computed from the same generated content"""
+    digest = ContentDigest(size, MULTIPART_CHUNK_BYTES, MULTIPART_CHUNK_BYTES)
+    stream = GeneratedObjectStream(schema, size, object_seed, digest)
+    buffer = bytearray(1024 * 1024)
+    while stream.readinto(buffer):
+        pass
+    return manifest_entry(digest, schema, size, object_seed)
+
+
+class GeneratedObjectStream(io.RawIOBase):
+    """Read-only stream of exactly `size` bytes of generated NDJSON, produced lazily"""
+
+    def __init__(self, schema, size, object_seed, digest=None):
+        self.schema = schema
+        self.digest = digest
+        self.remaining = size
+        self.unfilled = size
+        self.seed = int(np.random.SeedSequence(object_seed).generate_state(1)[0])
+        self.batches = generate_batches(schema, STREAM_MAX_ROWS, seed=self.seed, batch_size=STREAM_BATCH_ROWS)
+        self.buffer = b""
+
+    def readable(self):
+        return True
+
+    def _fill(self, wanted):
+        while len(self.buffer) < wanted and self.unfilled > 0:
+            data = ("\n".join(render_ndjson(self.schema, next(self.batches))) + "\n").encode()
+            if len(data) >= self.unfilled:
+                # Keep only whole records and pad the tail with a blank line to hit the exact size
+                cut = data.rfind(b"\n", 0, self.unfilled) + 1
+                pad = self.unfilled - cut
+                data = data[:cut] + (b" " * (pad - 1) + b"\n" if pad else b"")
+            self.unfilled -= len(data)
+            self.buffer += data
+
+    def readinto(self, target):
+        wanted = min(len(target), self.remaining)
+        if wanted <= 0:
+            return 0
+        self._fill(wanted)
+        target[:wanted] = self.buffer[:wanted]
+        if self.digest is not None:
+            self.digest.update(self.buffer[:wanted])
+        self.buffer = self.buffer[wanted:]
+        self.remaining -= wanted
+        return wanted
+
+
+class S3Seeder:
+    """Bounded thread-pool uploader for generated lab objects"""
+
+    def __init__(self, session=None, workers=DEFAULT_WORKERS, region="us-east-1"):
+        session = session or boto3.Session(region_name=region)
+        self.workers = workers
+        self.s3_client = session.client("s3", config=Config(max_pool_connections=max(10, workers * 4)))
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_CHUNK_BYTES,
+            multipart_chunksize=MULTIPART_CHUNK_BYTES,
+            max_concurrency=4,
+            use_threads=True,
+        )
+
+    def upload_object(self, bucket, key, schema, size, object_seed):
+        """Stream one generated object to S3 (multipart above the chunk threshold). Returns its manifest entry."""
+        digest = ContentDigest(size, MULTIPART_CHUNK_BYTES, MULTIPART_CHUNK_BYTES)
+        stream = io.BufferedReader(GeneratedObjectStream(schema, size, object_seed, digest), buffer_size=1024 * 1024)
+        self.s3_client.upload_fileobj(stream, bucket, key, Config=self.transfer_config)
+        return manifest_entry(digest, schema, size, object_seed)
+
+    def seed_bucket_objects(self, jobs):
+        """Upload (bucket, key, schema, size, object_seed) jobs with at most `workers` in flight.
+        Returns ([(job, manifest entry)], failures)."""
+        uploaded = []
+        failures = []
+
+        with tqdm(total=len(jobs), desc="Seeding S3 objects", unit="obj") as progress, \
+                ThreadPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = {}
+            pending = iter(jobs)
+
+            def submit_next():
+                job = next(pending, None)
+                if job is not None:
+                    in_flight[executor.submit(self.upload_object, *job)] = job
+
+            for _ in range(self.workers * 2):
+                submit_next()
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    try:
+                        uploaded.append((job, future.result()))
+                    except Exception as e:
+                        failures.append({"bucket": job[0], "key": job[1], "error": str(e)})
+                    progress.update(1)
+                    submit_next()
+
+        return uploaded, failures
+
+    def seed_lab_buckets(self, outputs, spec=None, seed=DEFAULT_SEED):
+        """Seed every lab bucket named in the stack outputs. Returns a throughput summary
+        whose "manifest" maps bucket name -> the objects planned (see seed_manifest), uploaded or not."""
+        spec = spec or load_spec()
+        jobs = []
+        manifest = {}
+        bucket_index = 0
+
+        for output_key, schema in LAB_BUCKETS.items():
+            buckets = outputs[output_key]
+            for bucket in (buckets if isinstance(buckets, list) else [buckets]):
+                manifest[bucket] = {"output_key": output_key, "schema": schema, "objects": {}}
+                bucket_spec = dict(spec, **spec.get("buckets", {}).get(output_key, {}))
+                for key, size, object_seed in plan_bucket(bucket, bucket_index, schema, bucket_spec, seed=seed):
+                    jobs.append((bucket, key, schema, size, object_seed))
+                bucket_index += 1
+
+        print(colored(f"[INFO] Uploading {len(jobs)} objects across {bucket_index} buckets "
+                      f"with {self.workers} workers...", "cyan"))
+        start_time = time.time()
+        uploaded, failures = self.seed_bucket_objects(jobs)
+        elapsed = time.time() - start_time
+
+        for (bucket, key, _, _, _), entry in uploaded:
+            manifest[bucket]["objects"][key] = entry
+        # Failed keys stay in the manifest, so validation reports them missing and reset_data uploads them
+        planned = {(job[0], job[1]): job for job in jobs}
+        for failure in failures:
+            _, key, schema, size, object_seed = planned[(failure["bucket"], failure["key"])]
+            manifest[failure["bucket"]]["objects"][key] = expected_entry(schema, size, object_seed)
+        uploaded_objects = len(uploaded)
+        uploaded_bytes = sum(entry["size"] for _, entry in uploaded)
+
+        summary = {
+            "buckets": bucket_index,
+            "objects": uploaded_objects,
+            "bytes": uploaded_bytes,
+            "failures": failures,
+            "seconds": round(elapsed, 2),
+            "objects_per_second": round(uploaded_objects / elapsed, 1) if elapsed else None,
+            "mib_per_second": round(uploaded_bytes / (1024 * 1024) / elapsed, 2) if elapsed else None,
+            "manifest": manifest,
+        }
+
+        print(colored(
+            f"[SUCCESS] Uploaded {uploaded_objects} objects ({uploaded_bytes / (1024 * 1024):.1f} MiB) "
+            f"in {summary['seconds']}s: {summary['objects_per_second']} objects/s, "
+            f"{summary['mib_per_second']} MiB/s", "green"))
+        if failures:
+            print(colored(f"[ERROR] {len(failures)} uploads failed, first: {failures[0]}. "
+                          "They are recorded as missing; run 'reset_data' to upload them.", "red"))
+        return summary
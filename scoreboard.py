@@ -0,0 +1,316 @@
+"""
+Time-to-Detect Scoreboard
+
+Joins the phase timelines that launch_attack writes to Infra/runs/ with the
+alerts of a detection source, and reports for every phase how long it took
+to be detected (or that it was missed), plus p50/p95 over repeated runs.
+
+Detection sources are pluggable; each returns alerts normalized to
+{name, phase, event_time, detected} (epoch seconds):
+
+- LocalRuleSource: alerts of the local rule engine (detection_engine) from
+  the CloudTrail index. An alert counts as detected at its last_seen, the
+  event that completed the rule, i.e. when a streaming engine would fire.
+  The phases after the trail is stopped are not scored for it.
+- XdrAlertSource: an XDR alert API over HTTP (the get_alerts_multi_events
+  shape). serve_xdr_standin() is a local stand-in for it that serves the
+  rule engine's alerts, so the HTTP path can be exercised without a tenant.
+
+An alert is matched to a phase by its `phase` field when the source has one,
+otherwise to the phase that was running when the alerted activity happened.
+Latency is measured from the phase start to the first matching detection.
+"""
+
+import json
+import os
+import time
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from termcolor import colored
+
+import run_timeline
+
+
+XDR_URL = "http://127.0.0.1:8089"
+XDR_ALERTS_PATH = "/public_api/v1/alerts/get_alerts_multi_events"
+XDR_PAGE_SIZE = 100
+# Alerts raised this long after a run ended still count for it (up to the next run's start)
+DEFAULT_GRACE = 3600
+# CloudTrail eventTime has 1s resolution, phase starts have 1ms
+CLOCK_SKEW = 1.0
+
+
+def epoch(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def iso_seconds(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class LocalRuleSource:
+    """Alerts stored by the local rule engine (run 'run_detections' first)"""
+
+    name = "local rule engine"
+    phases = [phase for phase in run_timeline.PHASES if phase not in run_timeline.UNLOGGED_PHASES]
+
+    def __init__(self, db_path=None):
+        from cloudtrail_ingest import DB_PATH
+        self.db_path = db_path or DB_PATH
+
+    def alerts(self, since, until):
+        from cloudtrail_ingest import open_index
+        from detection_engine import load_alerts
+
+        if not os.path.exists(self.db_path):
+            raise RuntimeError(f"ERROR: No CloudTrail index at {self.db_path}. Run 'run_detections' first.")
+        connection = open_index(self.db_path)
+        try:
+            alerts = load_alerts(connection, since=iso_seconds(since))
+        finally:
+            connection.close()
+        return [
+            {"name": alert["title"], "rule_id": alert["rule_id"], "phase": alert["phase"],
+             "event_time": epoch(alert["first_seen"]), "detected": epoch(alert["last_seen"])}
+            for alert in alerts if epoch(alert["first_seen"]) <= until
+        ]
+
+
+class XdrAlertSource:
+    """Alerts from an XDR alert API (or the local stand-in), filtered on creation time"""
+
+    name = "XDR alert API"
+    phases = run_timeline.PHASES
+
+    def __init__(self, url=XDR_URL, api_key_id=None, api_key=None, timeout=10):
+        self.url = url.rstrip("/") + XDR_ALERTS_PATH
+        self.headers = {"Content-Type": "application/json"}
+        api_key_id = api_key_id or os.environ.get("XDR_API_KEY_ID")
+        api_key = api_key or os.environ.get("XDR_API_KEY")
+        if api_key_id and api_key:
+            self.headers.update({"x-xdr-auth-id": str(api_key_id), "Authorization": api_key})
+        self.timeout = timeout
+
+    def _page(self, since, until, start):
+        body = {"request_data": {
+            "filters": [{"field": "creation_time", "operator": "gte", "value": int(since * 1000)},
+                        {"field": "creation_time", "operator": "lte", "value": int(until * 1000)}],
+            "search_from": start,
+            "search_to": start + XDR_PAGE_SIZE,
+            "sort": {"field": "creation_time", "keyword": "asc"},
+        }}
+        request = urllib.request.Request(self.url, data=json.dumps(body).encode(), headers=self.headers,
+                                         method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)["reply"]
+        except (OSError, ValueError, KeyError) as e:
+            raise RuntimeError(f"ERROR: XDR alert request to {self.url} failed: {e}") from e
+
+    def alerts(self, since, until):
+        alerts, start = [], 0
+        while True:
+            reply = self._page(since, until, start)
+            page = reply.get("alerts", [])
+            alerts += page
+            start += len(page)
+            if not page or start >= reply.get("total_count", 0):
+                break
+        return [
+            {"name": alert.get("name"), "rule_id": alert.get("alert_id"), "phase": alert.get("phase"),
+             "event_time": (alert.get("detection_timestamp") or alert["creation_time"]) / 1000,
+             "detected": (alert.get("local_insert_ts") or alert["creation_time"]) / 1000}
+            for alert in alerts
+        ]
+
+
+def alert_source(kind, url=None, db_path=None):
+    if kind == "local":
+        return LocalRuleSource(db_path)
+    if kind == "xdr":
+        return XdrAlertSource(url or XDR_URL)
+    raise RuntimeError(f"ERROR: Unknown detection source '{kind}' (expected local or xdr)")
+
+
+def percentile(values, fraction):
+    """Linear-interpolated percentile of a non-empty list"""
+    values = sorted(values)
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def alert_phase(alert, phases):
+    """Phase id an alert belongs to: its own, else the phase running when its activity happened"""
+    ids = {phase["id"] for phase in phases}
+    if alert.get("phase") in ids:
+        return alert["phase"]
+    current = None
+    for phase in phases:
+        if phase["start"] - CLOCK_SKEW <= alert["event_time"]:
+            current = phase["id"]
+    return current
+
+
+def score_run(run, alerts, scored=run_timeline.PHASES):
+    """Per-phase detection of one run: first matching alert and its latency from the phase start"""
+    phases = [dict(phase, start=epoch(phase["start"]), end=epoch(phase["end"])) for phase in run["phases"]]
+    matched = {}
+    for alert in alerts:
+        phase_id = alert_phase(alert, phases)
+        if phase_id:
+            matched.setdefault(phase_id, []).append(alert)
+
+    rows = []
+    for phase in phases:
+        if phase["id"] not in scored:
+            continue
+        hits = [alert for alert in matched.get(phase["id"], []) if alert["detected"] >= phase["start"] - CLOCK_SKEW]
+        first = min(hits, key=lambda alert: alert["detected"]) if hits else None
+        rows.append({
+            "phase": phase["id"],
+            "label": phase["label"],
+            "start": phase["start"],
+            "detected": first["detected"] if first else None,
+            "latency": round(max(first["detected"] - phase["start"], 0.0), 3) if first else None,
+            "alert": first["name"] if first else None,
+            "alerts": len(hits),
+        })
+    return rows
+
+
+def build_scoreboard(source, runs, grace=DEFAULT_GRACE):
+    """Score every run against the source. Returns {source, runs: [...], phases: {id: stats}}"""
+    start_time = time.time()
+    scored_runs = []
+    for index, run in enumerate(runs):
+        since = epoch(run["started"]) - CLOCK_SKEW
+        until = epoch(run["finished"]) + grace
+        # A later run's alerts must not fill an earlier run's misses
+        if index + 1 < len(runs):
+            until = min(until, epoch(runs[index + 1]["started"]))
+        scored_runs.append({"run_id": run["run_id"],
+                            "phases": score_run(run, source.alerts(since, until), scored=source.phases)})
+
+    stats = {}
+    for phase_id in source.phases:
+        rows = [row for run in scored_runs for row in run["phases"] if row["phase"] == phase_id]
+        if not rows:
+            continue
+        latencies = [row["latency"] for row in rows if row["latency"] is not None]
+        stats[phase_id] = {
+            "runs": len(rows),
+            "detected": len(latencies),
+            "missed": len(rows) - len(latencies),
+            "p50": round(percentile(latencies, 0.5), 3) if latencies else None,
+            "p95": round(percentile(latencies, 0.95), 3) if latencies else None,
+        }
+    return {"source": source.name, "runs": scored_runs, "phases": stats,
+            "unscored": [phase for phase in run_timeline.PHASES if phase not in source.phases],
+            "seconds": round(time.time() - start_time, 2)}
+
+
+def format_latency(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 120:
+        return f"{seconds:.1f}s"
+    return f"{seconds / 60:.1f}m"
+
+
+def print_scoreboard(scoreboard):
+    latest = scoreboard["runs"][-1]
+    print(colored(f"[INFO] Time to detect ({scoreboard['source']}), latest run {latest['run_id']}:", "cyan"))
+    for row in latest["phases"]:
+        if row["latency"] is None:
+            print(colored(f"  [✘] {row['phase']:<18} MISSED", "red"))
+        else:
+            print(colored(f"  [✔] {row['phase']:<18} {format_latency(row['latency']):>8}  {row['alert']}", "green"))
+    if scoreboard["unscored"]:
+        print(colored(f"  [-] not scored (no trail events, logging is stopped before them): "
+                      f"{', '.join(scoreboard['unscored'])}", "yellow"))
+
+    print(colored(f"\n[INFO] Across {len(scoreboard['runs'])} runs:", "cyan"))
+    print(colored(f"  {'phase':<18} {'detected':>9} {'missed':>7} {'p50':>8} {'p95':>8}", "white", attrs=["bold"]))
+    for phase_id, stats in scoreboard["phases"].items():
+        color = "green" if not stats["missed"] else ("yellow" if stats["detected"] else "red")
+        print(colored(f"  {phase_id:<18} {stats['detected']:>4}/{stats['runs']:<4} {stats['missed']:>7} "
+                      f"{format_latency(stats['p50']):>8} {format_latency(stats['p95']):>8}", color))
+
+
+def run_scoreboard(source, runs_dir=run_timeline.RUNS_DIR, last=None, grace=DEFAULT_GRACE):
+    """Score the last runs in runs_dir against source and print the result"""
+    runs = run_timeline.load_runs(runs_dir, last=last)
+    if not runs:
+        raise RuntimeError(f"ERROR: No completed (non-rehearsal) attack runs in {runs_dir}. Run 'launch_attack' first.")
+    scoreboard = build_scoreboard(source, runs, grace=grace)
+    print_scoreboard(scoreboard)
+    return scoreboard
+
+
+class XdrStandInHandler(BaseHTTPRequestHandler):
+    """Answers get_alerts_multi_events with the rule engine's alerts"""
+
+    db_path = None
+
+    def do_POST(self):
+        if self.path != XDR_ALERTS_PATH:
+            self.send_error(404)
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self.send_error(400)
+            return
+        request_data = request.get("request_data", {})
+        since, until = 0, float("inf")
+        for condition in request_data.get("filters", []):
+            if condition.get("field") == "creation_time" and condition.get("operator") == "gte":
+                since = condition["value"] / 1000
+            elif condition.get("field") == "creation_time" and condition.get("operator") == "lte":
+                until = condition["value"] / 1000
+
+        alerts = [
+            {"alert_id": str(index), "name": alert["name"], "phase": alert["phase"], "severity": "high",
+             "detection_timestamp": int(alert["event_time"] * 1000),
+             "local_insert_ts": int(alert["detected"] * 1000), "creation_time": int(alert["detected"] * 1000)}
+            for index, alert in enumerate(LocalRuleSource(self.db_path).alerts(since, until))
+            if alert["detected"] <= until
+        ]
+        start = request_data.get("search_from", 0)
+        page = alerts[start:request_data.get("search_to", start + XDR_PAGE_SIZE)]
+        body = json.dumps({"reply": {"total_count": len(alerts), "result_count": len(page), "alerts": page}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_xdr_standin(port=8089, db_path=None):
+    """Serve the stand-in XDR alert API on 127.0.0.1 until interrupted"""
+    handler = type("Handler", (XdrStandInHandler,), {"db_path": db_path})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    print(colored(f"[INFO] XDR alert API stand-in listening on http://127.0.0.1:{port}{XDR_ALERTS_PATH}", "cyan"))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the local XDR alert API stand-in")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--db", default=None, help="CloudTrail index (default: Infra/cloudtrail-index.sqlite)")
+    args = parser.parse_args()
+    serve_xdr_standin(args.port, args.db)
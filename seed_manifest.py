@@ -0,0 +1,111 @@
+"""
+Seed Manifest
+
+Record of exactly what the seeding step wrote, saved to
+Infra/seed-manifest.json. Each S3 object is listed with its size, S3 ETag
+and SHA-256 content address plus the recipe (schema and object seed) that
+regenerates it. Each DynamoDB table is listed with its item count, an
+order-independent digest of its items and the generator parameters.
+Post-deploy validation and `reset_data` both work from this file.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+
+INFRA_DIR = "/workspaces/North_Korean_Cloud_Nightmare/Infra"
+MANIFEST_PATH = os.path.join(INFRA_DIR, "seed-manifest.json")
+MANIFEST_VERSION = 1
+
+# Item digests are summed modulo 2**256 so segments can be hashed in any order and combined
+DIGEST_MODULUS = 2 ** 256
+
+
+class ContentDigest:
+    """S3 ETag (single-part or multipart) and SHA-256 of a byte stream, fed in order"""
+
+    def __init__(self, size, part_size, multipart_threshold):
+        self.multipart = size >= multipart_threshold
+        self.part_size = part_size
+        self.sha256 = hashlib.sha256()
+        self.part_md5 = hashlib.md5()
+        self.part_filled = 0
+        self.part_digests = []
+
+    def update(self, data):
+        self.sha256.update(data)
+        view = memoryview(data)
+        while view:
+            take = min(len(view), self.part_size - self.part_filled)
+            self.part_md5.update(view[:take])
+            self.part_filled += take
+            view = view[take:]
+            if self.part_filled == self.part_size:
+                self.part_digests.append(self.part_md5.digest())
+                self.part_md5 = hashlib.md5()
+                self.part_filled = 0
+
+    def etag(self):
+        """ETag S3 reports for the object, without the surrounding quotes"""
+        parts = self.part_digests + ([self.part_md5.digest()] if self.part_filled or not self.part_digests else [])
+        if not self.multipart:
+            return parts[0].hex()
+        return f"{hashlib.md5(b''.join(parts)).hexdigest()}-{len(parts)}"
+
+
+def item_digest(item):
+    """Integer digest of one DynamoDB attribute-value item"""
+    return int.from_bytes(hashlib.sha256(json.dumps(item, sort_keys=True).encode()).digest(), "big")
+
+
+def combine_digests(digests):
+    """Order-independent combination of item digests (use with item_digest)"""
+    return sum(digests) % DIGEST_MODULUS
+
+
+def format_digest(value):
+    return f"{value:064x}"
+
+
+def new_manifest(seed):
+    return {
+        "version": MANIFEST_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "seed": seed,
+        "tables": {},
+        "buckets": {},
+    }
+
+
+def build_manifest(seed, table_summaries, bucket_summary=None):
+    """Manifest from DynamoDBSeeder.seed_lab_tables and S3Seeder.seed_lab_buckets results"""
+    manifest = new_manifest(seed)
+    for summary in table_summaries:
+        manifest["tables"][summary["output_key"]] = {
+            key: summary[key] for key in ("table", "schema", "rows", "seed", "batch_size", "items", "items_digest")
+        }
+    if bucket_summary:
+        manifest["buckets"] = bucket_summary["manifest"]
+    return manifest
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Manifest from the last seeding run, or None"""
+    try:
+        with open(path, "r") as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Write the manifest atomically so a crash never leaves a half-written file"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
@@ -0,0 +1,137 @@
+"""
+Stack Fingerprint Cache
+
+A deployment fingerprint is a SHA-256 over everything that decides what
+`pulumi up` would do: the Pulumi program (with the repository modules it
+imports), the stack config files, the
+installed plugin versions and the ID of the last successful update (plus
+the seeding parameters). It is stored next to the outputs file after a
+successful deploy, so a repeat `deploy_infrastructure` with nothing changed
+can skip straight to a consistency check.
+"""
+
+import ast
+import glob
+import hashlib
+import json
+import os
+
+from pulumi.automation import errors
+
+import pulumi_workspace
+
+
+INFRA_DIR = "/workspaces/North_Korean_Cloud_Nightmare/Infra"
+# __main__.py puts the repository root on sys.path for its shared modules
+REPO_DIR = os.path.dirname(INFRA_DIR)
+FINGERPRINT_PATH = os.path.join(INFRA_DIR, "forrester-2025-fingerprint.json")
+
+# Entry points of the deployed program; the repository modules they import are added by program_files()
+PROGRAM_FILES = [
+    os.path.join(INFRA_DIR, "__main__.py"),
+]
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def imported_modules(path):
+    """Repository modules (REPO_DIR/<name>.py) a Python file imports"""
+    with open(path, "r") as file:
+        tree = ast.parse(file.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    modules = (os.path.join(REPO_DIR, f"{name}.py") for name in sorted(names))
+    return [module for module in modules if os.path.exists(module)]
+
+
+def program_files():
+    """The Pulumi program plus every repository module it imports, directly or through another one"""
+    found = []
+    pending = [path for path in PROGRAM_FILES if os.path.exists(path)]
+    while pending:
+        path = pending.pop(0)
+        if path not in found:
+            found.append(path)
+            pending += imported_modules(path)
+    return found
+
+
+def file_hashes():
+    """SHA-256 of the Pulumi program, the repository modules it imports and every Pulumi.*.yaml stack config"""
+    paths = program_files() + sorted(glob.glob(os.path.join(INFRA_DIR, "Pulumi*.yaml")))
+    return {os.path.basename(path): _sha256_file(path) for path in paths if os.path.exists(path)}
+
+
+def plugin_versions():
+    """Installed Pulumi plugin name -> version"""
+    try:
+        return pulumi_workspace.plugin_versions()
+    except errors.CommandError:
+        return {}
+
+
+def last_successful_update():
+    """Version number of the most recent successful update of the stack (None if never deployed)"""
+    try:
+        return pulumi_workspace.last_successful_update()
+    except errors.CommandError:
+        return None
+
+
+def compute_fingerprint(seed_params=None):
+    """Current fingerprint components plus their combined digest"""
+    components = {
+        "files": file_hashes(),
+        "plugins": plugin_versions(),
+        "last_update": last_successful_update(),
+        "seed_params": seed_params or {},
+    }
+    digest = hashlib.sha256(json.dumps(components, sort_keys=True).encode()).hexdigest()
+    return {"digest": digest, "components": components}
+
+
+def load_fingerprint():
+    """Stored fingerprint from the last successful deploy, or None"""
+    try:
+        with open(FINGERPRINT_PATH, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_fingerprint(fingerprint, outputs_path):
+    """Persist the fingerprint together with a hash of the outputs file it belongs to"""
+    record = dict(fingerprint, outputs_sha256=_sha256_file(outputs_path))
+    with open(FINGERPRINT_PATH, "w") as file:
+        json.dump(record, file, indent=2)
+
+
+def clear_fingerprint():
+    """Forget the stored fingerprint so the next deploy runs in full"""
+    if os.path.exists(FINGERPRINT_PATH):
+        os.remove(FINGERPRINT_PATH)
+
+
+def changed_components(stored, current):
+    """Names of fingerprint components that differ between two fingerprints"""
+    if not stored:
+        return ["no previous fingerprint"]
+    return [
+        name for name, value in current["components"].items()
+        if stored.get("components", {}).get(name) != value
+    ]
+
+
+def is_consistent(stored, outputs_path):
+    """Fast consistency check: the outputs file still exists and is the one the fingerprint recorded"""
+    return bool(stored) and os.path.exists(outputs_path) and stored.get("outputs_sha256") == _sha256_file(outputs_path)
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+from moto.server import ThreadedMotoServer
+
+import clean_up
+import local_backend
+import pulumi_workspace
+from lab_index import LabIndex
+
+
+def test_refresh_targets_every_resource_the_teardown_touches(monkeypatch):
+    resources = [
+        {"urn": "urn:pulumi:dev::nkcn::aws:iam/user:User::DevOpsUser", "type": "aws:iam/user:User"},
+        {"urn": "urn:pulumi:dev::nkcn::aws:iam/userPolicy:UserPolicy::devops-inline",
+         "type": "aws:iam/userPolicy:UserPolicy"},
+        {"urn": "urn:pulumi:dev::nkcn::aws:s3/bucket:Bucket::customer-data", "type": "aws:s3/bucket:Bucket"},
+    ]
+    refreshed = []
+    monkeypatch.setattr(pulumi_workspace, "stack_resources", lambda: resources)
+    monkeypatch.setattr(pulumi_workspace, "refresh", lambda on_event=None, target=None: refreshed.extend(target))
+    monkeypatch.setattr(pulumi_workspace, "destroy", lambda on_event=None, parallel=None: None)
+
+    assert clean_up.teardown_infrastructure() is True
+    assert refreshed == [resources[0]["urn"], resources[1]["urn"]]
+
+
+@pytest.fixture
+def local_backend_env(monkeypatch, tmp_path):
+    """A moto server standing in for the local backend, with its environment active"""
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint = f"http://{host}:{port}"
+    monkeypatch.setattr(local_backend, "LOCAL_ENDPOINT", endpoint)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ENDPOINT_URL", endpoint)
+    for name, value in local_backend.LOCAL_ENVIRONMENT.items():
+        if name.startswith("AWS_") and name != "AWS_ENDPOINT_URL":
+            monkeypatch.setenv(name, value)
+    monkeypatch.setattr(clean_up, "_clients", {})
+    yield endpoint
+    server.stop()
+
+
+def test_clear_env_vars_keeps_the_emulator_credentials(local_backend_env, monkeypatch):
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "lab-session")
+    clean_up.AWSProfileCleanup.clear_env_vars()
+    assert os.environ["AWS_ACCESS_KEY_ID"] == local_backend.LOCAL_ENVIRONMENT["AWS_ACCESS_KEY_ID"]
+    assert "AWS_SESSION_TOKEN" not in os.environ
+
+    # Verification still reaches the emulator and does not count its credentials as leftovers
+    assert clean_up.AWSProfileCleanup.verify_cleanup(LabIndex(run_id="lab-dev")) is True
+
+
+def test_clear_env_vars_removes_real_credentials(monkeypatch):
+    monkeypatch.delenv("AWS_ENDPOINT_URL", raising=False)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIAREALKEY")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    clean_up.AWSProfileCleanup.clear_env_vars()
+    assert "AWS_ACCESS_KEY_ID" not in os.environ and "AWS_SECRET_ACCESS_KEY" not in os.environ
+
+
+@pytest.mark.parametrize("verified", [True, False])
+def test_clean_up_command_reports_the_verification(monkeypatch, verified):
+    import North_Korean_Cloud_Nightmare as cli
+    import stack_fingerprint
+
+    monkeypatch.setattr(cli, "check_and_setup_environment", lambda: True)
+    monkeypatch.setattr(cli, "ensure_pulumi_stack", lambda: True)
+    monkeypatch.setattr(stack_fingerprint, "clear_fingerprint", lambda: None)
+    monkeypatch.setattr(clean_up, "full_cleanup", lambda full_refresh=False: verified)
+    assert cli.clean_up() is verified
@@ -0,0 +1,43 @@
+import time
+
+import boto3
+import pytest
+
+import clock
+import readiness
+
+
+@pytest.fixture
+def virtual_clock(monkeypatch):
+    virtual = clock.VirtualClock()
+    monkeypatch.setattr(clock, "_clock", virtual)
+    return virtual
+
+
+def test_scripted_waits_are_skipped_in_rehearsal(virtual_clock):
+    start = time.time()
+    clock.sleep(30, "next TOTP window")
+    assert time.time() - start < 0.1
+    assert virtual_clock.summary()["skipped_seconds"] == 30
+
+
+def test_poll_waits_take_real_time_in_rehearsal(virtual_clock):
+    start = time.time()
+    clock.poll_sleep(0.2, "waiting for too_late deletion")
+    assert time.time() - start >= 0.2
+    assert virtual_clock.skipped == 0
+    assert virtual_clock.timeline[0]["real"] is True
+
+
+def test_readiness_poll_waits_for_the_resource_in_rehearsal(virtual_clock, monkeypatch):
+    monkeypatch.setattr(readiness, "POLL_DELAY", 0.05)
+    checks = []
+    gate = readiness.ReadinessGate(session=boto3.Session(region_name="us-east-1"), timeout=1)
+
+    def check():
+        checks.append(time.time())
+        return len(checks) == 4, "CREATING"
+
+    # Without real waits the loop would spin through the whole timeout in microseconds
+    assert gate._poll(check) == (True, "CREATING", 4)
+    assert checks[-1] - checks[0] >= 0.15
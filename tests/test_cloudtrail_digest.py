@@ -0,0 +1,143 @@
+import gzip
+import hashlib
+import json
+
+import boto3
+import pytest
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from moto.server import ThreadedMotoServer
+
+import cloudtrail_digest
+import cloudtrail_ingest
+
+ACCOUNT = "111122223333"
+BUCKET = "lab-trail-logs"
+FINGERPRINT = "0123456789abcdef"
+LOG_PREFIX = f"AWSLogs/{ACCOUNT}/CloudTrail/us-east-1/2026/10/18/"
+DIGEST_PREFIX = f"AWSLogs/{ACCOUNT}/CloudTrail-Digest/us-east-1/2026/10/18/"
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def public_keys(private_key):
+    der = private_key.public_key().public_bytes(serialization.Encoding.DER,
+                                                serialization.PublicFormat.SubjectPublicKeyInfo)
+    return {FINGERPRINT: der}
+
+
+@pytest.fixture
+def trail_bucket(monkeypatch, tmp_path):
+    """A trail bucket on a moto server, reachable from the verifier's worker processes"""
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    monkeypatch.setenv("AWS_ENDPOINT_URL", f"http://{host}:{port}")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    client = boto3.client("s3", region_name="us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    yield client
+    server.stop()
+
+
+def sign(private_key, digest, digest_hash):
+    message = cloudtrail_digest.string_to_sign(digest, digest_hash).encode()
+    return private_key.sign(message, padding.PKCS1v15(), hashes.SHA256()).hex()
+
+
+def put_log(s3_client, stamp, suffix):
+    key = f"{LOG_PREFIX}{ACCOUNT}_CloudTrail_us-east-1_{stamp}_{suffix}.json.gz"
+    raw = json.dumps({"Records": [{"eventID": suffix, "eventTime": "2026-10-18T10:00:00Z"}]}).encode()
+    s3_client.put_object(Bucket=BUCKET, Key=key, Body=gzip.compress(raw))
+    return {"s3Bucket": BUCKET, "s3Object": key, "hashValue": hashlib.sha256(raw).hexdigest(),
+            "oldestEventTime": f"2026-10-18T{stamp[9:11]}:{stamp[11:13]}:00Z",
+            "newestEventTime": f"2026-10-18T{stamp[9:11]}:{stamp[11:13]}:30Z"}
+
+
+def put_digest_chain(s3_client, private_key, hours_and_logs):
+    """Signed, linked hourly digests; returns their keys"""
+    previous, keys = None, []
+    for hour, log_files in hours_and_logs:
+        key = f"{DIGEST_PREFIX}{ACCOUNT}_CloudTrail-Digest_us-east-1_cloudtrail_us-east-1_20261018T{hour:02d}0512Z.json.gz"
+        digest = {
+            "digestStartTime": f"2026-10-18T{hour - 1:02d}:05:12Z",
+            "digestEndTime": f"2026-10-18T{hour:02d}:05:12Z",
+            "digestS3Bucket": BUCKET,
+            "digestS3Object": key,
+            "digestPublicKeyFingerprint": FINGERPRINT,
+            "previousDigestS3Object": previous["key"] if previous else None,
+            "previousDigestHashValue": previous["hash"] if previous else None,
+            "previousDigestSignature": previous["signature"] if previous else None,
+            "logFiles": log_files,
+        }
+        raw = json.dumps(digest).encode()
+        digest_hash = hashlib.sha256(raw).hexdigest()
+        signature = sign(private_key, digest, digest_hash)
+        s3_client.put_object(Bucket=BUCKET, Key=key, Body=gzip.compress(raw),
+                             Metadata={"signature": signature, "signature-algorithm": "SHA256withRSA"})
+        previous = {"key": key, "hash": digest_hash, "signature": signature}
+        keys.append(key)
+    return keys
+
+
+def test_check_signature(private_key, public_keys):
+    digest = {"digestEndTime": "2026-10-18T10:05:12Z", "digestS3Bucket": BUCKET, "digestS3Object": "d.json.gz",
+              "digestPublicKeyFingerprint": FINGERPRINT}
+    metadata = {"signature": sign(private_key, digest, "ab" * 32), "signature-algorithm": "SHA256withRSA"}
+    assert cloudtrail_digest.check_signature(digest, "ab" * 32, metadata, public_keys) == (True, None)
+    assert cloudtrail_digest.check_signature(digest, "cd" * 32, metadata, public_keys)[0] is False
+    assert cloudtrail_digest.check_signature(digest, "ab" * 32, {}, public_keys)[0] is False
+    assert cloudtrail_digest.check_signature(digest, "ab" * 32, metadata, None)[0] is None
+
+
+def test_tampered_and_deleted_log_files_are_reported(trail_bucket, private_key, public_keys, tmp_path, monkeypatch):
+    monkeypatch.setattr(cloudtrail_digest.DigestVerifier, "public_keys", lambda self, start, end: public_keys)
+    intact = put_log(trail_bucket, "20261018T0905Z", "aaaa")
+    tampered = put_log(trail_bucket, "20261018T0955Z", "bbbb")
+    deleted = put_log(trail_bucket, "20261018T1005Z", "cccc")
+    put_digest_chain(trail_bucket, private_key, [(10, [intact, tampered]), (11, [deleted])])
+    trail_bucket.put_object(Bucket=BUCKET, Key=tampered["s3Object"], Body=gzip.compress(b'{"Records": []}'))
+    trail_bucket.delete_object(Bucket=BUCKET, Key=deleted["s3Object"])
+
+    db_path = str(tmp_path / "index.sqlite")
+    verifier = cloudtrail_digest.DigestVerifier(BUCKET, db_path=db_path, workers=2)
+    summary = verifier.run()
+    assert summary["digests"] == 2
+    assert summary["statuses"] == {"valid": 1, "tampered": 1, "missing": 1}
+
+    report = cloudtrail_digest.build_report(BUCKET, summary, db_path=db_path)
+    assert sorted((item["kind"], item["key"]) for item in report["findings"]) == [
+        ("log file missing", deleted["s3Object"]), ("log file tampered", tampered["s3Object"])]
+
+    # Only new digests are verified on the next run
+    assert verifier.run()["digests"] == 0
+
+
+def test_chain_findings_report_stopped_logging_and_missing_digests(tmp_path):
+    connection = cloudtrail_ingest.open_index(str(tmp_path / "index.sqlite"))
+    connection.executescript(cloudtrail_digest.SCHEMA)
+
+    def add(key, start, end, previous_key=None, previous_hash=None):
+        connection.execute(
+            "INSERT INTO digests (key, bucket, prefix, digest_start, digest_end, previous_key, previous_hash, hash, "
+            "signature_ok) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)",
+            (key, BUCKET, "AWSLogs/1/CloudTrail-Digest/us-east-1/", start, end, previous_key, previous_hash,
+             f"hash-{key}"))
+
+    add("d1", "2026-10-18T09:00:00Z", "2026-10-18T10:00:00Z")
+    add("d2", "2026-10-18T10:00:00Z", "2026-10-18T11:00:00Z", "d1", "hash-d1")
+    # Trail stopped at 11:00 and restarted at 13:00 with a new chain, whose next digest links to a deleted one
+    add("d3", "2026-10-18T13:00:00Z", "2026-10-18T14:00:00Z")
+    add("d5", "2026-10-18T15:00:00Z", "2026-10-18T16:00:00Z", "d4", "hash-d4")
+
+    findings = cloudtrail_digest.chain_findings(connection, BUCKET, now=cloudtrail_digest.epoch("2026-10-18T16:30:00Z"))
+    assert [(item["kind"], item["start"], item["end"]) for item in findings] == [
+        ("logging stopped", "2026-10-18T11:00:00Z", "2026-10-18T13:00:00Z"),
+        ("digest missing", "2026-10-18T14:00:00Z", "2026-10-18T15:00:00Z"),
+    ]
+    connection.close()
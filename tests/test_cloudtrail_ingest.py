@@ -0,0 +1,63 @@
+import gzip
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import cloudtrail_ingest
+
+ACCOUNT = "111122223333"
+BUCKET = "lab-trail-logs"
+PREFIX = f"AWSLogs/{ACCOUNT}/CloudTrail/us-east-1/"
+
+
+def log_key(stamp, suffix):
+    return f"{PREFIX}2026/10/18/{ACCOUNT}_CloudTrail_us-east-1_{stamp}_{suffix}.json.gz"
+
+
+def put_log(s3_client, key, *event_names):
+    records = [{"eventID": f"{key}-{index}", "eventTime": "2026-10-18T10:05:00Z", "eventName": name,
+                "eventSource": "iam.amazonaws.com", "userIdentity": {"type": "IAMUser", "userName": "DevOpsUser"}}
+               for index, name in enumerate(event_names)]
+    s3_client.put_object(Bucket=BUCKET, Key=key, Body=gzip.compress(json.dumps({"Records": records}).encode()))
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def test_listing_start_looks_back_to_the_previous_day_folder():
+    assert cloudtrail_ingest.listing_start(PREFIX, log_key("20261018T0030Z", "b")) == f"{PREFIX}2026/10/17/"
+    assert cloudtrail_ingest.listing_start(PREFIX, log_key("20261018T1005Z", "b")) == f"{PREFIX}2026/10/18/"
+    assert cloudtrail_ingest.listing_start(PREFIX, None) is None
+
+
+def test_late_delivered_file_that_sorts_before_the_checkpoint_is_ingested(s3_client, tmp_path):
+    db_path = str(tmp_path / "index.sqlite")
+    put_log(s3_client, log_key("20261018T1005Z", "zzzz"), "GetCallerIdentity")
+    put_log(s3_client, log_key("20261018T1010Z", "mmmm"), "ListUsers")
+    first = cloudtrail_ingest.CloudTrailIngest(BUCKET, db_path=db_path).run()
+    assert first["files"] == 2
+
+    # Delivered after the first run, but its random suffix sorts before the first file of the same minute
+    put_log(s3_client, log_key("20261018T1005Z", "aaaa"), "CreateUser", "AttachUserPolicy", "StopLogging")
+    second = cloudtrail_ingest.CloudTrailIngest(BUCKET, db_path=db_path).run()
+    assert second["files"] == 1
+    assert second["inserted"] == 3
+
+    connection = cloudtrail_ingest.open_index(db_path)
+    names = {event["event_name"] for event in cloudtrail_ingest.query(connection)}
+    checkpoint = connection.execute("SELECT last_key FROM checkpoints").fetchone()[0]
+    connection.close()
+    assert {"CreateUser", "AttachUserPolicy", "StopLogging"} <= names
+    # The checkpoint never moves back to the late file
+    assert checkpoint == log_key("20261018T1010Z", "mmmm")
+
+    assert cloudtrail_ingest.CloudTrailIngest(BUCKET, db_path=db_path).run()["files"] == 0
@@ -0,0 +1,41 @@
+import pytest
+
+import data_generator
+
+
+def records(schema, rows, **kwargs):
+    return list(data_generator.generate_records(schema, rows, **kwargs))
+
+
+@pytest.mark.parametrize("schema", sorted(data_generator.SCHEMAS))
+def test_row_content_does_not_depend_on_total_rows(schema):
+    full = records(schema, 20000)
+    assert records(schema, 3) == full[:3]
+    assert records(schema, 5) == full[:5]
+    # Across a batch boundary, with a short final batch
+    assert records(schema, 10005) == full[:10005]
+
+
+def test_same_seed_same_rows_and_different_seed_different_rows():
+    assert records("customers", 100, seed=7) == records("customers", 100, seed=7)
+    assert records("customers", 100, seed=7) != records("customers", 100, seed=8)
+
+
+def test_start_regenerates_a_later_batch_independently():
+    full = records("orders", 30, batch_size=10)
+    assert records("orders", 30, batch_size=10, start=20) == full[20:]
+
+
+def test_start_inside_a_batch_matches_the_full_dataset():
+    full = records("orders", 30, batch_size=10)
+    assert records("orders", 30, batch_size=10, start=5) == full[5:]
+    assert records("orders", 17, batch_size=10, start=15) == full[15:17]
+    assert records("orders", 30, batch_size=10, start=30) == []
+
+
+def test_ndjson_rendering_matches_records():
+    import json
+
+    batch = next(data_generator.generate_batches("payments", 4))
+    rendered = [json.loads(line) for line in data_generator.render_ndjson("payments", batch)]
+    assert rendered == data_generator.batch_records("payments", batch)
@@ -0,0 +1,74 @@
+import pytest
+from moto import mock_aws
+
+import North_Korean_Cloud_Nightmare as cli
+import stack_fingerprint
+
+
+@pytest.fixture
+def unchanged_stack(monkeypatch):
+    checks = []
+    monkeypatch.setattr(cli, "check_and_setup_environment", lambda: True)
+    monkeypatch.setattr(stack_fingerprint, "compute_fingerprint", lambda seed_params=None: {})
+    monkeypatch.setattr(cli, "deployment_is_current", lambda fingerprint: True)
+    monkeypatch.setattr(cli, "ensure_pulumi_stack", lambda: pytest.fail("fast path must not roll out"))
+    monkeypatch.setattr(cli, "forrester_scenario_check_idempotent", lambda: checks.append("preview") or False)
+    return checks
+
+
+def test_fast_path_skips_the_check_unless_asked(unchanged_stack):
+    assert cli.deploy_infrastructure() is True
+    assert unchanged_stack == []
+
+
+def test_fast_path_still_runs_the_idempotency_check(unchanged_stack):
+    assert cli.deploy_infrastructure(check_idempotent=True) is False
+    assert unchanged_stack == ["preview"]
+
+
+@pytest.fixture
+def rollout(monkeypatch):
+    """A full deployment with every stage stubbed; returns the fingerprints it saved"""
+    saved = []
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr(cli, "check_and_setup_environment", lambda: True)
+    monkeypatch.setattr(cli, "deployment_is_current", lambda fingerprint: False)
+    monkeypatch.setattr(cli, "ensure_pulumi_stack", lambda: True)
+    monkeypatch.setattr(cli, "forrester_scenario_execute", lambda: {"data_seed": 0})
+    monkeypatch.setattr(cli, "forrester_scenario_validate_rollout", lambda outputs: True)
+    monkeypatch.setattr(cli, "forrester_scenario_seed_data", lambda *args, **kwargs: ([], {"failures": []}))
+    monkeypatch.setattr(cli, "forrester_scenario_validate_data", lambda outputs: True)
+    monkeypatch.setattr(stack_fingerprint, "compute_fingerprint", lambda seed_params=None: {"digest": "new"})
+    monkeypatch.setattr(stack_fingerprint, "clear_fingerprint", lambda: saved.clear())
+    monkeypatch.setattr(stack_fingerprint, "save_fingerprint", lambda fingerprint, path: saved.append(fingerprint))
+    saved.append({"digest": "previous"})
+    with mock_aws():
+        yield saved
+
+
+def test_successful_deploy_records_its_fingerprint(rollout):
+    assert cli.deploy_infrastructure() is True
+    assert rollout == [{"digest": "new"}]
+
+
+def test_failed_seeding_does_not_record_a_fingerprint(rollout, monkeypatch):
+    monkeypatch.setattr(cli, "forrester_scenario_seed_data",
+                        lambda *args, **kwargs: ([], {"failures": [{"bucket": "b", "key": "k", "error": "SlowDown"}]}))
+    assert cli.deploy_infrastructure() is False
+    assert rollout == []
+
+
+def test_seeding_error_does_not_record_a_fingerprint(rollout, monkeypatch):
+    def seed_data(*args, **kwargs):
+        raise RuntimeError("ERROR: CustomerOrders: items still unprocessed after 8 attempts")
+
+    monkeypatch.setattr(cli, "forrester_scenario_seed_data", seed_data)
+    assert cli.deploy_infrastructure() is False
+    assert rollout == []
+
+
+def test_failed_validation_does_not_record_a_fingerprint(rollout, monkeypatch):
+    monkeypatch.setattr(cli, "forrester_scenario_validate_data", lambda outputs: False)
+    assert cli.deploy_infrastructure() is False
+    assert rollout == []
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import cloudtrail_ingest
+import detection_engine
+
+START = datetime(2026, 10, 18, 10, 0, tzinfo=timezone.utc)
+
+MFA_BURST = {
+    "id": "mfa-burst",
+    "phase": "mfa_ddos",
+    "detection": {
+        "mfa_removal": {"eventSource": "iam.amazonaws.com", "eventName": ["DeactivateMFADevice", "DeleteVirtualMFADevice"]},
+        "condition": "mfa_removal",
+    },
+    "correlation": {"type": "event_count", "group-by": ["userIdentity.arn"], "timespan": "5m",
+                    "condition": {"gte": 3}},
+}
+
+
+def record(seconds, event_name, arn="arn:aws:iam::111122223333:user/DevOpsUser", **fields):
+    return dict({
+        "eventID": f"{event_name}-{seconds}-{arn}",
+        "eventTime": (START + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "eventSource": "iam.amazonaws.com",
+        "eventName": event_name,
+        "userIdentity": {"type": "IAMUser", "arn": arn},
+    }, **fields)
+
+
+@pytest.fixture
+def index(tmp_path):
+    connection = cloudtrail_ingest.open_index(str(tmp_path / "index.sqlite"))
+    yield connection
+    connection.close()
+
+
+def add_events(connection, records):
+    with connection:
+        connection.executemany(cloudtrail_ingest.INSERT_EVENT,
+                               [cloudtrail_ingest.event_row(item, "test.json.gz") for item in records])
+
+
+def test_condition_modifiers_and_candidate_event_names():
+    rule = detection_engine.Rule({
+        "id": "stop-or-delete-trail",
+        "detection": {
+            "selection": {"eventName": ["StopLogging", "DeleteTrail"]},
+            "console": {"userAgent|contains": "console"},
+            "condition": "selection and not console",
+        },
+    })
+    assert rule.event_names == {"StopLogging", "DeleteTrail"}
+    assert rule.process(record(0, "StopLogging", userAgent="aws-cli/2.15"), "e1", "2026-10-18T10:00:00Z")
+    assert rule.process(record(0, "StopLogging", userAgent="AWS Internal console"), "e2", "2026-10-18T10:00:00Z") is None
+    assert rule.process(record(0, "CreateUser"), "e3", "2026-10-18T10:00:00Z") is None
+
+
+def test_event_count_burst_raises_one_alert(index):
+    # A mass MFA removal: 20 deletions, one every 10s, well over the threshold of 3
+    add_events(index, [record(seconds, "DeactivateMFADevice") for seconds in range(0, 200, 10)])
+    summary = detection_engine.DetectionEngine([detection_engine.Rule(MFA_BURST)]).evaluate(index)
+    assert summary["new_alerts"] == 1
+    assert summary["alerts"][0]["first_seen"] == "2026-10-18T10:00:00Z"
+    assert summary["alerts"][0]["event_count"] == 3
+
+
+def test_event_count_fires_again_after_a_quiet_timespan_and_across_runs(index):
+    add_events(index, [record(seconds, "DeactivateMFADevice") for seconds in (0, 10, 20, 30)])
+    first = detection_engine.DetectionEngine([detection_engine.Rule(MFA_BURST)]).evaluate(index)
+    assert first["new_alerts"] == 1
+
+    # A later run sees the rest of the same burst (saved quiet state), then a new burst after 10 quiet minutes
+    add_events(index, [record(seconds, "DeactivateMFADevice") for seconds in (40, 50, 60, 700, 710, 720)])
+    second = detection_engine.DetectionEngine([detection_engine.Rule(MFA_BURST)]).evaluate(index)
+    assert second["new_alerts"] == 1
+    assert second["alerts"][0]["first_seen"] == "2026-10-18T10:11:40Z"
+
+
+def test_event_count_groups_by_identity(index):
+    add_events(index, [record(seconds, "DeleteVirtualMFADevice", arn=f"arn:aws:iam::111122223333:user/{name}")
+                       for seconds in (0, 10, 20) for name in ("Attacker", "Admin")])
+    summary = detection_engine.DetectionEngine([detection_engine.Rule(MFA_BURST)]).evaluate(index)
+    assert sorted(alert["group_key"] for alert in summary["alerts"]) == [
+        "arn:aws:iam::111122223333:user/Admin", "arn:aws:iam::111122223333:user/Attacker"]
+
+
+def test_temporal_ordered_needs_the_steps_in_order_within_the_timespan(index):
+    add_events(index, [
+        record(0, "AttachUserPolicy", requestParameters={"userName": "early"}),
+        record(10, "CreateUser", requestParameters={"userName": "early"}),
+        record(20, "CreateUser", requestParameters={"userName": "backdoor"}),
+        record(80, "AttachUserPolicy", requestParameters={"userName": "backdoor"}),
+        record(30, "CreateUser", requestParameters={"userName": "slow"}),
+        record(1000, "AttachUserPolicy", requestParameters={"userName": "slow"}),
+    ])
+    engine = detection_engine.DetectionEngine.from_directory()
+    summary = engine.evaluate(index)
+    alerts = [alert for alert in summary["alerts"] if alert["rule_id"] == "nkcn-iam-create-user-attach-policy"]
+    assert [alert["group_key"] for alert in alerts] == ["backdoor"]
+    assert alerts[0]["phase"] == "malicious_user"
+
+
+def test_shipped_rules_load():
+    rules = detection_engine.load_rules()
+    assert rules
+    assert all(rule.phase for rule in rules)
+
+
+def test_shipped_rules_catch_s3_and_dynamodb_destruction(index):
+    # The live trail is stopped by then; these events come from a replayed or fixture stream
+    attacker = "arn:aws:iam::111122223333:user/run_while_u_can_123456"
+    add_events(index, [record(seconds, "DeleteObject", arn=attacker, eventSource="s3.amazonaws.com",
+                              requestParameters={"bucketName": "customer-data", "key": f"exports/{seconds}.ndjson"})
+                       for seconds in range(60)])
+    add_events(index, [record(seconds, "DeleteTable", arn=attacker, eventSource="dynamodb.amazonaws.com",
+                              requestParameters={"tableName": table})
+                       for seconds, table in ((100, "CustomerOrdersTable"), (110, "CustomerSSNTable"))])
+    summary = detection_engine.DetectionEngine.from_directory().evaluate(index)
+    assert sorted((alert["rule_id"], alert["phase"]) for alert in summary["alerts"]) == [
+        ("nkcn-dynamodb-mass-delete-table", "dynamodb"), ("nkcn-s3-mass-delete", "s3")]
@@ -0,0 +1,53 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+import data_generator
+from dynamodb_seeder import BATCH_WRITE_LIMIT, DynamoDBSeeder, to_dynamodb_items
+from seed_manifest import combine_digests, format_digest, item_digest
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        session = boto3.Session(region_name="us-east-1")
+        session.client("dynamodb").create_table(
+            TableName="CustomerOrders",
+            KeySchema=[{"AttributeName": "ID", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "ID", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield session
+
+
+def test_default_seed_is_split_across_every_worker():
+    segments = DynamoDBSeeder(session=boto3.Session(region_name="us-east-1"), workers=16)._segments(1000)
+    assert len(segments) == 14
+    assert segments[0] == (0, 75) and segments[-1] == (975, 1000)
+    assert all(start % BATCH_WRITE_LIMIT == 0 for start, _ in segments)
+    assert [end for _, end in segments[:-1]] == [start for start, _ in segments[1:]]
+
+
+def test_segments_of_small_and_empty_tables():
+    seeder = DynamoDBSeeder(session=boto3.Session(region_name="us-east-1"), workers=16)
+    assert seeder._segments(0) == []
+    assert seeder._segments(10) == [(0, 10)]
+    assert len(seeder._segments(16 * BATCH_WRITE_LIMIT)) == 16
+
+
+def test_seeded_items_match_the_generated_dataset(session):
+    summary = DynamoDBSeeder(session=session, workers=4).seed_table("CustomerOrders", "orders", 130, batch_size=50)
+    assert summary["items"] == 130
+
+    expected = [item for batch in data_generator.generate_batches("orders", 130, batch_size=50)
+                for item in to_dynamodb_items("orders", batch)]
+    assert summary["items_digest"] == format_digest(combine_digests(item_digest(item) for item in expected))
+    items = session.client("dynamodb").scan(TableName="CustomerOrders")["Items"]
+    assert sorted(items, key=lambda item: item["ID"]["S"]) == sorted(expected, key=lambda item: item["ID"]["S"])
+
+
+def test_seeding_zero_rows_writes_nothing(session):
+    summary = DynamoDBSeeder(session=session, workers=4).seed_table("CustomerOrders", "orders", 0)
+    assert summary["items"] == 0
@@ -0,0 +1,18 @@
+from benchmarks import import_time
+from North_Korean_Cloud_Nightmare import COMMANDS
+
+
+def test_every_subcommand_has_a_dispatch_branch_and_a_budget():
+    assert import_time.unmapped_commands() == []
+    assert set(import_time.dispatch_branches()) == set(COMMANDS)
+
+
+def test_import_set_follows_calls_into_other_modules():
+    # Each of these runs check_and_setup_environment() first, whose preflight checks import boto3 and Pulumi
+    for command in ["ingest_cloudtrail", "verify_cloudtrail", "run_detections", "scoreboard"]:
+        modules = import_time.imported_modules(import_time.command_imports(command))
+        assert {"preflight", "pulumi_workspace", "boto3"} <= set(modules), command
+
+    # scoreboard's local source imports the detection engine inside a method
+    assert "detection_engine" in import_time.imported_modules(import_time.command_imports("scoreboard"))
+    assert import_time.command_imports("help") == []
@@ -0,0 +1,48 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from lab_index import LAB_PATH, LabIndex, lab_path
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        yield boto3.Session(region_name="us-east-1")
+
+
+def create_iam_entities(iam_client, name, path):
+    iam_client.create_user(UserName=name, Path=path)
+    iam_client.create_virtual_mfa_device(VirtualMFADeviceName=f"{name}-MFA", Path=path)
+    iam_client.create_policy(PolicyName=f"{name}-policy", Path=path, PolicyDocument=(
+        '{"Version": "2012-10-17", "Statement": [{"Effect": "Allow", "Action": "s3:ListBucket", "Resource": "*"}]}'))
+
+
+def test_lab_path():
+    assert lab_path("north-korean-cloud-nightmare-dev") == f"{LAB_PATH}north-korean-cloud-nightmare-dev/"
+    assert lab_path(None) == LAB_PATH
+
+
+def test_index_only_finds_its_own_run(session):
+    iam_client = session.client("iam")
+    create_iam_entities(iam_client, "DevOpsUser-dev", lab_path("lab-dev"))
+    create_iam_entities(iam_client, "DevOpsUser-prod", lab_path("lab-prod"))
+    create_iam_entities(iam_client, "legacy-user", LAB_PATH)
+    create_iam_entities(iam_client, "someone-else", "/")
+
+    index = LabIndex(session=session, run_id="lab-dev")
+    assert [user["name"] for user in index.iam_users()] == ["DevOpsUser-dev"]
+    assert [policy["name"] for policy in index.iam_policies()] == ["DevOpsUser-dev-policy"]
+    assert [device["name"] for device in index.virtual_mfa_devices()] == ["DevOpsUser-dev-MFA"]
+
+
+def test_index_without_run_id_only_finds_legacy_entities(session):
+    iam_client = session.client("iam")
+    create_iam_entities(iam_client, "DevOpsUser-dev", lab_path("lab-dev"))
+    create_iam_entities(iam_client, "legacy-user", LAB_PATH)
+
+    index = LabIndex(session=session)
+    assert [user["name"] for user in index.iam_users()] == ["legacy-user"]
+    assert [device["name"] for device in index.virtual_mfa_devices()] == ["legacy-user-MFA"]
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from benchmarks import lifecycle
+
+RESULT = {"passed": True, "wall_seconds": 10.0, "peak_rss_mb": 100.0, "peak_child_rss_mb": 300.0, "api_calls": 500}
+
+
+@pytest.fixture
+def baselines(tmp_path, monkeypatch):
+    monkeypatch.setattr(lifecycle, "BASELINE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_missing_baseline_fails_without_running(baselines, monkeypatch):
+    monkeypatch.setattr(lifecycle, "measure", lambda phase, scale, verbose: pytest.fail("must not run"))
+    results, failures = lifecycle.run_scale("1k", update_baseline=False, verbose=False)
+    assert results == {}
+    assert len(failures) == 1 and "--update-baseline" in failures[0]
+    assert not (baselines / "lifecycle-1k.json").exists()
+
+
+def test_update_baseline_records_a_complete_run_then_checks_against_it(baselines, monkeypatch):
+    monkeypatch.setattr(lifecycle, "measure", lambda phase, scale, verbose: dict(RESULT))
+    assert lifecycle.run_scale("1k", update_baseline=True, verbose=False)[1] == []
+    saved = json.loads((baselines / "lifecycle-1k.json").read_text())
+    assert sorted(saved["phases"]) == sorted(lifecycle.PHASES)
+
+    slower = dict(RESULT, wall_seconds=20.0)
+    monkeypatch.setattr(lifecycle, "measure", lambda phase, scale, verbose: dict(slower))
+    _, failures = lifecycle.run_scale("1k", update_baseline=False, verbose=False)
+    assert failures and all("wall_seconds 20.0 > 15.0" in failure for failure in failures)
+
+
+def test_failed_phase_does_not_record_a_baseline(baselines, monkeypatch):
+    def measure(phase, scale, verbose):
+        return dict(RESULT, passed=phase != "seed")
+
+    monkeypatch.setattr(lifecycle, "measure", measure)
+    _, failures = lifecycle.run_scale("1k", update_baseline=True, verbose=False)
+    assert failures == ["1k/seed: phase reported failure"]
+    assert not (baselines / "lifecycle-1k.json").exists()
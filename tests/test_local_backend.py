@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import runpy
+import shutil
+import socket
+
+import boto3
+import pytest
+
+import local_backend
+
+INFRA_PROGRAM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Infra", "__main__.py")
+
+
+def test_activate_needs_the_pulumi_cli_before_starting_the_emulator(monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+    monkeypatch.setattr(local_backend, "start_server", lambda: pytest.fail("emulator started without the CLI"))
+    with pytest.raises(RuntimeError, match="pulumi CLI"):
+        local_backend.activate()
+
+
+def test_stack_config_points_every_service_at_the_emulator():
+    config = local_backend.stack_config()
+    for service in local_backend.SERVICES:
+        assert config[f"aws:endpoints[0].{service}"] == local_backend.LOCAL_ENDPOINT
+    assert config["aws:skipCredentialsValidation"] == "true"
+    assert config["localBackend"] == "true"
+
+
+def registered_types(monkeypatch, config):
+    """Resource types the Infra program registers under Pulumi's mock runtime with this project config"""
+    pulumi = pytest.importorskip("pulumi")
+    pytest.importorskip("pulumi_aws")
+    types = []
+
+    class Mocks(pulumi.runtime.Mocks):
+        def new_resource(self, args):
+            types.append(args.typ)
+            return f"{args.name}-id", {**args.inputs, "arn": f"arn:aws:mock:{args.name}"}
+
+        def call(self, args):
+            return {"accountId": "123456789012", "arn": "arn:aws:iam::123456789012:root", "userId": "mock"}
+
+    monkeypatch.setenv("PULUMI_CONFIG", json.dumps({f"Forrester-Attack-Demo:{key}": value
+                                                    for key, value in config.items()}))
+    pulumi.runtime.set_mocks(Mocks(), project="Forrester-Attack-Demo", stack=local_backend.LOCAL_STACK, preview=False)
+    runpy.run_path(INFRA_PROGRAM)
+    asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.2))
+    return types
+
+
+def test_local_stack_leaves_out_the_mfa_devices(monkeypatch):
+    assert registered_types(monkeypatch, {}).count("aws:iam/virtualMfaDevice:VirtualMfaDevice") == 4
+    local_types = registered_types(monkeypatch, {"localBackend": "true"})
+    assert "aws:iam/virtualMfaDevice:VirtualMfaDevice" not in local_types
+    assert "aws:guardduty/detector:Detector" in local_types and "aws:cloudtrail/trail:Trail" in local_types
+
+
+def test_emulator_has_the_aws_managed_policies_the_stack_attaches(monkeypatch, tmp_path):
+    with socket.socket() as probe:
+        probe.bind((local_backend.LOCAL_HOST, 0))
+        port = probe.getsockname()[1]
+    endpoint = f"http://{local_backend.LOCAL_HOST}:{port}"
+    monkeypatch.setattr(local_backend, "LOCAL_PORT", port)
+    monkeypatch.setattr(local_backend, "LOCAL_ENDPOINT", endpoint)
+    monkeypatch.setattr(local_backend, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(local_backend, "PID_PATH", str(tmp_path / "moto-server.pid"))
+    monkeypatch.setattr(local_backend, "LOG_PATH", str(tmp_path / "moto-server.log"))
+    monkeypatch.delenv("MOTO_IAM_LOAD_MANAGED_POLICIES", raising=False)
+    assert local_backend.start_server() is True
+    try:
+        iam = boto3.client("iam", endpoint_url=endpoint, region_name=local_backend.LOCAL_REGION,
+                           aws_access_key_id="testing", aws_secret_access_key="testing")
+        policy = iam.get_policy(PolicyArn="arn:aws:iam::aws:policy/AdministratorAccess")["Policy"]
+        assert policy["PolicyName"] == "AdministratorAccess"
+    finally:
+        assert local_backend.stop_server() is True
+
+
+def test_emulator_credentials_only_while_active(monkeypatch):
+    monkeypatch.delenv("AWS_ENDPOINT_URL", raising=False)
+    assert local_backend.emulator_credentials() == {}
+    monkeypatch.setenv("AWS_ENDPOINT_URL", local_backend.LOCAL_ENDPOINT)
+    assert local_backend.emulator_credentials()["AWS_ACCESS_KEY_ID"] == "testing"
@@ -0,0 +1,44 @@
+from pulumi.automation import EngineEvent
+
+import pulumi_workspace
+
+
+def engine_event(**fields):
+    return EngineEvent.from_json({"sequence": 1, "timestamp": 0, **fields})
+
+
+def summary_event(changes):
+    return engine_event(summaryEvent={"maybeCorrupt": False, "durationSeconds": 12, "resourceChanges": changes})
+
+
+def step_event(kind, op, urn="urn:pulumi:dev::infra::aws:s3/bucket:Bucket::lab-bucket"):
+    return engine_event(**{kind: {"metadata": {"op": op, "urn": urn, "type": "aws:s3/bucket:Bucket",
+                                               "provider": ""}}})
+
+
+def test_summary_event_prints_resource_changes(capsys):
+    printer = pulumi_workspace.EngineEventPrinter()
+    printer(summary_event({"create": 3, "same": 40, "delete": 0}))
+
+    output = capsys.readouterr().out
+    assert "3 create" in output
+    assert "40 same" in output
+    assert "delete" not in output
+    assert "(12s)" in output
+
+
+def test_summary_event_without_changes(capsys):
+    pulumi_workspace.EngineEventPrinter()(summary_event({}))
+    assert "no changes" in capsys.readouterr().out
+
+
+def test_timed_printer_handles_steps_and_summary(capsys):
+    printer = pulumi_workspace.TimedEngineEventPrinter()
+    printer(step_event("resourcePreEvent", "create"))
+    printer(step_event("resOutputsEvent", "create"))
+    printer(summary_event({"create": 1}))
+
+    assert printer.timings["aws:s3/bucket:Bucket"]["count"] == 1
+    output = capsys.readouterr().out
+    assert "lab-bucket" in output
+    assert "1 create" in output
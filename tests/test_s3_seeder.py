@@ -0,0 +1,55 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from data_reset import DataReset
+from data_validation import DataValidator
+from s3_seeder import S3Seeder, load_spec
+
+BUCKETS = {"config_files_bucket": "lab-config", "customer_data_bucket": "customers", "payment_data_bucket": "payments",
+           "regular_buckets": ["q1-data"]}
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        session = boto3.Session(region_name="us-east-1")
+        for bucket in ["lab-config", "customers", "payments", "q1-data"]:
+            session.client("s3").create_bucket(Bucket=bucket)
+        yield session
+
+
+def test_failed_uploads_stay_in_the_manifest(session, monkeypatch):
+    spec = load_spec(objects_per_bucket=3)
+    spec["size"] = {"distribution": "fixed", "bytes": 2048}
+    complete = S3Seeder(session=session, workers=2).seed_lab_buckets(BUCKETS, spec=spec, seed=5)["manifest"]
+    for bucket in ["lab-config", "customers", "payments", "q1-data"]:
+        for page in session.client("s3").get_paginator("list_objects_v2").paginate(Bucket=bucket):
+            for obj in page.get("Contents", []):
+                session.client("s3").delete_object(Bucket=bucket, Key=obj["Key"])
+
+    seeder = S3Seeder(session=session, workers=2)
+    upload_object = seeder.upload_object
+    failing_key = next(iter(complete["customers"]["objects"]))
+
+    def flaky_upload(bucket, key, *args):
+        if bucket == "customers" and key == failing_key:
+            raise RuntimeError("SlowDown")
+        return upload_object(bucket, key, *args)
+
+    monkeypatch.setattr(seeder, "upload_object", flaky_upload)
+    summary = seeder.seed_lab_buckets(BUCKETS, spec=spec, seed=5)
+    assert [failure["key"] for failure in summary["failures"]] == [failing_key]
+    assert summary["objects"] == 11
+    # The failed object's entry is what a successful upload would have recorded
+    assert summary["manifest"] == complete
+
+    validation = DataValidator(session=session).validate_bucket("customers", summary["manifest"]["customers"])
+    assert validation["missing_keys"] == [failing_key]
+    assert not validation["passed"]
+
+    reset = DataReset(session=session).reset_bucket("customers", summary["manifest"]["customers"], {})
+    assert reset["restored"] == 1 and "failures" not in reset
+    assert DataValidator(session=session).validate_bucket("customers", summary["manifest"]["customers"])["passed"]
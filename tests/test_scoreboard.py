@@ -0,0 +1,70 @@
+import json
+
+import clock
+import run_timeline
+import scoreboard
+
+
+class StaticSource:
+    """Alerts given up front, in the normalized source shape"""
+
+    name = "static"
+
+    def __init__(self, alerts, phases=run_timeline.PHASES):
+        self._alerts = alerts
+        self.phases = phases
+
+    def alerts(self, since, until):
+        return [alert for alert in self._alerts if since <= alert["event_time"] <= until]
+
+
+def make_run(start, phase_seconds=60):
+    phases = []
+    for index, phase_id in enumerate(run_timeline.PHASES):
+        begin = start + index * phase_seconds
+        phases.append({"id": phase_id, "label": phase_id, "start": run_timeline.iso(begin),
+                       "end": run_timeline.iso(begin + phase_seconds)})
+    return {"run_id": f"launch_attack-{start}", "started": phases[0]["start"], "finished": phases[-1]["end"],
+            "status": "completed", "phases": phases}
+
+
+def test_latency_is_measured_from_the_phase_start():
+    run = make_run(1_800_000_000)
+    mfa_ddos_start = scoreboard.epoch(run["phases"][3]["start"])
+    alerts = [{"name": "MFA burst", "phase": "mfa_ddos", "event_time": mfa_ddos_start + 5,
+               "detected": mfa_ddos_start + 12.5}]
+    result = scoreboard.build_scoreboard(StaticSource(alerts), [run])
+    rows = {row["phase"]: row for row in result["runs"][0]["phases"]}
+    assert rows["mfa_ddos"]["latency"] == 12.5
+    assert rows["enumeration"]["latency"] is None
+    assert result["phases"]["mfa_ddos"]["detected"] == 1
+
+
+def test_alert_without_phase_goes_to_the_running_phase():
+    run = make_run(1_800_000_000)
+    enumeration_start = scoreboard.epoch(run["phases"][1]["start"])
+    alerts = [{"name": "XDR alert", "phase": None, "event_time": enumeration_start + 30,
+               "detected": enumeration_start + 40}]
+    rows = scoreboard.score_run(run, alerts)
+    assert [row["phase"] for row in rows if row["latency"] is not None] == ["enumeration"]
+
+
+def test_local_source_does_not_score_phases_after_the_trail_is_stopped():
+    assert "s3" not in scoreboard.LocalRuleSource.phases
+    assert "dynamodb" not in scoreboard.LocalRuleSource.phases
+    source = StaticSource([], phases=scoreboard.LocalRuleSource.phases)
+    result = scoreboard.build_scoreboard(source, [make_run(1_800_000_000)])
+    assert result["unscored"] == run_timeline.UNLOGGED_PHASES
+    assert {row["phase"] for row in result["runs"][0]["phases"]} == set(scoreboard.LocalRuleSource.phases)
+
+
+def test_timeline_file_round_trips(tmp_path):
+    timeline = run_timeline.RunTimeline(runs_dir=str(tmp_path))
+    timeline.phase("mfa_setup", "phase 1: mfa setup")
+    timeline.phase("enumeration", "phase 2: enumeration")
+    path = timeline.finish()
+    with open(path) as file:
+        saved = json.load(file)
+    assert [phase["id"] for phase in saved["phases"]] == ["mfa_setup", "enumeration"]
+    assert saved["rehearsal"] == clock.is_virtual()
+    assert run_timeline.latest_run(str(tmp_path))["run_id"] == timeline.run_id
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+import pulumi_workspace
+import stack_fingerprint
+
+
+@pytest.fixture
+def infra(tmp_path, monkeypatch):
+    program = tmp_path / "__main__.py"
+    program.write_text("import pulumi\n")
+    (tmp_path / "Pulumi.dev.yaml").write_text("config:\n  dataSeed: 0\n")
+    monkeypatch.setattr(stack_fingerprint, "INFRA_DIR", str(tmp_path))
+    monkeypatch.setattr(stack_fingerprint, "PROGRAM_FILES", [str(program)])
+    monkeypatch.setattr(stack_fingerprint, "FINGERPRINT_PATH", str(tmp_path / "fingerprint.json"))
+    monkeypatch.setattr(pulumi_workspace, "plugin_versions", lambda: {"aws": "6.0.0"})
+    monkeypatch.setattr(pulumi_workspace, "last_successful_update", lambda: 7)
+    return tmp_path
+
+
+def test_unchanged_inputs_give_the_same_fingerprint(infra):
+    first = stack_fingerprint.compute_fingerprint({"seed_rows": None})
+    second = stack_fingerprint.compute_fingerprint({"seed_rows": None})
+    assert first["digest"] == second["digest"]
+    assert stack_fingerprint.changed_components(first, second) == []
+
+
+def test_changed_components_name_what_changed(infra, monkeypatch):
+    stored = stack_fingerprint.compute_fingerprint({"seed_rows": None})
+    (infra / "Pulumi.dev.yaml").write_text("config:\n  dataSeed: 1\n")
+    monkeypatch.setattr(pulumi_workspace, "last_successful_update", lambda: 8)
+    current = stack_fingerprint.compute_fingerprint({"seed_rows": 1000})
+    assert stack_fingerprint.changed_components(stored, current) == ["files", "last_update", "seed_params"]
+    assert stack_fingerprint.changed_components(None, current) == ["no previous fingerprint"]
+
+
+def test_saved_fingerprint_is_tied_to_the_outputs_file(infra):
+    outputs = infra / "outputs.json"
+    outputs.write_text('{"data_seed": 0}')
+    fingerprint = stack_fingerprint.compute_fingerprint()
+    stack_fingerprint.save_fingerprint(fingerprint, str(outputs))
+
+    stored = stack_fingerprint.load_fingerprint()
+    assert stored["digest"] == fingerprint["digest"]
+    assert stack_fingerprint.is_consistent(stored, str(outputs))
+
+    outputs.write_text('{"data_seed": 1}')
+    assert not stack_fingerprint.is_consistent(stored, str(outputs))
+
+    stack_fingerprint.clear_fingerprint()
+    assert stack_fingerprint.load_fingerprint() is None
+
+
+def test_program_files_follow_repository_imports(monkeypatch):
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    monkeypatch.setattr(stack_fingerprint, "REPO_DIR", repo)
+    monkeypatch.setattr(stack_fingerprint, "PROGRAM_FILES", [os.path.join(repo, "Infra", "__main__.py")])
+    names = [os.path.basename(path) for path in stack_fingerprint.program_files()]
+    assert names == ["__main__.py", "data_generator.py", "lab_index.py"]
+
+
+def test_a_change_in_an_imported_module_changes_the_fingerprint(infra, monkeypatch):
+    monkeypatch.setattr(stack_fingerprint, "REPO_DIR", str(infra))
+    (infra / "__main__.py").write_text("import pulumi\nfrom lab_index import lab_path\n")
+    (infra / "lab_index.py").write_text("import helpers\nLAB_PATH = '/lab/'\n")
+    (infra / "helpers.py").write_text("")
+    stored = stack_fingerprint.compute_fingerprint()
+    assert set(stored["components"]["files"]) == {"__main__.py", "lab_index.py", "helpers.py", "Pulumi.dev.yaml"}
+
+    (infra / "helpers.py").write_text("TAG = 'changed'\n")
+    assert stack_fingerprint.changed_components(stored, stack_fingerprint.compute_fingerprint()) == ["files"]
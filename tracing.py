@@ -0,0 +1,349 @@
+"""
+Tracing
+
+Nested timing spans for CLI phases and every AWS API call, so a demo cycle
+can be broken down into where its time actually goes.
+
+- `span(name)` / `@traced(name)` time a block or function, nested under
+  whatever span is open on the same thread
+- `step(name)` marks sequential phases: it closes the previous step opened
+  at the same level and starts the next one (no re-indenting needed)
+- every botocore client created while tracing is on gets before-call /
+  after-call handlers, so each API call becomes an "aws" span carrying its
+  status code, retry count and error code
+
+`command_trace()` wraps a whole CLI command. It writes the spans as a
+Chrome trace (open in chrome://tracing or https://ui.perfetto.dev) or as
+JSONL, and prints a summary of the slowest phases and AWS operations.
+With profile=True it also runs cProfile, and with memtrace=True it runs
+tracemalloc.
+
+When tracing is off, span/step/traced cost one global lookup.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+from termcolor import colored
+
+
+TRACE_DIR = "/workspaces/North_Korean_Cloud_Nightmare/Infra/traces"
+
+_tracer = None
+
+
+class Span:
+    __slots__ = ("id", "parent", "name", "category", "thread", "start_ns", "end_ns", "attrs", "is_step")
+
+    def __init__(self, span_id, parent, name, category, attrs, is_step=False):
+        self.id = span_id
+        self.parent = parent
+        self.name = name
+        self.category = category
+        self.thread = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        self.attrs = attrs
+        self.is_step = is_step
+
+
+class Tracer:
+    """Collects spans from every thread; each thread keeps its own stack of open spans"""
+
+    def __init__(self):
+        self.origin_ns = time.perf_counter_ns()
+        self.spans = []
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def open(self, name, category, attrs, is_step=False):
+        stack = self._stack()
+        span = Span(next(self._ids), stack[-1].id if stack else None, name, category, attrs, is_step)
+        stack.append(span)
+        return span
+
+    def close(self, span):
+        """End a span, and any step spans still open inside it"""
+        stack = self._stack()
+        now = time.perf_counter_ns()
+        while stack:
+            top = stack.pop()
+            top.end_ns = now
+            with self._lock:
+                self.spans.append(top)
+            if top is span:
+                return
+        # Span opened on another thread (or already closed): record it anyway
+        if span.end_ns is None:
+            span.end_ns = now
+            with self._lock:
+                self.spans.append(span)
+
+    def step(self, name, category, attrs):
+        stack = self._stack()
+        if stack and stack[-1].is_step:
+            self.close(stack[-1])
+        return self.open(name, category, attrs, is_step=True)
+
+    def close_all(self):
+        stack = self._stack()
+        if stack:
+            self.close(stack[0])
+
+    # ------------------------------------------------------------------ #
+
+    def _relative_us(self, ns):
+        return (ns - self.origin_ns) / 1000
+
+    def as_dicts(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        return [
+            {
+                "id": span.id,
+                "parent": span.parent,
+                "name": span.name,
+                "category": span.category,
+                "thread": span.thread,
+                "start_ms": round(self._relative_us(span.start_ns) / 1000, 3),
+                "duration_ms": round((span.end_ns - span.start_ns) / 1e6, 3),
+                "attrs": span.attrs,
+            }
+            for span in spans
+        ]
+
+    def write_jsonl(self, path):
+        with open(path, "w") as file:
+            for span in self.as_dicts():
+                file.write(json.dumps(span, default=str) + "\n")
+
+    def write_chrome_trace(self, path):
+        pid = os.getpid()
+        events = [
+            {"name": span["name"], "cat": span["category"], "ph": "X", "pid": pid, "tid": span["thread"],
+             "ts": round(span["start_ms"] * 1000, 1), "dur": round(span["duration_ms"] * 1000, 1),
+             "args": span["attrs"]}
+            for span in self.as_dicts()
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, default=str)
+
+    def summary(self, top=10):
+        spans = self.as_dicts()
+        operations = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+        for span in spans:
+            if span["category"] != "aws":
+                continue
+            operation = operations[span["name"]]
+            operation["count"] += 1
+            operation["total_ms"] += span["duration_ms"]
+            operation["max_ms"] = max(operation["max_ms"], span["duration_ms"])
+            operation["errors"] += bool(span["attrs"].get("error"))
+        parents = {span["id"]: span["parent"] for span in spans}
+        phases = []
+        for span in spans:
+            if span["category"] in ("command", "phase"):
+                depth, parent = 0, span["parent"]
+                while parent is not None:
+                    depth, parent = depth + 1, parents.get(parent)
+                phases.append(dict(span, depth=depth))
+        return {
+            "phases": phases,
+            "sleep_ms": sum(span["duration_ms"] for span in spans if span["category"] == "sleep"),
+            "aws_calls": sum(operation["count"] for operation in operations.values()),
+            "aws_operations": sorted(operations.items(), key=lambda item: -item[1]["total_ms"])[:top],
+        }
+
+
+# --------------------------------------------------------------------------- #
+# Public API
+# --------------------------------------------------------------------------- #
+
+def enabled():
+    return _tracer is not None
+
+
+@contextmanager
+def span(name, category="phase", **attrs):
+    """Time a block as a span (no-op when tracing is off)"""
+    tracer = _tracer
+    if tracer is None:
+        yield None
+        return
+    current = tracer.open(name, category, attrs)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        tracer.close(current)
+
+
+def traced(name=None, category="phase"):
+    """Decorator: run the function inside a span named after it"""
+    def decorator(function):
+        span_name = name or function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return function(*args, **kwargs)
+            with span(span_name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def step(name, category="phase", **attrs):
+    """Start the next sequential phase, ending the previous step at this level"""
+    if _tracer is not None:
+        _tracer.step(name, category, attrs)
+
+
+# --------------------------------------------------------------------------- #
+# botocore instrumentation
+# --------------------------------------------------------------------------- #
+
+_instrumented = False
+
+
+def _before_call(model, context, **kwargs):
+    if _tracer is not None:
+        context["trace_span"] = _tracer.open(f"{model.service_model.service_name}.{model.name}", "aws", {})
+
+
+def _after_call(http_response, parsed, context, **kwargs):
+    current = context.pop("trace_span", None)
+    if current is None or _tracer is None:
+        return
+    metadata = parsed.get("ResponseMetadata", {})
+    current.attrs["status"] = metadata.get("HTTPStatusCode")
+    current.attrs["retries"] = metadata.get("RetryAttempts", 0)
+    if "Error" in parsed:
+        current.attrs["error"] = parsed["Error"].get("Code")
+    _tracer.close(current)
+
+
+def _after_call_error(exception, context, **kwargs):
+    current = context.pop("trace_span", None)
+    if current is not None and _tracer is not None:
+        current.attrs["error"] = type(exception).__name__
+        _tracer.close(current)
+
+
+def instrument_botocore():
+    """Attach the span handlers to every botocore client created from now on"""
+    global _instrumented
+    if _instrumented:
+        return
+    from botocore.session import Session
+
+    create_client = Session.create_client
+
+    @wraps(create_client)
+    def create_traced_client(self, *args, **kwargs):
+        client = create_client(self, *args, **kwargs)
+        client.meta.events.register("before-call", _before_call)
+        client.meta.events.register("after-call", _after_call)
+        client.meta.events.register("after-call-error", _after_call_error)
+        return client
+
+    Session.create_client = create_traced_client
+    _instrumented = True
+
+
+# --------------------------------------------------------------------------- #
+# Whole-command tracing
+# --------------------------------------------------------------------------- #
+
+def default_trace_path(command):
+    return os.path.join(TRACE_DIR, f"{command}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+
+
+def print_summary(summary):
+    print(colored("\n[TRACE] Phases:", "magenta", attrs=["bold"]))
+    for phase in summary["phases"]:
+        print(colored(f"  {phase['duration_ms'] / 1000:>9.2f}s  {'  ' * phase['depth']}{phase['name']}", "magenta"))
+    if summary["sleep_ms"]:
+        print(colored(f"  {summary['sleep_ms'] / 1000:>9.2f}s  (scripted waits)", "magenta"))
+    print(colored(f"[TRACE] {summary['aws_calls']} AWS API calls; slowest operations by total time:", "magenta"))
+    for name, operation in summary["aws_operations"]:
+        errors = f", {operation['errors']} errors" if operation["errors"] else ""
+        print(colored(f"  {operation['total_ms'] / 1000:>9.2f}s  {name} ×{operation['count']} "
+                      f"(max {operation['max_ms']:.0f}ms{errors})", "magenta"))
+
+
+@contextmanager
+def command_trace(command, trace_path=None, profile=False, memtrace=False):
+    """Trace (and optionally profile / memory-trace) one CLI command"""
+    global _tracer
+    if not (trace_path or profile or memtrace):
+        yield
+        return
+
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    if trace_path:
+        _tracer = Tracer()
+        instrument_botocore()
+    if memtrace:
+        import tracemalloc
+        tracemalloc.start(25)
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        with span(command, "command"):
+            yield
+    finally:
+        if profile:
+            profiler.disable()
+        if trace_path:
+            tracer, _tracer = _tracer, None
+            tracer.close_all()
+            if trace_path.endswith(".jsonl"):
+                tracer.write_jsonl(trace_path)
+            else:
+                tracer.write_chrome_trace(trace_path)
+            print_summary(tracer.summary())
+            print(colored(f"[TRACE] Trace written to {trace_path}", "magenta"))
+        if profile:
+            import pstats
+            profile_path = os.path.join(TRACE_DIR, f"{command}.prof")
+            profiler.dump_stats(profile_path)
+            print(colored("\n[PROFILE] Top functions by cumulative time:", "magenta", attrs=["bold"]))
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+            print(colored(f"[PROFILE] Full profile written to {profile_path} (open with snakeviz or pstats)", "magenta"))
+        if memtrace:
+            _report_memory()
+
+
+def _report_memory(top=15):
+    import tracemalloc
+
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    tracemalloc.stop()
+    print(colored(f"\n[MEMTRACE] Python heap: peak {peak / 2**20:.1f} MB, still allocated {current / 2**20:.1f} MB",
+                  "magenta", attrs=["bold"]))
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        print(colored(f"  {stat.size / 2**20:>8.2f} MB  {stat.count:>8} blocks  {frame.filename}:{frame.lineno}",
+                      "magenta"))